@@ -1,5 +1,5 @@
 """
-This script is used to generate the IAC recommendation for Recover Exhaust Gas Heat.
+This script is used to generate the IAC recommendation for Install Air-Fuel Ratio Controller.
 """
 
 import json5, sys, os
@@ -8,7 +8,9 @@ from easydict import EasyDict
 from python_docx_replace import docx_replace, docx_blocks
 sys.path.append(os.path.join('..', '..')) 
 from Shared.IAC import *
-import AFR
+from Shared import Savings, AFR
+import numpy as np
+from copy import deepcopy
 
 # Load utility cost
 jsonDict = json5.load(open(os.path.join('..', '..', 'Utility.json5')))
@@ -17,15 +19,48 @@ jsonDict.update(json5.load(open('database.json5')))
 # Convert to easydict
 iac = EasyDict(jsonDict)
 
+## Boilers
+# A single boiler or a list of boilers, readings can be averaged from a combustion analyzer log
+iac.EQUIP = np.atleast_1d(iac.EQUIP)
+if iac.LOG:
+    readings = AFR.averages(AFR.read_log(iac.LOG), iac.EQUIP)
+    iac.O2, iac.FGT, iac.CAT = readings.O2, readings.FGT, readings.CAT
+N = len(iac.EQUIP)
+# One value per boiler
+for key in ['SIZE', 'LF', 'O2', 'FGT', 'CAT']:
+    iac[key] = np.broadcast_to(np.asarray(iac[key], dtype=float), (N,))
+
 # Calculations
-iac.OH = int(iac.HR * iac.DY * iac.WK)
-iac.CAH = round(AFR.AFR(iac.CAT, iac.FGT, iac.O2),2)
 # Proposed condition is 2% O2
-iac.PAH = round(AFR.AFR(iac.CAT, iac.FGT, 2),2)
-iac.SAV = round((iac.PAH - iac.CAH)/iac.PAH * 100, 2)
-iac.IC = round(iac.LABOR + iac.PARTS)
-iac.NGS = round(iac.SIZE * iac.OH * (iac.LF/100) * (iac.SAV/100))
-iac.ACS = round(iac.NGS * iac.NGC)
+iac.update(Savings.scalarize(Savings.afr_controllers(**iac)))
+if np.any(np.isnan(iac.SAVi)):
+    raise Exception("Invalid combustion data of " + combine_words(iac.EQUIP[np.isnan(iac.SAVi)].tolist()) + "!")
+if np.any(iac.SAVi == 0):
+    caveat("O2 of " + combine_words(iac.EQUIP[iac.SAVi == 0].tolist()) + " is already at or below 2%, no savings are counted.")
+
+# Savings curve of target O2 levels
+print('Natural gas savings (MMBtu/yr) at target O2 ' + ', '.join('%g%%' % x for x in iac.O2T))
+for i in range(N):
+    print(iac.EQUIP[i] + ': ' + ', '.join('%d' % x for x in iac.NGSc[i]))
+
+# Table rows of each boiler
+O2, FGT, CAT = iac.O2, iac.FGT, iac.CAT
+current = [['%g%%' % round(O2[i], 2), '%d °F' % round(FGT[i]), '%d °F' % round(CAT[i]), '%g%%' % iac.CAHi[i], '-'] for i in range(N)]
+proposed = [['2%', '%d °F' % round(FGT[i]), '%d °F' % round(CAT[i]), '%g%%' % iac.PAHi[i], '%g%%' % iac.SAVi[i]] for i in range(N)]
+if N > 1:
+    # Name each boiler in the first column, and list its own savings, which add up to NGS
+    for i in range(N):
+        current[i][0] = iac.EQUIP[i] + ': ' + current[i][0]
+        proposed[i][4] += ' (' + '{:,}'.format(int(iac.NGSi[i])) + ' MMBtu/yr)'
+    # Text describes all boilers, per-boiler conditions are in Table 1
+    iac.O2 = combine_words(['%g%% in the %s' % (round(O2[i], 2), iac.EQUIP[i]) for i in range(N)])
+else:
+    iac.O2 = '%g' % round(float(O2[0]), 2)
+    iac.CAH, iac.PAH = iac.CAHi[0], iac.PAHi[0]
+iac.SIZE = iac.TSIZE
+# Capacity weighted load factor
+iac.LF = round(float(np.sum(iac.FIRE) / iac.TSIZE * 100), 1)
+iac.EQUIP = combine_words(iac.EQUIP.tolist())
 
 # Rebate
 iac = rebate(iac)
@@ -34,7 +69,7 @@ iac = rebate(iac)
 # set the natural gas and demand to 2 digits accuracy
 iac = dollar(['NGC','NRR'],iac,2)
 # set the rest to integer
-varList = ['ACS', 'IC', 'PARTS', 'LABOR', 'RB', 'MRB', 'MIC']
+varList = ['ACS', 'IC', 'PARTS', 'LABOR', 'RB', 'MRB', 'MIC', 'NPV']
 iac = dollar(varList,iac,0)
 # Format all numbers to string with thousand separator
 iac = grouping_num(iac)
@@ -48,6 +83,19 @@ docx_blocks(doc, REBATE = iac.REB)
 # Replacing keys
 docx_replace(doc, **iac)
 
+# Fill in the exhaust gas analysis table, one current and one proposed row per boiler
+table = doc.tables[1]
+# Proposed rows first, so the index of current rows doesn't change
+for index, rows in [(4, proposed), (2, current)]:
+    for i in range(1, N):
+        table.rows[index]._tr.addnext(deepcopy(table.rows[index]._tr))
+    for i in range(N):
+        for cell, text in zip(table.rows[index + i].cells, rows[i]):
+            runs = cell.paragraphs[0].runs
+            runs[0].text = text
+            for run in runs[1:]:
+                run.text = ''
+
 savefile(doc, iac.REC)
 
 # Caveats
@@ -6,6 +6,7 @@ then run this script.
 
 
 import json5, os, locale, datetime, math, platform, re
+from copy import deepcopy
 import pandas as pd
 from easydict import EasyDict
 from docx import Document, shared
@@ -15,6 +16,7 @@ from docx.enum.style import WD_STYLE_TYPE
 from docxcompose.composer import Composer
 from python_docx_replace import docx_replace, docx_blocks
 from Shared.IAC import *
+from Shared import Finance, Profile, Tariff, Bills
 
 # Check if Description.docx has been changed
 docTest = Document(os.path.join('Report', 'Description.docx'))
@@ -57,7 +59,8 @@ print("done")
 # Initialize dataframe
 columns = ["isAdditional", "File Name", "ARC No.", "Description", "Electricity (kWh)", "Electricity (MMBtu)", "Demand (kW)"
            , "Natural Gas (MMBtu)", "Other Energy Type", "Other Energy Amount", "Other Resource Type", "Other Resource Amount"
-           , "Savings Type", "Savings Value", "Annual Cost Savings", "Implementation Cost", "Payback Period"]
+           , "Savings Type", "Savings Value", "Annual Cost Savings", "Implementation Cost", "Payback Period"
+           , "Life", "NPV", "IRR", "SIR", "Profile"]
 df = pd.DataFrame(columns=columns)
 
 # Set locale to en_US
@@ -73,6 +76,8 @@ for recDoc in recList:
     recInfo = {}
     # Record file name
     recInfo['File Name'] = recDoc
+    # Hourly savings profile saved next to the document, if any
+    recInfo['Profile'] = os.path.join('Recommendations', os.path.splitext(recDoc)[0] + '.npy')
 
     # Parse document title
     fullTitle = doc.paragraphs[0].text
@@ -115,6 +120,12 @@ for recDoc in recList:
         # If Payback Period skip (Doesn't matter, will calculate later)
         elif "payback" in key.lower():
             continue
+        # Lifecycle metrics are calculated later with the equipment life of each recommendation
+        elif "present" in key.lower() or "return" in key.lower() or "investment" in key.lower():
+            continue
+        # Parse equipment life
+        elif "life" in key.lower():
+            recInfo['Life'] = locale.atof(value.split(' ')[0])
         # Parse Electricity
         elif "electricity" in key.lower():
             recInfo['Electricity (kWh)'] = locale.atoi(value.split(' ')[0])
@@ -160,6 +171,13 @@ print("Analyzing recommendations...", end ="")
 df['Payback Period'] = df['Implementation Cost'] / df['Annual Cost Savings']
 # Convert electricity to MMBtu
 df['Electricity (MMBtu)'] = df['Electricity (kWh)']* 0.003413/0.33
+# Equipment life of older recommendations without it
+df['Life'] = df['Life'].fillna(iac.LIFE)
+# Lifecycle financial metrics of all recommendations in one call
+fin = Finance.metrics(df['Annual Cost Savings'].to_numpy(dtype=float), df['Implementation Cost'].to_numpy(dtype=float), iac.DR, iac.ESC, df['Life'].to_numpy(dtype=float))
+df['NPV'] = fin.NPV
+df['IRR'] = fin.IRR
+df['SIR'] = fin.SIR
 # Sort df by payback period
 df = df.sort_values(by=['Payback Period'])
 
@@ -217,6 +235,14 @@ iac.IC = recData['Implementation Cost'].sum(axis=0, skipna=True)
 iac.PB = math.ceil(iac.IC / iac.ACS * 10) / 10
 # Payback period in formatted string
 iac.PBstr = payback(iac.ACS, iac.IC)
+# Lifecycle financial metrics of the whole portfolio, each recommendation with its own life
+fin = Finance.portfolio(recData['Annual Cost Savings'], recData['Implementation Cost'], iac.DR, iac.ESC, recData['Life'])
+iac.NPV = round(fin.NPV)
+iac.IRR = round(fin.IRR, 1) if math.isfinite(fin.IRR) else "N/A"
+iac.SIR = round(fin.SIR, 2) if math.isfinite(fin.SIR) else "N/A"
+# Coincident demand savings, the hourly profiles of all recommendations are added up before taking monthly peaks
+load = Tariff.read(iac.LOAD) if iac.get('LOAD') else None
+coincident = Profile.demand(Profile.load(list(recData['Profile'])), load)
 print("done")
 
 print("Reformatting recommendations...", end ="")
@@ -349,7 +375,7 @@ iac = dollar(['EC'],iac,3)
 # set the natural gas and demand to 2 digits accuracy
 iac = dollar(['DC', 'FC'],iac,2)
 # set the rest to integer
-varList = ['ACS', 'IC', 'TotalECost', 'TotalFCost', 'TotalCost']
+varList = ['ACS', 'IC', 'NPV', 'TotalECost', 'TotalFCost', 'TotalCost']
 if hasAdditional:
     varList.extend(['AddACS', 'AddIC'])
 iac = dollar(varList,iac,0)
@@ -390,8 +416,14 @@ for index, row in recData.iterrows():
     else:
         recRow[6].text = str(math.ceil(pb * 10) / 10)
     recRow[6].paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.RIGHT
+    # Add lifecycle metrics
+    recRow[7].text = locale.currency(row['NPV'], grouping=True)
+    recRow[8].text = str(round(row['IRR'], 1)) if math.isfinite(row['IRR']) else "N/A"
+    recRow[9].text = str(round(row['SIR'], 2)) if math.isfinite(row['SIR']) else "N/A"
+    for col in range(7,10):
+        recRow[col].paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.RIGHT
     # Set 3pt before and after paragraph
-    for col in range(0,7):
+    for col in range(0,10):
         recRow[col].paragraphs[0].paragraph_format.space_before = shared.Pt(3)
         recRow[col].paragraphs[0].paragraph_format.space_after = shared.Pt(3)
 # Delete unused rows (Currectly row 1-15 are empty)
@@ -495,40 +527,53 @@ print("done")
 
 # Fill in energy chart tables from Energy Charts.xlsx
 print("Adding energy chart tables...", end ="")
-# Read electricity table from B6 to I19
-edf = pd.read_excel(os.path.join('Energy Charts', 'Energy Charts.xlsx'), sheet_name="Raw Data", skiprows = 5, nrows=13, usecols = 'B:I')
-# Read fuel table from K6 to N19
-fdf = pd.read_excel(os.path.join('Energy Charts', 'Energy Charts.xlsx'), sheet_name="Raw Data", skiprows = 5, nrows=13, usecols = 'K:N')
+# Electricity and fuel tables computed from the trailing 12 months of the bill store or the raw monthly rows
+if iac.get('BILLS'):
+    if not os.path.isfile(os.path.join(*Bills.STORE)):
+        raise Exception("Bill store not found. Please run Utility.py first.")
+    tables = Bills.tables(Bills.trailing(Bills.load(os.path.join(*Bills.STORE))))
+else:
+    tables = Bills.tables(Bills.read(os.path.join(*Bills.WORKBOOK)))
 
 # Add rows to electricity table (Should be the 1st table)
 eTable = docEnergy.tables[0]
-for index, row in edf.iterrows():
+# Fit the table to the months and the total row, after 3 header rows
+while len(eTable.rows) > len(tables['Electricity']) + 3:
+    eTable._tbl.remove(eTable.rows[3]._tr)
+while len(eTable.rows) < len(tables['Electricity']) + 3:
+    eTable.rows[3]._tr.addnext(deepcopy(eTable.rows[3]._tr))
+for index, row in enumerate(tables['Electricity']):
     eRow = eTable.rows[index+3].cells
     # Add Month
-    eRow[0].text = edf.iloc[(index, 0)]
+    eRow[0].text = row[0]
     eRow[0].paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
     for col in range(1,8):
         # Add interger with thousand separator
-        eRow[col].text = locale.format_string('%d',round(edf.iloc[(index, col)]), grouping=True)
+        eRow[col].text = locale.format_string('%d',round(row[col]), grouping=True)
         eRow[col].paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.RIGHT
     # Bold the last row
-    if index == 12:
+    if index == len(tables['Electricity']) - 1:
         for col in range(0,8):
             eRow[col].paragraphs[0].runs[0].bold = True
 
 # Add rows to fuel table (Should be the 2nd table)
 fTable = docEnergy.tables[1]
-for index, row in fdf.iterrows():
+# Fit the table to the months and the total row, after 3 header rows
+while len(fTable.rows) > len(tables['Fuel']) + 3:
+    fTable._tbl.remove(fTable.rows[3]._tr)
+while len(fTable.rows) < len(tables['Fuel']) + 3:
+    fTable.rows[3]._tr.addnext(deepcopy(fTable.rows[3]._tr))
+for index, row in enumerate(tables['Fuel']):
     fRow = fTable.rows[index+3].cells
     # Add Month
-    fRow[0].text = fdf.iloc[(index, 0)]
+    fRow[0].text = row[0]
     fRow[0].paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
     for col in range(1,4):
         # Add interger with thousand separator
-        fRow[col].text = locale.format_string('%d',round(fdf.iloc[(index, col)]), grouping=True)
+        fRow[col].text = locale.format_string('%d',round(row[col]), grouping=True)
         fRow[col].paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.RIGHT
     # Bold the last row
-    if index == 12:
+    if index == len(tables['Fuel']) - 1:
         for col in range(0,4):
             fRow[col].paragraphs[0].runs[0].bold = True
 print("done")
@@ -587,6 +632,14 @@ section.page_height = new_height
 doc.save(filename)
 print(filename + " is finished.")
 
+# Lifecycle summary
+print("Lifecycle summary ({0}% discount rate, {1}% escalation):".format(iac.DR, iac.ESC))
+print(recData[['ARC No.', 'Annual Cost Savings', 'Implementation Cost', 'Life', 'NPV', 'IRR', 'SIR']].round(1).to_string(index=False))
+print("Portfolio NPV: " + iac.NPV + ", IRR: " + str(iac.IRR) + "%, SIR: " + str(iac.SIR))
+# Demand savings, sum of the recommendations vs. coincident peaks
+print("Demand savings: {0:,.0f} kW/yr (sum of recommendations), {1:,.0f} kW/yr (coincident{2})".format(
+    recData['Demand (kW)'].sum(skipna=True), coincident['TDS'], " with " + iac.LOAD if load is not None else ""))
+
 # Caveats
 caveat("Please select all (Ctrl+A) then refresh TWICE (F9) ToC, list of tables/figures.")
 
@@ -8,6 +8,7 @@ from easydict import EasyDict
 from python_docx_replace import docx_replace, docx_blocks
 sys.path.append(os.path.join('..', '..')) 
 from Shared.IAC import *
+from Shared import Savings, Compressor
 
 # Load utility cost
 jsonDict = json5.load(open(os.path.join('..', '..', 'Utility.json5')))
@@ -16,23 +17,22 @@ jsonDict.update(json5.load(open('database.json5')))
 # Convert to easydict
 iac = EasyDict(jsonDict)
 
+## Compressed air system
+# Savings are scaled for the measures implemented before this one on the same system, see ../System.json5
+iac.XF, before = Compressor.interaction('Exhuast Heat', iac)
+
 ## Calculations
-# Operating hours
-iac.OH = iac.HR * iac.DY * iac.WK
-
-## Savings
-# Natural Gas Savings
-iac.NGS = round(iac.HP * iac.FR/100 * iac.EC/100 * 0.002544 * iac.EHR/100 * iac.OH)
-# Annual Cost Savigns
-iac.ACS = round(iac.NGS * iac.NGC)
+iac.update(Savings.scalarize(Savings.compressor_exhaust_heat(**iac)))
+
 ## Rebate
 iac.PB = payback(iac.ACS, iac.IC)
+iac = lifecycle(iac)
 
 ## Format strings
 # set to 2 digits accuracy
 iac = dollar(['NGC'],iac,2)
 # set the rest to integer
-varList = ['ACS', 'IC']
+varList = ['ACS', 'IC', 'NPV']
 iac = dollar(varList,iac,0)
 # Format all numbers to string with thousand separator
 iac = grouping_num(iac)
@@ -46,4 +46,6 @@ docx_replace(doc, **iac)
 savefile(doc, iac.REC)
 
 # Caveats
+if before:
+    caveat("Savings are {0}% of the savings alone, because of ".format(iac.XF) + combine_words(before) + " on the same system.")
 caveat("Please change implementation cost references if necessary.")
\ No newline at end of file
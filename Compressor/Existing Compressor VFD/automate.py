@@ -8,7 +8,7 @@ from easydict import EasyDict
 from python_docx_replace import docx_replace, docx_blocks
 sys.path.append(os.path.join('..', '..')) 
 from Shared.IAC import *
-import numpy as np
+from Shared import Savings, Compressor, Logger, Profile
 
 # Load utility cost
 jsonDict = json5.load(open(os.path.join('..', '..', 'Utility.json5')))
@@ -17,63 +17,38 @@ jsonDict.update(json5.load(open('database.json5')))
 # Convert to easydict
 iac = EasyDict(jsonDict)
 
-## VFD table
-Load = np.linspace(20, 100, num=17)
-VFD = np.array([25, 28, 33, 38, 42, 47, 52, 57, 61, 65, 70, 75, 80, 85, 90, 95, 105])
+## Data logger
+# Average the part load curve over the load duration histogram of an amp or kW logger instead of a single load fraction
+if iac.LOG:
+    log = Logger.histogram(iac.LOG, iac.COL, iac.FULL)
+    iac.LFB, iac.DUR = log.LFB, log.DUR
+    iac.LF = round(log.LF)
+    print("Load duration (% of time) at " + ', '.join(f'{l:g}%: {t:.1f}' for l, t in zip(log.LFB, log.DUR) if t > 0))
 
-## Calculations
-# Operating hours
-iac.OH = iac.HR * iac.DY * iac.WK
+## Compressed air system
+# Savings are scaled for the measures implemented before this one on the same system, see ../System.json5
+iac.XF, before = Compressor.interaction('Existing Compressor VFD', iac)
 
-# Power Fraction without VFD
-# Blow Off
-if iac.CT == 1:
-    iac.FPC = 100
-    iac.CT = "blow off"
-# Modulation
-elif iac.CT == 2:
-    iac.FPC = round(0.3 * iac.LF + 70)
-    iac.CT = "modulation"
-# Load/Unload
-elif iac.CT == 3:
-    iac.FPC = round(0.5 * iac.LF + 50)
-    iac.CT = "load/unload"
-else:
-    raise Exception("Wrong control type!")
-# Power Fraction with VFD
-iac.FPV = round(np.interp(iac.LF, Load, VFD).item())
-# Current Power Draw
-iac.CPD = round((iac.HP * 0.746 * (iac.FPC/100)) / (iac.ETAE/100))
-# Proposed Power Draw
-iac.PPD = round((iac.HP * 0.746 * (iac.FPV/100)) / (iac.ETAP/100))
+## Calculations
+iac.update(Savings.scalarize(Savings.existing_compressor_vfd(**iac)))
 
-## Savings
-# Annual Energy Savings
-iac.ES = (iac.CPD - iac.PPD) * iac.OH
-# Annual Demand Savings
-iac.DS = (iac.CPD - iac.PPD) * (iac.CF/100) * 12
-# Estimated Cost Savings
-iac.ECS = round(iac.ES * iac.EC)
-# Demand Cost Savings
-iac.DCS = round(iac.DS * iac.DC)
-# Total Cost Savings
-iac.ACS = iac.ECS + iac.DCS
-# Total Installation Cost
-if (iac.TANK == True):
-    iac.IC = iac.VFD + iac.AIC + iac.ATP
-else:
-    iac.IC = iac.VFD + iac.AIC
+# Control type without VFD
+CTList = ["blow off", "modulation", "load/unload"]
+iac.CT = CTList[iac.CT - 1]
 
 ## Rebate
 iac = rebate(iac)
 
+# Hourly electricity savings
+hourly = Profile.profile(iac.ES, iac.HR, iac.DY, iac.WK)
+
 ## Format strings
 # set electricity cost / rebate to 3 digits accuracy
 iac = dollar(['EC', 'ERR'],iac,3)
 # set demand to 2 digits accuracy
 iac = dollar(['DC'],iac,2)
 # set the rest to integer
-varList = ['ACS', 'ECS', 'DCS', 'VFD', 'AIC', 'IC', 'RB', 'MRB', 'MIC', 'ATP']
+varList = ['ACS', 'ECS', 'DCS', 'VFD', 'AIC', 'IC', 'RB', 'MRB', 'MIC', 'ATP', 'NPV']
 iac = dollar(varList,iac,0)
 # Format all numbers to string with thousand separator
 iac = grouping_num(iac)
@@ -87,7 +62,11 @@ docx_replace(doc, **iac)
 docx_blocks(doc, REBATE=iac.REB)
 docx_blocks(doc, TANK=iac.TANK)
 
-savefile(doc, iac.REC)
+savefile(doc, iac.REC, profile=hourly)
 
 # Caveats
+if before:
+    caveat("Savings are {0}% of the savings alone, because of ".format(iac.XF) + combine_words(before) + " on the same system.")
+if iac.LOG:
+    caveat("The equipment was on {0:.0f}% of the logged time, please check the operating hours.".format(log.ON))
 caveat("Please change implementation cost references if necessary.")
\ No newline at end of file
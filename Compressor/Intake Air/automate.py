@@ -8,10 +8,7 @@ from easydict import EasyDict
 from python_docx_replace import docx_replace, docx_blocks
 sys.path.append(os.path.join('..', '..')) 
 from Shared.IAC import *
-import numpy as np
-import pgeocode
-from datetime import datetime
-from meteostat import Point, Monthly, units
+from Shared import Savings, Compressor, Profile
 
 # Load utility cost
 jsonDict = json5.load(open(os.path.join('..', '..', 'Utility.json5')))
@@ -20,55 +17,28 @@ jsonDict.update(json5.load(open('database.json5')))
 # Convert to easydict
 iac = EasyDict(jsonDict)
 
-## Retreiving AVerage Outside Temperature
-# Use US zipcodes
-nomi = pgeocode.Nominatim('us')
-query = nomi.query_postal_code(iac.ZIP)
-# Return lat and lon information
-lat = query['latitude']
-lon = query['longitude']
+## Retreiving Average Outside Temperature of winter months, from the database or the local weather cache
+iac.TO = Compressor.outside_temperature(iac)
 
-start = datetime(2018, 10, 1)
-end = datetime(2022, 5, 31)
-# Use coordinates for weather info
-point = Point(lat, lon)
-# Get monthly data
-data = Monthly(point, start, end)
-data.convert(units.imperial)
-df = data.fetch()
-# Extract average temperature
-df = df['tavg']
-df = df[df.index.month.isin([10,11,12,1,2,3,4,5])]
-iac.TO = round(df.mean())
+## Compressed air system
+# Savings are scaled for the measures implemented before this one on the same system, see ../System.json5
+iac.XF, before = Compressor.interaction('Intake Air', iac)
 
 ## Calculations
-# Compressor Work Reduction
-iac.CWR = round((iac.TI - iac.TO)/(iac.TI + 460) * 100, 2)
-# Operating hours
-iac.OH = iac.HR * iac.DY * iac.WK
-# Power Reduction
-iac.PR = round((iac.HP * 0.746 * (iac.FR/100) * (iac.CWR/100)) / (iac.ETA/100), 1)
-
-## Savings
-# Electrcity Savings
-iac.ES = round(iac.PR * iac.OH)
-# Demand Savings
-iac.DS = round(iac.PR * (iac.CF/100) * iac.C2)
-# Electrcicity Cost Savings
-iac.ECS = round(iac.ES * iac.EC) 
-# Demand Cost Savings
-iac.DCS = round(iac.DS * iac.DC)
-# Annual Cost Savigns
-iac.ACS = round(iac.ECS + iac.DCS)
+iac.update(Savings.scalarize(Savings.intake_air(**iac)))
 
 ## Rebate
 iac.PB = payback(iac.ACS, iac.IC)
+iac = lifecycle(iac)
+
+# Hourly electricity savings
+hourly = Profile.profile(iac.ES, iac.HR, iac.DY, iac.WK)
 
 ## Format strings
 # set to 2 digits accuracy
 iac = dollar(['EC','DC'],iac,2)
 # set the rest to integer
-varList = ['ACS', 'ECS', 'DCS', 'IC']
+varList = ['ACS', 'ECS', 'DCS', 'IC', 'NPV']
 iac = dollar(varList,iac,0)
 # Format all numbers to string with thousand separator
 iac = grouping_num(iac)
@@ -79,7 +49,9 @@ doc = Document('template.docx')
 # Replacing keys
 docx_replace(doc, **iac)
 
-savefile(doc, iac.REC)
+savefile(doc, iac.REC, profile=hourly)
 
 # Caveats
+if before:
+    caveat("Savings are {0}% of the savings alone, because of ".format(iac.XF) + combine_words(before) + " on the same system.")
 caveat("Please change implementation cost references if necessary.")
\ No newline at end of file
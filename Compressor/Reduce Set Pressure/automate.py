@@ -2,12 +2,13 @@
 This script is used to generate the IAC recommendation for Reduce Compressor Set Pressure.
 """
 
-import json5, sys, os, math
+import json5, sys, os
 from docx import Document
 from easydict import EasyDict
 from python_docx_replace import docx_replace
 sys.path.append(os.path.join('..', '..'))
 from Shared.IAC import *
+from Shared import Savings, Compressor, Profile
 
 # Load utility cost
 jsonDict = json5.load(open(os.path.join('..', '..', 'Utility.json5')))
@@ -16,35 +17,18 @@ jsonDict.update(json5.load(open('database.json5')))
 # Convert to easydict
 iac = EasyDict(jsonDict)
 
-# Constants
-AP = 14.7
-k = 1.4
+## Compressed air system
+# Savings are scaled for the measures implemented before this one on the same system, see ../System.json5
+iac.XF, before = Compressor.interaction('Reduce Set Pressure', iac)
 
-# Calculating Power reduction
-iac.POW = 1-(((iac.RCP+AP)/AP)**((k-1)/(k*iac.N))-1)/(((iac.CCP+AP)/AP)**((k-1)/(k*iac.N))-1)
-# 1 decimal point percent
-iac.POW = round(iac.POW*100,1)
-
-# Power Draw Reduction
-iac.PDR = iac.HP * 0.746 * (iac.LF/100) * (iac.POW/100) / (iac.ETA/100)
-# round to 2 significant digits
-iac.PDR = round(iac.PDR, -int(math.floor(math.log10(abs(iac.PDR))))+2)
-
-# Opearting Hours
-iac.OH = iac.HR * iac.DY * iac.WK
-
-# Energy Savings
-iac.ES = round(iac.PDR * iac.OH)
-
-# Demand Savings
-iac.DS = round(iac.PDR * (iac.CF/100) * 12)
-
-# Cost savings
-iac.ECS = round(iac.ES * iac.EC)
-iac.DCS = round(iac.DS * iac.DC)
-iac.ACS = iac.ECS + iac.DCS
+# Calculations
+iac.update(Savings.scalarize(Savings.reduce_set_pressure(**iac)))
 
 iac.PB  = payback(iac.ACS, iac.IC)
+iac = lifecycle(iac)
+
+# Hourly electricity savings
+hourly = Profile.profile(iac.ES, iac.HR, iac.DY, iac.WK)
 
 ## Format strings
 # set electricity cost to 3 digits accuracy
@@ -52,7 +36,7 @@ iac = dollar(['EC'],iac,3)
 # set demand to 2 digits accuracy
 iac = dollar(['DC'],iac,2)
 # set the rest to integer
-varList = ['IC', 'ACS', 'ECS', 'DCS']
+varList = ['IC', 'ACS', 'ECS', 'DCS', 'NPV']
 iac = dollar(varList,iac,0)
 # Format all numbers to string with thousand separator
 iac = grouping_num(iac)
@@ -69,7 +53,9 @@ add_eqn(doc, iac, '${POWEqn}', POWEqn)
 # Replacing keys
 docx_replace(doc, **iac)
 
-savefile(doc, iac.REC)
+savefile(doc, iac.REC, profile=hourly)
 
 # Caveats
+if before:
+    caveat("Savings are {0}% of the savings alone, because of ".format(iac.XF) + combine_words(before) + " on the same system.")
 caveat("Please change implementation cost references if necessary.")
\ No newline at end of file
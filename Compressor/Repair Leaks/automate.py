@@ -8,9 +8,10 @@ from easydict import EasyDict
 from python_docx_replace import docx_replace
 sys.path.append(os.path.join('..', '..'))
 from Shared.IAC import *
-import numpy as np
+from Shared import Savings, Leaks, Compressor, Inventory, Profile
 from num2words import num2words
 from docx.enum.text import WD_ALIGN_PARAGRAPH
+import numpy as np
 
 # Load utility cost
 jsonDict = json5.load(open(os.path.join('..', '..', 'Utility.json5')))
@@ -19,69 +20,54 @@ jsonDict.update(json5.load(open('database.json5')))
 # Convert to easydict
 iac = EasyDict(jsonDict)
 
-# Constants
-PA = 14.7 # Atmosphere, psia
-C1 = 28.37 # Isentropic sonic volumetric flow constant
-C2 = 60.0 # Conversion constant; sec/min
-C3 = 144.0 # Conversion constant; in2/ft2
-C4 = 3.03e-5 # Conversion constant; HP.min/ft.lb
-C5 = 0.746 # Conversion factor; kW/HP
-CD = 0.8 # Coefficient of discharge for square edged orifice
-k = 1.4 # Specific heat ratio of air
+## Leaks
+# Six standard sizes (NL1 to NL6), or each leak of an ultrasonic leak survey
+if iac.SURVEY:
+    survey = Leaks.read_survey(iac.SURVEY)
+    iac.update(Leaks.inputs(survey))
+    # Leaks without location are in the default location
+    AREA = np.where(survey.AREA == '', iac.LL, survey.AREA)
+
+## Compressed air system
+# Savings are scaled for the measures implemented before this one on the same system, see ../System.json5
+iac.XF, before = Compressor.interaction('Repair Leaks', iac)
 
 # Calculations
-iac.OH = iac.HR * iac.DY * iac.WK
-iac.RT = round(PA / iac.P0, 4)
-iac.VF0 = np.pi / 4 * (iac.T0 + 460) * iac.P1 / PA * C1 * C2 * CD / C3 / np.sqrt(iac.T1 + 460)
-# Number of leaks
-NL = np.array([iac.NL1, iac.NL2, iac.NL3, iac.NL4, iac.NL5, iac.NL6])
-# Leak diameters
-LD = np.array([1.0/64, 1.0/32, 1.0/16, 1.0/8, 3.0/16, 1.0/4])
-# Leak strings
-LS = ["1/64", "1/32", "1/16", "1/8", "3/16", "1/4"]
-# Flow rate (cfm)
-FR = LD * LD * iac.VF0
-# Power Loss (hp)
-PL = PA * C3 * FR * k/(k-1.0) * iac.N * C4 * \
-    (np.power(iac.P0/PA,(k-1.0)/(k*iac.N)) - 1.0) / ((iac.EA/100) * (iac.EM/100))
-# Demand Loss (kW/yr)
-DL = PL * C5 * (iac.CF/100) * 12
-# Energy Loss (kWh/yr)
-EL = PL * C5 * iac.OH
-# Leak Cost ($/yr)
-LC = DL * iac.DC + EL * iac.EC
-# Add Table 2
-DS = NL * DL
-ES = NL * EL
-CS = NL * LC
-# Convert from numpy dtype to EasyDict
-iac.SNL = sum(NL).item()
-iac.ADS = round(sum(DS).item())
-iac.AES = round(sum(ES).item())
-iac.ACS = round(sum(CS).item())
+res = Savings.repair_leaks(**iac)
+# Keep per-leak arrays for tables 2 and 3
+NL, FR, DE, PL, DL, EL, LC, DS, ES, CS = [res.pop(key) for key in ['NL', 'FR', 'DE', 'PL', 'DL', 'EL', 'LC', 'DSi', 'ESi', 'CSi']]
+iac.update(Savings.scalarize(res))
+for key in ['NL', 'DIA', 'FLOW', 'PLEAK']:
+    iac.pop(key, None)
+if not iac.SURVEY:
+    AREA = np.full(NL.size, iac.LL)
+# Leak size bins
+BIN = Leaks.size_bin(DE)
 
 # Implementation
-# Estimate 1+1 hour per leak
-iac.FLC = (1+1) * iac.SNL * iac.LR
-iac.IC = iac.FLC + iac.USLD
 iac.PB  = payback(iac.ACS, iac.IC)
+iac = lifecycle(iac)
 
 # String formatting
 # eg, 'six 1/16-inch, six 1/8-inch and three 3/16-inch'
 # Make a list of strings
+size = Leaks.group([BIN], weights=NL)
 LeakString = []
-for i in range(NL.size):
-    if NL[i]!=0:
-        LeakString.append(num2words(NL[i]) + ' ' + LS[i] + '-inch')
+for i in range(size.N.size):
+    if size.N[i]!=0:
+        LeakString.append(num2words(int(size.N[i])) + ' ' + Leaks.LeakString[size.keys[0][i]] + '-inch')
 iac.LeakString = combine_words(LeakString)
 
+# Hourly electricity savings
+hourly = Profile.profile(iac.ES, iac.HR, iac.DY, iac.WK)
+
 ## Format strings
 # set electricity cost to 3 digits accuracy
 iac = dollar(['EC'],iac,3)
 # set the natural gas and demand to 2 digits accuracy
 iac = dollar(['NGC', 'DC'],iac,2)
 # set the rest to integer
-varList = ['LR', 'FLC', 'USLD', 'IC', 'ACS']
+varList = ['LR', 'FLC', 'USLD', 'IC', 'ACS', 'NPV']
 iac = dollar(varList,iac,0)
 # Format all numbers to string with thousand separator
 iac = grouping_num(iac)
@@ -92,40 +78,28 @@ doc = Document('template.docx')
 # Replacing keys
 docx_replace(doc, **iac)
 
-# Add numbers to table 2
-table2 = doc.tables[2]
-for i in range(NL.size):
-    row = table2.rows[i+1].cells
-    row[0].text = LS[i]
-    row[1].text = f'{round(FR[i],2):,}'
-    row[2].text = f'{round(PL[i],2):,}'
-    row[3].text = f'{round(DL[i],1):,}'
-    row[4].text = f'{round(EL[i]):,}'
-    row[5].text = f'{round(LC[i]):,}'
-    # Set alignment and line spacing
-    for cell in row:
-        cell.paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.RIGHT
-        cell.paragraphs[0].paragraph_format.line_spacing = 1.5
+# Add numbers to table 2, cost of a single leak of each size
+# Each standard size once, or the average of surveyed leaks in each size bin
+size = Leaks.group([BIN], FR=FR, PL=PL, DL=DL, EL=EL, LC=LC)
+rows = []
+for i in range(size.N.size):
+    values = [size[key][i] / size.N[i] for key in ['FR', 'PL', 'DL', 'EL', 'LC']]
+    rows.append([Leaks.LeakString[size.keys[0][i]], f'{round(values[0],2):,}', f'{round(values[1],2):,}',
+                 f'{round(values[2],1):,}', f'{round(values[3]):,}', f'{round(values[4]):,}'])
+Inventory.fill(doc.tables[2], rows, alignment=WD_ALIGN_PARAGRAPH.RIGHT)
 
-# Add numbers to table 3
-table3 = doc.tables[3]
-for i in range(NL.size):
-    row=table3.rows[i+1].cells
-    row[1].text = f'{NL[i]:,}'
-    row[2].text = LS[i]
-    row[3].text = f'{round(DS[i],1):,}'
-    row[4].text = f'{round(ES[i]):,}'
-    row[5].text = f'{round(CS[i]):,}'
-    # Set alignment and line spacing
-    for cell in row:
-        cell.paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.RIGHT
-        cell.paragraphs[0].paragraph_format.line_spacing = 1.5
-# Remove rows with zero leaks
-for i in reversed(range(NL.size)):
-    if NL[i]==0:
-        table3._tbl.remove(table3.rows[i+1]._tr)
+# Add numbers to table 3, leaks by location and size, without rows of zero leaks
+leak = NL != 0
+summary = Leaks.group([AREA[leak], BIN[leak]], weights=NL[leak], DS=DS[leak], ES=ES[leak], CS=CS[leak])
+rows = []
+for i in range(summary.N.size):
+    rows.append([summary.keys[0][i], f'{int(summary.N[i]):,}', Leaks.LeakString[summary.keys[1][i]],
+                 f'{round(summary.DS[i],1):,}', f'{round(summary.ES[i]):,}', f'{round(summary.CS[i]):,}'])
+Inventory.fill(doc.tables[3], rows, footer=1, alignment=WD_ALIGN_PARAGRAPH.RIGHT)
 
-savefile(doc, iac.REC)
+savefile(doc, iac.REC, profile=hourly)
 
 # Caveats
+if before:
+    caveat("Savings are {0}% of the savings alone, because of ".format(iac.XF) + combine_words(before) + " on the same system.")
 caveat("Please change implementation cost references if necessary.")
\ No newline at end of file
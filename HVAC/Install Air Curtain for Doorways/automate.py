@@ -3,11 +3,15 @@ This script is used to generate the IAC recommendation for Install Air Curtain f
 """
 
 import json5, sys, os, num2words
+import numpy as np
+from copy import deepcopy
 from docx import Document
+from docx.enum.text import WD_ALIGN_PARAGRAPH
 from easydict import EasyDict
 from python_docx_replace import docx_replace, docx_blocks
 sys.path.append(os.path.join('..', '..'))
 from Shared.IAC import *
+from Shared import Savings, Geocode, DegreeHours
 
 # Load utility cost
 jsonDict = json5.load(open(os.path.join('..', '..', 'Utility.json5')))
@@ -16,86 +20,79 @@ jsonDict.update(json5.load(open('database.json5')))
 # Convert to easydict
 iac = EasyDict(jsonDict)
 
-## Constants
-# Correction Coefficient; kWh/MMBtu
-C1 = 293
-# Time correction; days per week
-TC = 5
-# Conversion constant; m/yr
-C2 = 6
-# Coincidence factor; %
-CF = 100
-# Conversion constant; KW/HP
-C3 = 0.746
+## Weather
+# Hours per year in each outside temperature bin when the doors of each group are open,
+# or the heat transfer chart of the database without weather data
+if iac.OT == '':
+  lat, lon = Geocode.lookup(iac.ZIP)
+  iac.update(DegreeHours.door_hours((lat, lon), iac.HRAC, iac.DY, iac.START, iac.WK))
+  graph, template = Savings.air_curtain, 'template.docx'
+else:
+  if np.any(iac.HEAT):
+    caveat("The heat transfer chart is for summer only, natural gas savings are not included.")
+  iac.HEAT = False
+  graph, template = Savings.air_curtain_chart, 'template chart.docx'
 
 ## Calculations
-# Total Heat transfer
-iac.HT = iac.HTF * iac.AMT
-# Summer heat transfer
-iac.SHT = round(iac.HT * (iac.DY / TC) * C1 * (iac.OT - iac.RT)) / iac.TDC
-# Summer operating hours for HVAC
-iac.OHS = round(iac.HRHV * iac.DY * iac.WK)
-# Total horsepower
-iac.HP = iac.HPF * iac.AMT
-# Summer operating hours for air curtains
-iac.OHAC = iac.HRAC * iac.DY * iac.WK
-# Electricity usage of the air curtain system
-iac.EU = round(iac.HP * C3 * iac.OHAC)
-# Demand usage for the air curtain system
-iac.DU = round(iac.HP * C3 * C2 * CF/100)
-
-## Table
-iac.AREA = iac.DW * iac.DH
-iac.TOTALAREA = iac.AREA * iac.AMT
+iac.update(Savings.scalarize(graph(**iac)))
+# Door groups
+GROUPS = np.broadcast_arrays(*[np.atleast_1d(iac[key]) for key in ['LOC', 'AMT', 'DW', 'DH', 'AREA', 'HRAC']])
 # Total # of doors
-if type(iac.AMT) == list:
-  iac.TOTALDOORS = sum(iac.AMT)
-else:
-  iac.TOTALDOORS = iac.AMT
-
-## Savings
-# Summer energy savings
-iac.SES = round(iac.SHT * (iac.EF/100 - iac.EFES/100))
-# Summer demand savings
-iac.SDS = round((iac.SES/iac.OHS) * C2 * CF/100)
-# Energy savings
-iac.ES = iac.SES - iac.EU
-# Demand savings
-iac.DS = iac.SDS - iac.DU
-# Energy cost savings
-iac.ECS = iac.ES * iac.EC
-# Demand cost savings
-iac.DCS = iac.DS * iac.DC
-# Annual cost savings
-iac.ACS = iac.ECS + iac.DCS
-
-## Implementation cost
-iac.IC = (iac.COST * iac.AMT) + iac.LABOR
+iac.TOTALDOORS = int(np.sum(GROUPS[1]))
+# Arrays of temperature bins are not in the report
+for key in ['TB', 'HB', 'WO', 'VA', 'QB', 'QL', 'CL', 'HL']:
+  iac.pop(key, None)
 
 ## Rebare
 iac = rebate(iac)
 
 ## Number to words
-iac.AMTSTR = num2words.num2words(iac.AMT)
-iac.HRSTR = num2words.num2words(iac.HRAC)
+iac.AMTSTR = num2words.num2words(iac.TOTALDOORS)
+HR = np.unique(GROUPS[5])
+if HR.size == 1:
+  iac.HRSTR = num2words.num2words(HR[0])
+else:
+  iac.HRSTR = num2words.num2words(HR[0]) + " to " + num2words.num2words(HR[-1])
+  iac.HRAC = str(HR[0]) + "-" + str(HR[-1])
 
 ## Format strings
 # set electricity cost to 3 digits accuracy
 iac = dollar(['EC', 'ERR'],iac,3)
 # set the natural gas and demand to 2 digits accuracy
-iac = dollar(['DC'],iac,2)
+iac = dollar(['DC', 'NGC'],iac,2)
 # set the rest to integer
-varList = ['ACS', 'IC', 'COST', 'LABOR', 'RB', 'MIC', 'MRB']
+varList = ['ACS', 'IC', 'COST', 'LABOR', 'RB', 'MIC', 'MRB', 'NPV', 'NGCS']
 iac = dollar(varList,iac,0)
 # Format all numbers to string with thousand separator
 iac = grouping_num(iac)
+# Natural gas terms of the annual cost savings, only if a space is heated
+HEAT = bool(np.any(iac.HEAT))
+if HEAT:
+  iac.NGTERM = " + (NGS × natural gas cost)"
+  iac.NGNUM = " + (" + iac.NGS + " MMBtu/yr × " + iac.NGC + "/MMBtu)"
+  iac.NGCSTR = " + " + iac.NGCS + "/yr"
+else:
+  iac.NGTERM = ""
+  iac.NGNUM = ""
+  iac.NGCSTR = ""
 
 # Import docx template
-doc = Document('template.docx')
+doc = Document(template)
+
+# Add door groups to table 1
+table = doc.tables[1]
+rows = len(table.rows) - 2
+for i in range(rows, len(GROUPS[0])):
+  table.rows[1]._tr.addnext(deepcopy(table.rows[1]._tr))
+for i in range(len(GROUPS[0])):
+  values = [str(GROUPS[0][i])] + ['{:,}'.format(int(x) if float(x).is_integer() else float(x)) for x in [GROUPS[1][i], GROUPS[2][i], GROUPS[3][i], GROUPS[4][i]]]
+  for j, cell in enumerate(table.rows[i+1].cells):
+    cell.text = values[j]
+    cell.paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER if j == 0 else WD_ALIGN_PARAGRAPH.RIGHT
 
 # Replacing keys
 docx_replace(doc, **iac)
-docx_blocks(doc, REBATE=iac.REB)
+docx_blocks(doc, REBATE=iac.REB, HEAT=HEAT)
 
 savefile(doc, iac.REC)
 
@@ -8,6 +8,7 @@ from easydict import EasyDict
 from python_docx_replace import docx_replace, docx_blocks
 sys.path.append(os.path.join('..', '..'))
 from Shared.IAC import *
+from Shared import Savings, Profile
 from docxcompose.composer import Composer
 import numpy as np
 import fractions
@@ -27,42 +28,15 @@ for i in iac:
         if len(iac[i]) != N:
             raise Exception('Length of {0} is not {1}.'.format(i, N))
 ## Covert to numpy array for element-wise operations
-nplist = ['TEMP', 'PTEMP', 'AMB', 'HR', 'DY', 'WK', 'SFA', 'AMB']
+nplist = ['TEMP', 'AMB', 'HR', 'DY', 'WK', 'SFA', 'SIZE', 'DIA']
 for i in nplist:
     iac[i] = np.array(iac[i])
-## Constants
-# Combined convective and radiative heat transfer coefficient; BTU/hr/Ft^2/Farenheit
-h = 0.8 
-# Conversion constant; Btu/hr
-C1 = 0.000293 
-
 ## Calculations
-# Operating Hours
-iac.OH = iac.HR * iac.DY * iac.WK
-# Temperature difference
-iac.TD = iac.TEMP - iac.AMB
-iac.PTD = iac.PTEMP - iac.AMB
-# Annual Heat Loss
-iac.AHL = np.rint(h * C1 * iac.SFA * (iac.TD - iac.PTD) * iac.OH)
-
-## Savings
-# Annual electricity savings
-iac.ES = np.sum(iac.AHL)
-# Annual demand savings
-iac.DS = np.round(np.sum(iac.AHL/iac.OH),1)
-# Annual cost savings
-iac.ECS = round(iac.ES * iac.EC)
-iac.DCS = round(iac.DS * iac.DC)
-iac.ACS = iac.ECS + iac.DCS
-
-## Implementation cost Estimate
-# Labor cost
-iac.LAB = np.array([iac.LABOR] * N)
-iac.EST = np.add(iac.COST, iac.LAB)
-# Installation cost
-iac.IC = np.sum(iac.SFA * iac.EST)
+iac.update(Savings.scalarize(Savings.insulate_bare_equipment(**iac)))
+
 # Rebate
-iac.PB = payback(iac.ACS, iac.IC.item())
+iac.PB = payback(iac.ACS, iac.IC)
+iac = lifecycle(iac)
 
 # Number to words
 iac.AMT = num2words.num2words(N)
@@ -88,13 +62,16 @@ def convert_fraction(n):
   myFrac_str = str(frac.numerator) + '/' + str(frac.denominator)
   return myFrac_str
 
+# Hourly electricity savings
+hourly = Profile.profile(iac.AHL, iac.HR, iac.DY, iac.WK)
+
 ## Format strings
 # set to 3 digits accuracy
 iac = dollar(['EC'],iac,3)
 # set to 2 digits accuracy
 iac = dollar(['DC'],iac,2)
 # set the rest to integer
-varList = ['DCS', 'ECS', 'ACS', 'IC']
+varList = ['DCS', 'ECS', 'ACS', 'IC', 'NPV']
 iac = dollar(varList,iac,0)
 # Format all numbers to string with thousand separator
 iac = grouping_num(iac)
@@ -163,7 +140,7 @@ for i in range(N+1):
     doc_tmp = Document('tmp'+str(i+1)+'.docx')
     composer.append(doc_tmp)
 
-savefile(composer, str(iac.REC))
+savefile(composer, str(iac.REC), profile=hourly)
 
 # delete temp files
 for i in range(N+2):
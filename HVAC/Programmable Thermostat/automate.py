@@ -8,6 +8,7 @@ from easydict import EasyDict
 from python_docx_replace import docx_replace, docx_blocks
 sys.path.append(os.path.join('..', '..'))
 from Shared.IAC import *
+from Shared import Savings, Geocode, DegreeHours
 
 # Load utility cost
 jsonDict = json5.load(open(os.path.join('..', '..', 'Utility.json5')))
@@ -16,36 +17,27 @@ jsonDict.update(json5.load(open('database.json5')))
 # Convert to easydict
 iac = EasyDict(jsonDict)
 
-# Constants
-C1 = 12000.0 # Conversion constant; 12,000 BTU/hr/ton
-C2 = 1000.0 # Conversion constant; kW/W
+## Degree hours
+# Each one left empty in the database is calculated from hourly weather of the plant location and the schedules
+missing = [key for key in ['CDH', 'MCDH', 'HDH', 'MHDH'] if iac.get(key, '') == '']
+if missing:
+    lat, lon = Geocode.lookup(iac.ZIP)
+    hours = DegreeHours.thermostat((lat, lon), iac.CST, iac.MCST, iac.HST, iac.MHST, iac.PHR, iac.PDY, iac.START,
+                                   iac.CHR, iac.CDY, iac.CWK)
+    for key in missing:
+        iac[key] = hours[key]
+
 # Calculations
-iac.PD = round(iac.TON * C1 * (iac.LF/100) / (iac.EER * C2))
-iac.OHE = iac.CHR * iac.CDY * iac.CWK
-iac.OHP = iac.PHR * iac.PDY * iac.PWK
-iac.ES = round(iac.PD * iac.OHE * (1 - iac.MCDH / iac.CDH))
-iac.NGS = round(iac.NGU * (1 - iac.MHDH / iac.HDH))
-if iac.COOL == True:
-    iac.ECS = round(iac.ES * iac.EC)
-else:
-    iac.ECS = 0
-if iac.HEAT == True:
-    iac.NGCS = round(iac.NGS * iac.NGC)
-else:
-    iac.NGCS = 0
-iac.ACS = iac.ECS + iac.NGCS
-# Implementation
-iac.MC = iac.PT * iac.NT
-iac.LB = round(iac.NT * iac.IT * iac.LR)
-iac.IC = iac.MC + iac.LB
+iac.update(Savings.scalarize(Savings.programmable_thermostat(**iac)))
 iac.PB = payback(iac.ACS, iac.IC)
+iac = lifecycle(iac)
 ## Format strings
 # set electricity cost to 3 digits accuracy
 iac = dollar(['EC'],iac,3)
 # set the natural gas and demand to 2 digits accuracy
 iac = dollar(['NGC', 'DC'],iac,2)
 # set the rest to integer
-varList = ['LR', 'PT', 'LB', 'MC', 'IC', 'ECS', 'NGCS', 'ACS']
+varList = ['LR', 'PT', 'LB', 'MC', 'IC', 'ECS', 'NGCS', 'ACS', 'NPV']
 iac = dollar(varList,iac,0)
 # Format all numbers to string with thousand separator
 iac = grouping_num(iac)
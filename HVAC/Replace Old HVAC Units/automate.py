@@ -8,8 +8,8 @@ from easydict import EasyDict
 from python_docx_replace import docx_replace, docx_blocks
 sys.path.append(os.path.join('..', '..'))
 from Shared.IAC import *
+from Shared import Savings, Inventory, Profile
 import numpy as np
-from docx.enum.text import WD_ALIGN_PARAGRAPH
 
 # Load utility cost
 jsonDict = json5.load(open(os.path.join('..', '..', 'Utility.json5')))
@@ -18,81 +18,60 @@ jsonDict.update(json5.load(open('database.json5')))
 # Convert to easydict
 iac = EasyDict(jsonDict)
 
+## Inventory
+# Units of an equipment inventory file, or the lists in the database
+if iac.INVENTORY:
+    # A single EERB or EERP in the database is used for units without one
+    defaults = {key: iac[key] for key in ['EERB', 'EERP'] if np.ndim(iac[key]) == 0}
+    defaults['AREA'] = ''
+    iac.update(Inventory.read(iac.INVENTORY, strings=['AREA'], numbers=['TON', 'AGE', 'EERB', 'EERP'], defaults=defaults))
+
 ## Calculations
-# Maintendance Factor
-if iac.FM == True:
-  iac.M = 0.01
-else:
-  iac.M = 0.03
 # Convert to numpy array
-iac.TON = np.array(iac.TON)
-iac.SIZE = iac.TON * 12000
-iac.AGE = np.array(iac.AGE)
-iac.EERB = np.array(iac.EERB)
-iac.EERC = np.round(iac.EERB * (1 - iac.M) ** np.fmin(iac.AGE, 15), 1)
-iac.EERP = np.array(iac.EERP)
-# Total Values
-iac.TTON = np.sum(iac.TON).item()
-iac.CC = np.sum(iac.SIZE).item()
-# Electrical Demand
-iac.CED = round(np.sum((iac.SIZE/1000 * iac.LF/100)/iac.EERC), 1)
-iac.PED = round(np.sum((iac.SIZE * 0.001 * iac.LF/100)/iac.EERP), 1)
-# Operating hours
-iac.OH = iac.HR * iac.DY * iac.WK
-# Power Reduction
-iac.PR = round(iac.CED - iac.PED, 1)
-# Savings
-iac.ES = round(iac.PR * iac.OH)
-iac.DS = round(iac.PR * iac.CF/100 * iac.CS)
-iac.ECS = round(iac.EC * iac.ES)
-iac.DCS = round(iac.DC * iac.DS)
-iac.ACS = iac.ECS + iac.DCS
-
-iac.IC = round(iac.TTON * iac.UC)
+for key in ['TON', 'AGE', 'EERB', 'EERP']:
+    iac[key] = np.array(iac[key])
+iac.update(Savings.scalarize(Savings.replace_hvac(**iac)))
+# Values of each unit for the table
+iac.EERB, iac.EERP = np.broadcast_arrays(iac.EERB, iac.EERP, iac.TON)[:2]
 
 # Rebate
 iac = rebate(iac)
 
+# Hourly electricity savings, the cooling season is centered on July
+hourly = Profile.profile(iac.ES, iac.HR, iac.DY, iac.WK, FIRST=29 - iac.WK / 2)
+
 ## Format strings
 # set to 3 digits accuracy
 iac = dollar(['EC', 'ERR'],iac,3)
 # set to 2 digits accuracy
 iac = dollar(['DC'],iac,2)
 # set the rest to integer
-varList = ['UC', 'ACS', 'IC', 'ECS', 'DCS', 'RB', 'MIC', 'MRB']
+varList = ['UC', 'ACS', 'IC', 'ECS', 'DCS', 'RB', 'MIC', 'MRB', 'NPV']
 iac = dollar(varList,iac,0)
 # Format all numbers to string with thousand separator
 iac = grouping_num(iac)
 
+# Columns of the units table, kept out of the keys to replace
+columns = ['AREA', 'TON', 'SIZE', 'AGE', 'EERB', 'EERC', 'EERP', 'ESi']
+units = {key: iac.pop(key) for key in columns}
+
 # Import docx template
 doc = Document('template.docx')
 
 # Replacing keys
 docx_replace(doc, **iac)
 
-## Adding table
-table = doc.tables[1]
-for i in range(len(iac.TON)):
-    row=table.rows[i+1].cells
-    row[0].text = iac.AREA[i]
-    row[1].text = iac.TON[i]
-    row[2].text = iac.SIZE[i]
-    row[3].text = iac.AGE[i]
-    row[4].text = iac.EERB[i]
-    row[5].text = iac.EERC[i]
-    row[6].text = iac.EERP[i]
-    # Set alignment and line spacing
-    for cell in row:
-        cell.paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
-# Remove rows with zero HVAC
-for i in reversed(range(len(iac.TON), 9)):
-  table._tbl.remove(table.rows[i+1]._tr)
-
 docx_blocks(doc, mtrue = iac.FM)
 docx_blocks(doc, mfalse = not iac.FM)
 docx_blocks(doc, REBATE = iac.REB)
 
-savefile(doc, iac.REC)
+## Adding table
+# One row per unit, the total row stays at the end
+# Added after replacing keys, so the long table is not searched for keys
+rows = zip(*[units[key] for key in columns])
+Inventory.fill(doc.tables[1], rows, footer=1)
+
+savefile(doc, iac.REC, profile=hourly)
 
 # Caveats
 caveat("Please change implementation cost references if necessary.")
\ No newline at end of file
@@ -8,6 +8,7 @@ from easydict import EasyDict
 from python_docx_replace import docx_replace, docx_blocks
 sys.path.append(os.path.join('..', '..'))
 from Shared.IAC import *
+from Shared import Savings, Occupancy, Profile
 from docxcompose.composer import Composer
 import numpy as np
 
@@ -30,27 +31,28 @@ nplist = ['LED', 'CFW', 'HR', 'DY', 'WK', 'FR']
 for i in nplist:
     iac[i] = np.array(iac[i])
 
-## Constants
-# Conversion constant; W/kW
-C1 = 1000 
+## Occupancy loggers
+# Occupied and lights on hours of the areas with a logger, the other areas keep the values in the database
+if iac.LOG:
+    log = Occupancy.profile(iac.LOG)
+    iac.HR = iac.HR.astype(float)
+    names = [loc.strip().lower() for loc in iac.LOC]
+    for j, area in enumerate(log.AREA):
+        if area.lower() not in names:
+            raise Exception('Logger area {0} is not in LOC.'.format(area))
+        i = names.index(area.lower())
+        if np.isfinite(log.ONW[j]):
+            # Lights on hours from the light logger, occupied share of the lights on hours
+            iac.HR[i] = round(log.ONW[j] / iac.DY[i], 1)
+            iac.FR[i] = round(log.OCCONW[j] / log.ONW[j] * 100)
+        else:
+            # Occupied share of the scheduled hours
+            iac.FR[i] = round(min(log.OCCW[j] / (iac.HR[i] * iac.DY[i]), 1) * 100)
+        print('{0}: {1:.1f} days logged, occupied hours per week {2:.1f} (Mon-Sun {3}), FR {4}%'.format(
+            iac.LOC[i], log.DAYS[j], log.OCCW[j], ', '.join(f'{h:.1f}' for h in log.OCC[j]), iac.FR[i]))
 
 ## Calculations
-# Operating Hours
-iac.OH = iac.HR * iac.DY * iac.WK
-
-## Savings
-# Annual electricity savings
-iac.ESi = np.rint((iac.LED * iac.CFW * iac.OH * (100/100 - iac.FR/100))/ C1)
-# Total Energy Savings
-iac.ES = np.sum(iac.ESi)
-# Annual cost savings
-iac.ACS = iac.ES * iac.EC
-
-## Implementation cost Estimate
-# Total cost for all sensors
-iac.TCOST = iac.COST * N
-iac.TLABOR = iac.LABOR * N
-iac.IC = iac.TCOST + iac.TLABOR
+iac.update(Savings.scalarize(Savings.motion_sensor(**iac)))
 
 # Rebate
 iac = rebate(iac)
@@ -63,11 +65,14 @@ for i in range(N):
 # Number to words
 iac.NUM = num2words.num2words(N)
 
+# Hourly electricity savings
+hourly = Profile.profile(iac.ESi, iac.HR, iac.DY, iac.WK)
+
 ## Format strings
 # set to 3 digits accuracy
 iac = dollar(['EC','ERR'],iac,3)
 # set the rest to integer
-varList = ['COST', 'LABOR', 'TCOST', 'TLABOR', 'ACS', 'IC', 'RB', 'MIC', 'MRB']
+varList = ['COST', 'LABOR', 'TCOST', 'TLABOR', 'ACS', 'IC', 'RB', 'MIC', 'MRB', 'NPV']
 iac = dollar(varList,iac,0)
 # Format all numbers to string with thousand separator
 iac = grouping_num(iac)
@@ -115,7 +120,7 @@ for i in range(N+1):
     doc_tmp = Document('tmp'+str(i+1)+'.docx')
     composer.append(doc_tmp)
 
-savefile(composer, str(iac.REC))
+savefile(composer, str(iac.REC), profile=hourly)
 
 # delete temp files
 for i in range(N+2):
@@ -8,6 +8,7 @@ from easydict import EasyDict
 from python_docx_replace import docx_replace, docx_blocks
 sys.path.append(os.path.join('..', '..')) 
 from Shared.IAC import *
+from Shared import Savings, Profile
 from docxcompose.composer import Composer
 import numpy as np
 
@@ -32,29 +33,8 @@ nplist = ['CN', 'CPR', 'CHR', 'CDY', 'CWK', 'PN', 'PPR', 'PHR', 'PDY', 'PWK', 'B
 for i in nplist:
     iac[i] = np.array(iac[i])
 
-# Calculate operating hours
-iac.COH = iac.CHR * iac.CDY * iac.CWK
-iac.POH = iac.PHR * iac.PDY * iac.PWK
-# Calculate electricity savings
-iac.ESi = np.rint((iac.CN * iac.CPR * iac.COH - iac.PN * iac.PPR * iac.POH) / 1000.0).astype(np.int64)
-iac.ES = np.sum(iac.ESi)
-iac.ECS = np.rint(iac.ES * iac.EC).astype(np.int64)
-# Calculate demand savings
-iac.DSi = np.rint((iac.CN * iac.CPR - iac.PN * iac.PPR) * (iac.CF/100) * 12.0 / 1000.0).astype(np.int64)
-iac.DS = np.sum(iac.DSi)
-iac.DCS = np.rint(iac.DS * iac.DC).astype(np.int64)
-
-# Calculate bulb cost
-iac.BCi = np.rint(iac.PN * iac.BP).astype(np.int64)
-iac.BC = np.sum(iac.BCi)
-# Calculate labor cost
-iac.LCi = np.rint(iac.CN * iac.BL).astype(np.int64)
-iac.LC = np.sum(iac.LCi)
-# Calculate implementation cost
-iac.LN = np.sum(iac.CN)
-iac.MSC = iac.MSN * iac.MSPL
-iac.IC = iac.MSC + iac.BC + iac.LC
-iac.ACS = iac.ECS + iac.DCS
+# Calculate savings and implementation cost
+iac.update(Savings.scalarize(Savings.led(**iac)))
 
 # Rebate
 iac = rebate(iac)
@@ -70,13 +50,16 @@ if iac.MSN == 0:
 else:
     MS = True
 
+# Hourly electricity savings
+hourly = Profile.profile(iac.ES, iac.CHR, iac.CDY, iac.CWK)
+
 ## Format strings
 # set electricity cost / rebate to 3 digits accuracy
 iac = dollar(['EC', 'ERR'],iac,3)
 # set the natural gas and demand to 2 digits accuracy
 iac = dollar(['NGC', 'DC'],iac,2)
 # set the rest to integer
-varList = ['LR', 'MSPL', 'ECS', 'DCS', 'ACS', 'MSC', 'BC', 'LC', 'IC', 'RB', 'MRB', 'MIC']
+varList = ['LR', 'MSPL', 'ECS', 'DCS', 'ACS', 'MSC', 'BC', 'LC', 'IC', 'RB', 'MRB', 'MIC', 'NPV']
 iac = dollar(varList,iac,0)
 # Format all numbers to string with thousand separator
 iac = grouping_num(iac)
@@ -159,7 +142,7 @@ for i in range(N+1):
     doc_tmp = Document('tmp'+str(i+1)+'.docx')
     composer.append(doc_tmp)
 
-savefile(composer, str(iac.REC))
+savefile(composer, str(iac.REC), profile=hourly)
 
 # delete temp files
 for i in range(N+2):
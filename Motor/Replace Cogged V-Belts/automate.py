@@ -8,7 +8,7 @@ from easydict import EasyDict
 from python_docx_replace import docx_replace
 sys.path.append(os.path.join('..', '..')) 
 from Shared.IAC import *
-import numpy as np
+from Shared import Savings, Inventory, Profile
 
 # Load utility cost
 jsonDict = json5.load(open(os.path.join('..', '..', 'Utility.json5')))
@@ -18,25 +18,37 @@ jsonDict.update(json5.load(open('database.json5')))
 iac = EasyDict(jsonDict)
 
 ## Calculations
-# Operating hours
-iac.OH = iac.HR * iac.DY * iac.WK
-
-## Savings
-# Annual Energy Savings
-iac.ES = round(iac.HP * 0.746 * iac.LF/100 * iac.OH * ((1.5/100)/(iac.ETA/100)))
-# Annual Demand Savings
-iac.DS = round(iac.HP * 0.746 * iac.LF/100 * iac.CF/100 * 12 * ((1.5/100)/(iac.ETA/100)))
-# Estimated Cost Savings
-iac.ECS = round(iac.ES * iac.EC)
-# Demand Cost Savings
-iac.DCS = round(iac.DS * iac.DS)
-# Total Cost Savings
-iac.ACS = iac.ECS + iac.DCS
-# Total Installation Cost
-iac.IC = iac.CBELT * iac.AMT
+if iac.INVENTORY:
+    # Fleet mode, the savings of all motors of an inventory file are calculated at once
+    columns = ['HP', 'ETA', 'LF', 'HR', 'DY', 'WK', 'CBELT', 'AMT']
+    # Values in the database are used for motors without one, HP is required
+    defaults = {key: iac[key] for key in columns[1:]}
+    defaults['MT'] = ''
+    motors = Inventory.read(iac.INVENTORY, strings=['MT'], numbers=columns, defaults=defaults)
+    res = Savings.cogged_v_belts(**{**iac, **motors})
+    # Motors that pay back within PBMAX years, shortest payback first
+    index = Inventory.rank(res.PB, iac.PBMAX)
+    if index.size == 0:
+        raise Exception("No motor in " + iac.INVENTORY + " pays back within " + str(iac.PBMAX) + " years.")
+    rows = [[motors.MT[i], f'{motors.HP[i]:g}', f'{motors.LF[i]:g}', f'{res.OH[i]:,.0f}', f'{motors.AMT[i]:g}',
+             f'{res.ES[i]:,.0f}', f'{res.DS[i]:,.0f}', f'${res.ACS[i]:,.0f}', f'${res.IC[i]:,.0f}',
+             payback(res.ACS[i], res.IC[i])] for i in index]
+    iac.NUMI = motors.HP.size
+    iac.NUM = index.size
+    # The recommendation is the total of the ranked motors
+    iac.update(Savings.scalarize(Inventory.total({**motors, **res}, index, ['HP', 'AMT', 'ES', 'DS', 'ECS', 'DCS', 'ACS', 'IC'])))
+else:
+    iac.update(Savings.scalarize(Savings.cogged_v_belts(**iac)))
 
 ## Rebate
 iac.PB = payback(iac.ACS, iac.IC)
+iac = lifecycle(iac)
+
+# Hourly electricity savings, of each ranked motor in fleet mode
+if iac.INVENTORY:
+    hourly = Profile.profile(res.ES[index], motors.HR[index], motors.DY[index], motors.WK[index])
+else:
+    hourly = Profile.profile(iac.ES, iac.HR, iac.DY, iac.WK)
 
 ## Format strings
 # set electricity cost / rebate to 3 digits accuracy
@@ -44,18 +56,26 @@ iac = dollar(['EC'],iac,3)
 # set demand to 2 digits accuracy
 iac = dollar(['DC'],iac,2)
 # set the rest to integer
-varList = ['ACS', 'ECS', 'DCS', 'CBELT', 'IC']
+varList = ['ACS', 'ECS', 'DCS', 'CBELT', 'IC', 'NPV']
 iac = dollar(varList,iac,0)
 # Format all numbers to string with thousand separator
 iac = grouping_num(iac)
 
 # Import docx template
-doc = Document('template.docx')
+doc = Document('template fleet.docx' if iac.INVENTORY else 'template.docx')
 
 # Replacing keys
 docx_replace(doc, **iac)
 
-savefile(doc, iac.REC)
+## Adding table
+# One row per ranked motor, the total row stays at the end
+# Added after replacing keys, so the long table is not searched for keys
+if iac.INVENTORY:
+    Inventory.fill(doc.tables[1], rows, footer=1)
+
+savefile(doc, iac.REC, profile=hourly)
 
 # Caveats
+if iac.INVENTORY:
+    print("{0} of {1} motors pay back within {2} years.".format(iac.NUM, iac.NUMI, iac.PBMAX))
 caveat("Please change implementation cost references if necessary.")
\ No newline at end of file
@@ -8,7 +8,7 @@ from easydict import EasyDict
 from python_docx_replace import docx_replace, docx_blocks
 sys.path.append(os.path.join('..', '..')) 
 from Shared.IAC import *
-import numpy as np
+from Shared import Savings, Logger, Inventory, Profile
 
 # Load utility cost
 jsonDict = json5.load(open(os.path.join('..', '..', 'Utility.json5')))
@@ -17,36 +17,51 @@ jsonDict.update(json5.load(open('database.json5')))
 # Convert to easydict
 iac = EasyDict(jsonDict)
 
-## VFD table
-Load = np.linspace(20, 100, num=17)
-VFD = np.array([5, 6, 8, 11, 14, 17, 21, 26, 32, 38, 44, 50, 57, 64, 73, 86, 105])
+## Data logger
+# Average the part load curve over the load duration histogram of an amp or kW logger instead of a single load fraction
+if iac.LOG and not iac.INVENTORY:
+    log = Logger.histogram(iac.LOG, iac.COL, iac.FULL)
+    iac.LFB, iac.DUR = log.LFB, log.DUR
+    iac.LF = round(log.LF)
+    print("Load duration (% of time) at " + ', '.join(f'{l:g}%: {t:.1f}' for l, t in zip(log.LFB, log.DUR) if t > 0))
 
 ## Calculations
-# Operating hours
-iac.OH = iac.HR * iac.DY * iac.WK
-# Power FRaction with VFD
-iac.FR = round(np.interp(iac.LF, Load, VFD).item())
-# Current Power Draw
-iac.CPD = round((iac.HP * 0.746) / (iac.ETAE/100))
-# Proposed Power Draw
-iac.PPD = round((iac.HP * 0.746 * (iac.FR/100)) / (iac.ETAP/100))
-
-## Savings
-# Annual Energy Savings
-iac.ES = (iac.CPD - iac.PPD) * iac.OH
-# Annual Demand Savings
-iac.DS = (iac.CPD - iac.PPD) * (iac.CF/100) * 12
-# Estimated Cost Savings
-iac.ECS = round(iac.ES * iac.EC)
-# Demand Cost Savings
-iac.DCS = round(iac.DS * iac.DC)
-# Total Cost Savings
-iac.ACS = iac.ECS + iac.DCS
-# Total Installation Cost
-iac.IC = iac.VFD + iac.AIC
+if iac.INVENTORY:
+    # Fleet mode, the savings of all motors of an inventory file are calculated at once
+    columns = ['HP', 'LF', 'HR', 'DY', 'WK', 'ETAE', 'ETAP', 'VFD', 'AIC']
+    # Values in the database are used for motors without one, HP is required
+    defaults = {key: iac[key] for key in columns[1:]}
+    defaults['MT'] = ''
+    motors = Inventory.read(iac.INVENTORY, strings=['MT'], numbers=columns, defaults=defaults)
+    res = Savings.motor_vfd(**{**iac, **motors})
+    # Motors that pay back within PBMAX years after rebate, shortest payback first
+    index = Inventory.rank(res.MPB, iac.PBMAX)
+    if index.size == 0:
+        raise Exception("No motor in " + iac.INVENTORY + " pays back within " + str(iac.PBMAX) + " years.")
+    rows = [[motors.MT[i], f'{motors.HP[i]:g}', f'{motors.LF[i]:g}', f'{res.OH[i]:,.0f}', f'{res.FR[i]:g}',
+             f'{res.ES[i]:,.0f}', f'{res.DS[i]:,.0f}', f'${res.ACS[i]:,.0f}', f'${res.MIC[i]:,.0f}',
+             payback(res.ACS[i], res.MIC[i])] for i in index]
+    iac.NUMI = motors.HP.size
+    iac.NUM = index.size
+    # The recommendation is the total of the ranked motors
+    # Rebates are capped per motor, so the totals of the rebates are used as is
+    keys = ['HP', 'ES', 'DS', 'ECS', 'DCS', 'ACS', 'IC', 'RB', 'MRB', 'MIC']
+    iac.update(Savings.scalarize(Inventory.total({**motors, **res}, index, keys)))
+else:
+    iac.update(Savings.scalarize(Savings.motor_vfd(**iac)))
 
 ## Rebate
-iac = rebate(iac)
+if iac.INVENTORY:
+    iac.MPB = payback(iac.ACS, iac.MIC)
+    iac = lifecycle(iac)
+else:
+    iac = rebate(iac)
+
+# Hourly electricity savings, of each ranked motor in fleet mode
+if iac.INVENTORY:
+    hourly = Profile.profile(res.ES[index], motors.HR[index], motors.DY[index], motors.WK[index])
+else:
+    hourly = Profile.profile(iac.ES, iac.HR, iac.DY, iac.WK)
 
 ## Format strings
 # set electricity cost / rebate to 3 digits accuracy
@@ -54,20 +69,30 @@ iac = dollar(['EC', 'ERR'],iac,3)
 # set demand to 2 digits accuracy
 iac = dollar(['DC'],iac,2)
 # set the rest to integer
-varList = ['ACS', 'ECS', 'DCS', 'VFD', 'AIC', 'IC', 'RB', 'MRB', 'MIC']
+varList = ['ACS', 'ECS', 'DCS', 'VFD', 'AIC', 'IC', 'RB', 'MRB', 'MIC', 'NPV']
 iac = dollar(varList,iac,0)
 # Format all numbers to string with thousand separator
 iac = grouping_num(iac)
 
 # Import docx template
-doc = Document('template.docx')
+doc = Document('template fleet.docx' if iac.INVENTORY else 'template.docx')
 
 docx_blocks(doc, REBATE=iac.REB)
 
 # Replacing keys
 docx_replace(doc, **iac)
 
-savefile(doc, iac.REC)
+## Adding table
+# One row per ranked motor, the total row stays at the end
+# Added after replacing keys, so the long table is not searched for keys
+if iac.INVENTORY:
+    Inventory.fill(doc.tables[2], rows, footer=1)
+
+savefile(doc, iac.REC, profile=hourly)
 
 # Caveats
+if iac.INVENTORY:
+    print("{0} of {1} motors pay back within {2} years.".format(iac.NUM, iac.NUMI, iac.PBMAX))
+elif iac.LOG:
+    caveat("The equipment was on {0:.0f}% of the logged time, please check the operating hours.".format(log.ON))
 caveat("Please change implementation cost references if necessary.")
\ No newline at end of file
@@ -8,6 +8,7 @@ from easydict import EasyDict
 from python_docx_replace import docx_replace, docx_blocks
 sys.path.append(os.path.join('..', '..'))
 from Shared.IAC import *
+from Shared import Savings, Tariff
 from datetime import datetime
 
 # Load utility cost
@@ -51,11 +52,30 @@ elif iac.STATE == "NJ":
 else:
     raise Exception("State is not supported yet.")
 
+# Interval data, the current tariff and the cheapest offer are evaluated against the same load
+if iac.INTERVAL:
+    if iac.TYPE != "electricity":
+        raise Exception("Interval data is only supported for electricity.")
+    load = Tariff.read(iac.INTERVAL, iac.TIME, iac.KW)
+    current = iac.CURRENT if iac.CURRENT else {'NAME': 'Current', 'EC': iac.EC, 'DC': iac.DC}
+    res = Tariff.evaluate(load, [current] + iac.OFFERS)
+    # Offers only, the first tariff is the current one
+    index = Tariff.rank(res)
+    index = index[index > 0]
+    # Average price of all charges of the tariffs, per kWh
+    iac.EU = round(res.AKWH)
+    iac.CEC = res.ANNUAL[0] / res.AKWH
+    iac.PEC = res.ANNUAL[index[0]] / res.AKWH
+    iac.OFFER = res.NAME[index[0]]
+    for i in [0] + list(index):
+        print("{0}: ${1:,.0f}/yr, ${2:.4f}/kWh".format(res.NAME[i], res.ANNUAL[i], res.ANNUAL[i] / res.AKWH))
+
 if iac.CEC <= iac.PEC:
     raise Exception("Proposed energy cost is higher than current energy cost.")
 
 # Savings
-iac.ACS = iac.EU * (iac.CEC - iac.PEC)
+iac.update(Savings.scalarize(Savings.negotiate_energy_charge(**iac)))
+iac = lifecycle(iac)
 
 ## Format strings
 if iac.TYPE == "electricity":
@@ -63,7 +83,7 @@ if iac.TYPE == "electricity":
 else:
     iac = dollar(['CEC','PEC'],iac,2)
 # set the rest to integer
-varList = ['ACS']
+varList = ['ACS', 'NPV']
 iac = dollar(varList,iac,0)
 # Format all numbers to string with thousand separator
 iac = grouping_num(iac)
@@ -80,4 +100,8 @@ else:
 # Replacing keys
 docx_replace(doc, **iac)
 
-savefile(doc, iac.REC)
\ No newline at end of file
+savefile(doc, iac.REC)
+
+# Caveats
+if iac.INTERVAL:
+    caveat("The cheapest offer is {0}. CEC and PEC are the average prices of all charges of the tariffs, please check the tariffs.".format(iac.OFFER))
\ No newline at end of file
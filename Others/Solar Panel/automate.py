@@ -9,7 +9,8 @@ from docx.enum.text import WD_ALIGN_PARAGRAPH
 from python_docx_replace import docx_replace
 sys.path.append(os.path.join('..', '..')) 
 from Shared.IAC import *
-import requests, datetime
+from Shared import Savings, PVWatts, PV, Geocode
+import datetime
 
 # Load utility cost
 jsonDict = json5.load(open(os.path.join('..', '..', 'Utility.json5')))
@@ -29,48 +30,35 @@ else:
     pass
 
 # Calculations
-# Avaialble space ft2
-iac.AS = round(iac.RS * iac.ASR / 100)
-# Capacity kW
-iac.CAP = round(iac.AS / 100)
-# Approx. energy savings, kWh
-iac.AES = iac.CAP * 1200
+# Avaialble space ft2 and capacity kW
+iac.update(Savings.scalarize(Savings.solar_panel(**iac)))
 
-# PVWatts API
-parameters = {
-'format': 'json',
-'api_key': iac.api,
-'system_capacity': iac.CAP,
-'module_type': 0,
-'losses': 14.08,
-'array_type': 0,
-'tilt': 20,
-'azimuth': 180,
-'address': iac.ZIP,
-}
-
-try:
-    response = requests.request('GET', 'https://developer.nrel.gov/api/pvwatts/v8.json', params=parameters)
-    PVresults = response.json()
-    iac.ES = round(PVresults.get('outputs').get('ac_annual'))
+solard_monthly = ac_monthly = None
+if iac.TMY:
+    # Local estimate from TMY hourly data
+    tmy = PV.read_tmy(iac.TMY)
+    PVresults = PV.estimate(tmy, iac.CAP)
+    optimal = PV.best(tmy, iac.CAP)
+    print('Optimal tilt ' + str(optimal.tilt) + ' and azimuth ' + str(optimal.azimuth) + ' would generate ' + str(round(optimal.ac_annual)) + ' kWh/yr')
+else:
+    # PVWatts API, cached by parameters
+    lat, lon = Geocode.lookup(iac.ZIP)
+    try:
+        PVresults = PVWatts.query(iac.api, iac.CAP, lat=lat, lon=lon)
+    except PVWatts.PVWattsError as e:
+        print(str(e) + ' Please look up the annual energy savings manually on PVWatts website, or provide a TMY file')
+        PVresults = None
+        # input number
+        iac.ES = int(input('Manually input annual energy savings (kWh): '))
+if PVresults is not None:
+    iac.ES = round(PVresults.ac_annual)
     # read solard_monthly and ac_monthly
-    solard_monthly = PVresults.get('outputs').get('solrad_monthly')
-    ac_monthly = PVresults.get('outputs').get('ac_monthly')
-except:
-    print('PVWatts API error. Please look up the annual energy savings manually on PVWatts website')
-    # input number
-    iac.ES = int(input('Manually input annual energy savings (kWh): '))
-
-iac.ACSel = round(iac.ES * iac.EC)
-iac.credits = round(iac.ES / 1000)
-iac.ACSsr = round(iac.AMV * iac.credits)
-iac.ACS = iac.ACSel + iac.ACSsr
+    solard_monthly = PVresults.solrad_monthly
+    ac_monthly = PVresults.ac_monthly
 
-# Implementation cost
-iac.IC = round(iac.CAP * iac.PPW * 1000)
-iac.ITC = round(iac.IC * iac.ITCR / 100)
-iac.MIC = iac.IC - iac.ITC
+iac.update(Savings.scalarize(Savings.solar_panel(**iac)))
 iac.PB = payback(iac.ACS, iac.MIC)
+iac = lifecycle(iac)
 iac.CM = datetime.datetime.now().strftime('%B %Y')
 
 ## Format strings
@@ -79,7 +67,7 @@ iac = dollar(['EC'],iac,3)
 # set the natural gas and demand to 2 digits accuracy
 iac = dollar(['NGC', 'DC', 'PPW'],iac,2)
 # set the rest to integer
-varList = ['LR', 'MIC', 'IC', 'ITC', 'AMV', 'ACSel', 'ACSsr', 'ACS']
+varList = ['LR', 'MIC', 'IC', 'ITC', 'AMV', 'ACSel', 'ACSsr', 'ACS', 'NPV']
 iac = dollar(varList,iac,0)
 # Format all numbers to string with thousand separator
 iac = grouping_num(iac)
@@ -91,19 +79,20 @@ docx_replace(doc, **iac)
 
 # Set local to US
 locale.setlocale(locale.LC_ALL, 'en_US')
-# Fill in the second table
+# Fill in the second table, if monthly results are available
 table = doc.tables[1]
-for i in range(12):
-    table.cell(i+1, 1).text = str(round(solard_monthly[i],2))
-    table.cell(i+1, 1).paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.RIGHT
-    table.cell(i+1, 2).text = locale.format_string('%d',round(ac_monthly[i]), grouping=True)
-    table.cell(i+1, 2).paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.RIGHT
-table.cell(13, 1).text = str(round(sum(solard_monthly)/12,2))
-table.cell(13, 1).paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.RIGHT
-table.cell(13, 1).paragraphs[0].runs[0].bold = True
-table.cell(13, 2).text = locale.format_string('%d',round(sum(ac_monthly)), grouping=True)
-table.cell(13, 2).paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.RIGHT
-table.cell(13, 2).paragraphs[0].runs[0].bold = True
+if ac_monthly is not None:
+    for i in range(12):
+        table.cell(i+1, 1).text = str(round(solard_monthly[i],2))
+        table.cell(i+1, 1).paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.RIGHT
+        table.cell(i+1, 2).text = locale.format_string('%d',round(ac_monthly[i]), grouping=True)
+        table.cell(i+1, 2).paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.RIGHT
+    table.cell(13, 1).text = str(round(sum(solard_monthly)/12,2))
+    table.cell(13, 1).paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.RIGHT
+    table.cell(13, 1).paragraphs[0].runs[0].bold = True
+    table.cell(13, 2).text = locale.format_string('%d',round(sum(ac_monthly)), grouping=True)
+    table.cell(13, 2).paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.RIGHT
+    table.cell(13, 2).paragraphs[0].runs[0].bold = True
 
 savefile(doc, iac.REC, add=True)
 
@@ -0,0 +1,59 @@
+import csv
+import numpy as np
+from easydict import EasyDict
+
+def AFR(CAT, FGT, XO2):
+    """
+    Extracted from Algorithm Document for PHASTEx
+    Returns available heat, %
+    Accepts scalars or numpy arrays (broadcast element-wise)
+    Invalid entries (excessive oxygen out of 0-22%, available heat out of 0-100%, nan) are masked instead of raising
+    param CAT: combution air temperature, degF
+    param FGT: flue gas temperature, degF
+    param XO2: excessive oxygen, %
+    param XAir: excessive air, %
+    return: numpy masked array
+    """
+    CAT, FGT, XO2 = np.broadcast_arrays(*[np.asarray(x, dtype=float) for x in [CAT, FGT, XO2]])
+    invalid = ~((XO2 >= 0) & (XO2 <= 22))
+    XO2 = np.where(invalid, 0, XO2) / 100
+    XAir = 8.52381 * XO2 / (2 - (9.52381 * XO2))
+    Cp = 0.0178285179931519 + 0.00000255632 * CAT
+    Heat = 95 - 0.025 * FGT
+    XAirCorr = -(-1.078914 + Cp * FGT) * XAir
+    PhtAirCorr = (-1.078914 + Cp * CAT) * (1 + XAir)
+    AH = Heat + XAirCorr + PhtAirCorr
+    invalid = invalid | ~((AH >= 0) & (AH <= 100))
+    return np.ma.masked_array(np.where(invalid, 0, AH), mask=invalid)
+
+def read_log(path: str) -> dict:
+    """
+    Read a combustion analyzer log
+    :param path: CSV file with a header row, columns EQUIP (boiler name), O2 (%), FGT (degF) and CAT (degF)
+    :return: EasyDict of columns, EQUIP is an array of strings, the others are float arrays
+    """
+    rows = list(csv.DictReader(open(path, newline='')))
+    log = EasyDict()
+    log.EQUIP = np.array([row['EQUIP'].strip() for row in rows])
+    for key in ['O2', 'FGT', 'CAT']:
+        # Empty readings are nan
+        log[key] = np.array([float(row[key]) if row[key].strip() else np.nan for row in rows])
+    return log
+
+def averages(log: dict, EQUIP: list) -> dict:
+    """
+    Average readings of each boiler, invalid readings are excluded
+    :param log: Analyzer log from read_log()
+    :param EQUIP: List of boiler names
+    :return: EasyDict with O2, FGT, CAT arrays in the order of EQUIP, and N (number of valid readings)
+    """
+    valid = ~np.ma.getmaskarray(AFR(log.CAT, log.FGT, log.O2))
+    # Boiler x reading
+    member = (log.EQUIP[None, :] == np.asarray(EQUIP)[:, None]) & valid
+    res = EasyDict()
+    res.N = np.sum(member, axis=1)
+    if np.any(res.N == 0):
+        raise Exception("No valid readings of " + ', '.join(np.asarray(EQUIP)[res.N == 0]) + ".")
+    for key in ['O2', 'FGT', 'CAT']:
+        res[key] = np.sum(np.where(member, log[key], 0), axis=1) / res.N
+    return res
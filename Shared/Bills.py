@@ -0,0 +1,384 @@
+"""
+(Purpose) Bills.py reads the utility bills of Energy Charts.xlsx and writes the statistics to Utility.json5
+The workbook is opened read-only and streamed, only the rows and columns of the named cells are read.
+Totals, unit costs and MMBtu are computed from the raw monthly rows, so the workbook doesn't need to be saved by Excel,
+the cached values of the formulas are only used as a cross-check.
+Bills of any number of accounts and months can also be ingested from CSV or XLSX files into a columnar store
+(one numpy array per column, saved as .npz), then the trailing 12 months are aggregated by fuel.
+Utility.json5 is updated in a single pass, comments and the order of keys are preserved.
+"""
+
+import json, re
+import numpy as np
+import pandas as pd
+import openpyxl
+from easydict import EasyDict
+from openpyxl.utils.cell import range_boundaries
+
+# Path of the workbook and the bill store, relative to the root directory
+WORKBOOK = ('Energy Charts', 'Energy Charts.xlsx')
+STORE = ('Energy Charts', 'Bills.npz')
+# First monthly row of the Raw Data worksheet, the total row follows the last month
+FIRST = 7
+
+def layout(months: int=12) -> dict:
+    """
+    Named cells of the workbook by worksheet
+    :param months: Number of monthly rows of the Raw Data worksheet
+    :return: Dictionary of worksheet name: {name: cell}
+    """
+    total = FIRST + months
+    return {
+        'Raw Data': {
+            # Unit costs
+            'EC': 'D' + str(total + 2), 'DC': 'D' + str(total + 4), 'FC': 'D' + str(total + 5),
+            # Fuel type and unit
+            'FuelType': 'Q2', 'FuelUnit': 'Q3',
+            # First and last billing month
+            'StartMo': 'B' + str(FIRST), 'EndMo': 'B' + str(total - 1),
+            # Totals of the billing months
+            'TotalEkWh': 'C' + str(total), 'TotalDkW': 'E' + str(total), 'Fees': 'G' + str(total),
+            'TotalEBtu': 'I' + str(total), 'TotalFBtu': 'M' + str(total),
+        },
+        'Total Energy': {
+            'ECost': 'E5', 'DCost': 'E6', 'TotalFCost': 'E7', 'TotalBtu': 'D8', 'TotalCost': 'E8',
+        },
+    }
+
+# Named cells of the 12-month workbook
+CELLS = layout()
+
+def raw(months: int=12) -> dict:
+    """
+    Raw inputs of the workbook, no formulas
+    :param months: Number of monthly rows of the Raw Data worksheet
+    """
+    last = str(FIRST + months - 1)
+    return {
+        'Raw Data': {
+            # kWh, usage charge, kW, demand charge, (fees), total charge of each month
+            'Electricity': 'C' + str(FIRST) + ':H' + last,
+            # Fuel usage, (MMBtu), cost of each month
+            'Fuel': 'L' + str(FIRST) + ':N' + last,
+            'FuelType': 'Q2', 'FuelUnit': 'Q3', 'Start': 'Q5',
+            # MMBtu per unit of each fuel
+            'Factors': 'P6:W14',
+        },
+    }
+
+# Columns of bill files, case-insensitive. Account, Fuel, Month, Usage and Cost are required
+COLUMNS = {'account': 'ACCOUNT', 'fuel': 'FUEL', 'unit': 'UNIT', 'month': 'MONTH', 'usage': 'USAGE',
+           'demand': 'DEMAND', 'usage charge': 'UC', 'demand charge': 'DCH', 'cost': 'COST'}
+
+# Source MMBtu per kWh, 33% efficiency of power plants
+EBTU = 0.003412 / 0.33
+MONTHS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+def extract(path: str, cells: dict) -> dict:
+    """
+    Extract cached values of cells from a workbook in one read-only pass per worksheet
+    :param path: Path of the .xlsx file
+    :param cells: Dictionary of worksheet name: {name: cell or range}, e.g. {'Raw Data': {'EC': 'D21', 'E': 'B7:I19'}}
+    :return: Dictionary of name: value, a range is a list of rows (tuples of values)
+    """
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    res = {}
+    try:
+        for sheet, names in cells.items():
+            # Bounding box of all cells of the worksheet
+            bounds = {name: range_boundaries(ref if ':' in ref else ref + ':' + ref) for name, ref in names.items()}
+            minCol = min(b[0] for b in bounds.values())
+            minRow = min(b[1] for b in bounds.values())
+            maxCol = max(b[2] for b in bounds.values())
+            maxRow = max(b[3] for b in bounds.values())
+            # Stream the rows of the bounding box once
+            rows = list(wb[sheet].iter_rows(min_row=minRow, max_row=maxRow, min_col=minCol, max_col=maxCol, values_only=True))
+            for name, (c1, r1, c2, r2) in bounds.items():
+                block = [row[c1 - minCol:c2 - minCol + 1] for row in rows[r1 - minRow:r2 - minRow + 1]]
+                # Single cell or range
+                res[name] = block[0][0] if ':' not in names[name] else block
+    finally:
+        wb.close()
+    return res
+
+def update_json5(path: str, values: dict):
+    """
+    Update values of keys in a .json5 file, comments, formatting and other keys are kept
+    :param path: Path of the .json5 file
+    :param values: Dictionary of key: new value (number or string, numpy scalars are converted)
+    """
+    with open(path, 'r') as f:
+        text = f.read()
+    # One pattern of all keys, the value ends before the comma or a trailing comment
+    pattern = re.compile(r'^(\s*)(' + '|'.join(re.escape(key) for key in values) + r')(\s*:\s*)'
+                         r'("(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\'|[^,\n]*?)(\s*(?:,|(?=//)|$))', re.M)
+    found = set()
+    def replace(match):
+        found.add(match.group(2))
+        return match.group(1) + match.group(2) + match.group(3) + json.dumps(np.asarray(values[match.group(2)]).item()) + match.group(5)
+    text = pattern.sub(replace, text)
+    missing = [key for key in values if key not in found]
+    if missing:
+        raise Exception(', '.join(missing) + " not found in " + path + ".")
+    with open(path, 'w') as f:
+        f.write(text)
+
+def label(month) -> np.ndarray:
+    """
+    Month labels like Excel TEXT(date, "mmm yy"), e.g. Jul 22
+    :param month: datetime64[M] array
+    """
+    m = np.asarray(month, dtype='datetime64[M]').astype(np.int64)
+    return np.array([MONTHS[i % 12] + ' ' + '{:02d}'.format((1970 + i // 12) % 100) for i in np.ravel(m)])
+
+def months(path: str) -> int:
+    """
+    Number of monthly rows of the workbook, counted to the total row
+    :param path: Path of the .xlsx file
+    """
+    wb = openpyxl.load_workbook(path, read_only=True)
+    try:
+        for row, (value,) in enumerate(wb['Raw Data'].iter_rows(min_row=FIRST, min_col=2, max_col=2, values_only=True)):
+            if isinstance(value, str) and value.strip() == 'Total':
+                return row
+    finally:
+        wb.close()
+    raise Exception("Total row not found in Raw Data of " + path + ".")
+
+def _factors(table) -> dict:
+    """
+    :param table: Rows of the table of conversion factors, fuels x units with a header row
+    :return: Dictionary of fuel: {unit: MMBtu per unit}
+    """
+    units = table[0][1:]
+    return {row[0]: {unit: value for unit, value in zip(units, row[1:]) if unit is not None and value is not None}
+            for row in table[1:] if row[0] is not None}
+
+def factors(path: str) -> dict:
+    """
+    Conversion factors of the workbook
+    :param path: Path of the .xlsx file
+    :return: Dictionary of fuel: {unit: MMBtu per unit}
+    """
+    return _factors(extract(path, {'Raw Data': {'Factors': raw()['Raw Data']['Factors']}})['Factors'])
+
+def read(path: str) -> dict:
+    """
+    Read the raw monthly rows of the workbook
+    :param path: Path of the .xlsx file
+    :return: EasyDict of monthly arrays MONTH (datetime64[M]), kWh, UC (usage charge, $), kW, DCH (demand charge, $),
+             TCH (total charge, $), FU (fuel usage), FCH (fuel cost, $), and FuelType, FuelUnit, FACTOR (MMBtu/unit)
+    """
+    cells = extract(path, raw(months(path)))
+    # Empty cells are nan
+    E = np.array(cells['Electricity'], dtype=float)
+    F = np.array(cells['Fuel'], dtype=float)
+    # Conversion factor of the fuel and unit
+    factor = _factors(cells['Factors']).get(cells['FuelType'], {}).get(cells['FuelUnit'])
+    if factor is None:
+        raise Exception(str(cells['FuelUnit']) + " is not a unit of " + str(cells['FuelType']) + ".")
+    bills = EasyDict()
+    bills.MONTH = np.datetime64(cells['Start'], 'M') + np.arange(E.shape[0])
+    bills.kWh, bills.UC, bills.kW, bills.DCH, bills.TCH = E[:, 0], E[:, 1], E[:, 2], E[:, 3], E[:, 5]
+    bills.FU, bills.FCH = F[:, 0], F[:, 2]
+    bills.FuelType = cells['FuelType']
+    bills.FuelUnit = cells['FuelUnit']
+    bills.FACTOR = float(factor)
+    return bills
+
+def aggregate(bills: dict) -> dict:
+    """
+    Totals and unit costs of the billing months, same as the formulas of the workbook
+    :param bills: Monthly bills from read()
+    :return: Dictionary with the same names as CELLS
+    """
+    # Empty months are skipped like SUM() of Excel
+    kWh, UC, kW, DCH, TCH, FU, FCH = [np.nansum(bills[key]) for key in ['kWh', 'UC', 'kW', 'DCH', 'TCH', 'FU', 'FCH']]
+    res = {}
+    res['FuelType'] = bills.FuelType
+    res['FuelUnit'] = bills.FuelUnit
+    res['StartMo'], res['EndMo'] = label(bills.MONTH[[0, -1]])
+    res['TotalEkWh'] = kWh
+    res['TotalDkW'] = kW
+    # Fees are the rest of the total charge
+    res['Fees'] = TCH - UC - DCH
+    res['TotalEBtu'] = kWh * EBTU
+    res['TotalFBtu'] = FU * bills.FACTOR
+    res['EC'] = UC / kWh
+    res['DC'] = DCH / kW
+    res['FC'] = FCH / res['TotalFBtu']
+    res['ECost'] = UC
+    res['DCost'] = DCH
+    res['TotalFCost'] = FCH
+    res['TotalBtu'] = res['TotalEBtu'] + res['TotalFBtu']
+    res['TotalCost'] = UC + DCH + FCH
+    return res
+
+def check(computed: dict, cached: dict, rtol: float=1e-6) -> list:
+    """
+    Cross-check computed values against cached values of the workbook
+    :param computed: Values from aggregate()
+    :param cached: Values from extract() of CELLS
+    :param rtol: Relative tolerance of numbers
+    :return: List of names that are missing or different in the workbook
+    """
+    stale = []
+    for name, value in computed.items():
+        old = cached.get(name)
+        if isinstance(value, str):
+            same = str(old) == value
+        else:
+            same = isinstance(old, (int, float)) and bool(np.isclose(old, value, rtol=rtol, atol=1e-9))
+        if not same:
+            stale.append(name)
+    return stale
+
+def tables(bills: dict) -> dict:
+    """
+    Rows of the energy tables of Energy.docx, monthly rows and the total row
+    :param bills: Monthly bills from read()
+    :return: Dictionary with Electricity (month, kWh, usage charge, kW, demand charge, fees, total charge, MMBtu) and
+             Fuel (month, fuel usage, MMBtu, cost), lists of rows
+    """
+    # Months x columns, empty cells are 0
+    E = np.nan_to_num(np.stack([bills.kWh, bills.UC, bills.kW, bills.DCH, bills.TCH - bills.UC - bills.DCH,
+                                bills.TCH, bills.kWh * EBTU], axis=1))
+    F = np.nan_to_num(np.stack([bills.FU, bills.FU * bills.FACTOR, bills.FCH], axis=1))
+    months = list(label(bills.MONTH)) + ['Total']
+    E = np.vstack([E, E.sum(axis=0)])
+    F = np.vstack([F, F.sum(axis=0)])
+    return {'Electricity': [(month, *row) for month, row in zip(months, E.tolist())],
+            'Fuel': [(month, *row) for month, row in zip(months, F.tolist())]}
+
+def ingest(paths: list, factors: dict) -> dict:
+    """
+    Read bill files of any number of accounts and months into a columnar store
+    :param paths: List of .csv or .xlsx files, one row per account, fuel and month with COLUMNS.
+                  Fuel is Electricity or a fuel of factors, Unit is required for fuels (kWh for electricity).
+                  Electricity bills have the Demand (kW), the Usage Charge and Demand Charge ($) and the total Cost ($),
+                  the Usage Charge is the rest of the Cost if empty. A later bill of the same account, fuel and month
+                  replaces an earlier one
+    :param factors: Conversion factors, dictionary of fuel: {unit: MMBtu per unit}, see factors()
+    :return: EasyDict of arrays, ACCOUNTS, FUELS and UNITS (names), FACTORS (MMBtu per unit, fuels x units)
+             and per bill ACCOUNT, FUEL, UNIT (codes), MONTH (datetime64[M]), USAGE, MMBTU, DEMAND, UC, DCH and COST
+    """
+    frames = []
+    for path in paths:
+        df = pd.read_excel(path) if path.lower().endswith(('.xlsx', '.xlsm')) else pd.read_csv(path)
+        df.columns = [str(column).strip().lower() for column in df.columns]
+        missing = [column for column in ['account', 'fuel', 'month', 'usage', 'cost'] if column not in df.columns]
+        if missing:
+            raise Exception(path + " has no column " + ", ".join(missing) + ".")
+        frames.append(df[[column for column in COLUMNS if column in df.columns]].rename(columns=COLUMNS))
+    df = pd.concat(frames, ignore_index=True).reindex(columns=list(COLUMNS.values()))
+    store = EasyDict()
+    # Names are stored once, bills refer to them by code
+    fuel = df.FUEL.astype(str).str.strip()
+    unit = df.UNIT.where(df.UNIT.notna(), np.where(fuel == 'Electricity', 'kWh', '')).astype(str).str.strip()
+    store.ACCOUNTS, account = np.unique(df.ACCOUNT.astype(str).str.strip().to_numpy(dtype=str), return_inverse=True)
+    store.FUELS, fuel = np.unique(fuel.to_numpy(dtype=str), return_inverse=True)
+    store.UNITS, unit = np.unique(unit.to_numpy(dtype=str), return_inverse=True)
+    month = pd.to_datetime(df.MONTH.astype(str), format='mixed').to_numpy().astype('datetime64[M]')
+    number = lambda column: pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=float)
+    USAGE, COST = number('USAGE'), number('COST')
+    DEMAND, DCH = np.nan_to_num(number('DEMAND')), np.nan_to_num(number('DCH'))
+    UC = number('UC')
+    UC = np.where(np.isnan(UC), COST - DCH, UC)
+    # MMBtu per unit of each fuel and unit, electricity at the source
+    store.FACTORS = np.array([[EBTU if (name, unitName) == ('Electricity', 'kWh') else factors.get(name, {}).get(unitName, np.nan)
+                               for unitName in store.UNITS] for name in store.FUELS], dtype=float)
+    factor = store.FACTORS[fuel, unit]
+    if np.isnan(factor).any():
+        i = np.flatnonzero(np.isnan(factor))[0]
+        raise Exception(store.UNITS[unit[i]] + " is not a unit of " + store.FUELS[fuel[i]] + ".")
+    # The last bill of each account, fuel and month
+    key = (account.astype(np.int64) * store.FUELS.size + fuel) * 2**32 + month.astype(np.int64)
+    _, last = np.unique(key[::-1], return_index=True)
+    keep = np.sort(key.size - 1 - last)
+    store.ACCOUNT = account[keep].astype(np.int32)
+    store.FUEL = fuel[keep].astype(np.int16)
+    store.UNIT = unit[keep].astype(np.int16)
+    store.MONTH = month[keep]
+    store.USAGE = USAGE[keep]
+    store.MMBTU = USAGE[keep] * factor[keep]
+    store.DEMAND = DEMAND[keep]
+    store.UC = UC[keep]
+    store.DCH = DCH[keep]
+    store.COST = COST[keep]
+    return store
+
+def save(store: dict, path: str):
+    """
+    Save a bill store as .npz
+    """
+    np.savez_compressed(path, **store)
+
+def load(path: str) -> dict:
+    """
+    Load a bill store from .npz
+    """
+    with np.load(path) as data:
+        return EasyDict({key: data[key] for key in data.files})
+
+def fuels(store: dict, months: int=12, end=None) -> dict:
+    """
+    Usage and cost of each fuel in the trailing months, all accounts
+    :param store: Bill store from ingest() or load()
+    :param months: Number of months
+    :param end: Last month, default the latest bill
+    :return: EasyDict with MONTH (datetime64[M] of the months), FUELS (names), MMBTU and COST of each fuel, and
+             BILLS (number of bills of each fuel and month)
+    """
+    end = store.MONTH.max() if end is None else np.datetime64(end, 'M')
+    res = EasyDict()
+    res.MONTH = end - np.arange(months)[::-1]
+    index = (store.MONTH - res.MONTH[0]).astype(np.int64)
+    inside = (index >= 0) & (index < months)
+    F = store.FUELS.size
+    res.FUELS = store.FUELS
+    res.MMBTU = np.bincount(store.FUEL[inside], weights=store.MMBTU[inside], minlength=F)
+    res.COST = np.bincount(store.FUEL[inside], weights=store.COST[inside], minlength=F)
+    res.BILLS = np.bincount(store.FUEL[inside].astype(np.int64) * months + index[inside], minlength=F * months).reshape(F, months)
+    return res
+
+def trailing(store: dict, fuel: str=None, months: int=12, end=None) -> dict:
+    """
+    Monthly bills of the trailing months, all accounts added up
+    :param store: Bill store from ingest() or load()
+    :param fuel: Fuel of the fuel table, default the fuel with the most MMBtu. Its unit is the most common unit of it
+    :param months: Number of months
+    :param end: Last month, default the latest bill
+    :return: EasyDict like read(), months without bills are nan
+    """
+    total = fuels(store, months, end)
+    index = (store.MONTH - total.MONTH[0]).astype(np.int64)
+    inside = (index >= 0) & (index < months)
+    names = list(store.FUELS)
+    if fuel is None:
+        others = [i for i, name in enumerate(names) if name != 'Electricity' and total.BILLS[i].any()]
+        if not others:
+            raise Exception("No fuel bills in the trailing " + str(months) + " months.")
+        fuel = names[max(others, key=lambda i: total.MMBTU[i])]
+    def monthly(name: str, column: str) -> np.ndarray:
+        # Sum of all accounts by month, nan if there is no bill
+        if name not in names:
+            return np.full(months, np.nan)
+        mask = inside & (store.FUEL == names.index(name))
+        res = np.bincount(index[mask], weights=store[column][mask], minlength=months)
+        return np.where(total.BILLS[names.index(name)] > 0, res, np.nan)
+    bills = EasyDict()
+    bills.MONTH = total.MONTH
+    bills.kWh, bills.UC, bills.kW, bills.DCH, bills.TCH = [monthly('Electricity', column) for column in
+                                                          ['USAGE', 'UC', 'DEMAND', 'DCH', 'COST']]
+    # Most common unit of the fuel
+    mask = inside & (store.FUEL == names.index(fuel)) if fuel in names else np.zeros(store.FUEL.size, dtype=bool)
+    if not mask.any():
+        raise Exception("No " + fuel + " bills in the trailing " + str(months) + " months.")
+    unit = np.bincount(store.UNIT[mask], minlength=store.UNITS.size).argmax()
+    # Fuel usage in the unit, all accounts converted from MMBtu
+    bills.FACTOR = float(store.FACTORS[names.index(fuel), unit])
+    bills.FU = monthly(fuel, 'MMBTU') / bills.FACTOR
+    bills.FCH = monthly(fuel, 'COST')
+    bills.FuelType = str(fuel)
+    bills.FuelUnit = str(store.UNITS[unit])
+    return bills
@@ -0,0 +1,242 @@
+"""
+(Purpose) Compressor.py models a compressed air system shared by the Compressor templates
+The system is an inventory of compressors (trailing axis, base load first, the last one trims) serving a demand profile
+(bins of load and hours), described in Compressor/System.json5.
+Measures on the same system are stacked in the order they are implemented, each one starts from the system left by the
+previous ones. All system states are evaluated in one batched call, with the state on the leading axis.
+A template scales its own savings by XF, the savings of the measure in the stack relative to the measure alone,
+so the recommendations on the same system add up without double counting.
+"""
+
+import os, json5
+import numpy as np
+from datetime import datetime
+from easydict import EasyDict
+from Shared.Savings import VFDLoad, CompressorVFD
+from Shared import Savings, Leaks
+
+## Constants
+# Atmosphere, psia
+PA = 14.7
+# Specific heat ratio of air
+k = 1.4
+# Conversion constant; in2/ft2
+C3 = 144.0
+# Conversion constant; HP.min/ft.lb
+C4 = 3.03e-5
+# Conversion factor; kW/HP
+C5 = 0.746
+# Conversion constant; MMBtu/kWh
+C6 = 0.003412
+
+# Directory of Compressor templates
+DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Compressor')
+# System description
+SYSTEM = os.path.join(DIRECTORY, 'System.json5')
+
+def _a(x):
+    """
+    Convert input to float numpy array
+    """
+    return np.asarray(x, dtype=float)
+
+def specific_power(P, N, EA):
+    """
+    Shaft power to compress free air, isentropic
+    :param P: Discharge pressure, psig
+    :param N: Number of stages
+    :param EA: Adiabatic efficiency, %
+    :return: HP/cfm
+    """
+    P, N, EA = [np.asarray(x, dtype=float) for x in [P, N, EA]]
+    return PA * C3 * k / (k - 1) * N * C4 * (((P + PA) / PA) ** ((k - 1) / (k * N)) - 1) / (EA / 100)
+
+def part_load(CT, LF, VFD):
+    """
+    Power fraction at part load, same curves as the VFD templates without rounding
+    :param CT: Control type, 1: blow off, 2: modulation, 3: load/unload
+    :param LF: Load fraction, %
+    :param VFD: Controlled by VFD, boolean
+    :return: Power fraction, %
+    """
+    CT, LF, VFD = np.broadcast_arrays(np.asarray(CT), np.asarray(LF, dtype=float), np.asarray(VFD, dtype=bool))
+    FPC = np.select([CT == 1, CT == 2, CT == 3], [np.full_like(LF, 100), 0.3 * LF + 70, 0.5 * LF + 50], np.nan)
+    return np.where(VFD, np.interp(LF, VFDLoad, CompressorVFD), FPC)
+
+def dispatch(DEM, CAP):
+    """
+    Sequence compressors to meet the demand, base load first
+    :param DEM: Demand, cfm (..., bins)
+    :param CAP: Capacity of compressors, cfm (..., compressors)
+    :return: Load of each compressor, cfm (..., bins, compressors)
+    """
+    CAP = np.asarray(CAP, dtype=float)[..., None, :]
+    before = np.cumsum(CAP, axis=-1) - CAP
+    return np.clip(np.asarray(DEM, dtype=float)[..., None] - before, 0, CAP)
+
+def power(DEM, CAP, HP, ETA, CT, VFD, MUL):
+    """
+    Electric power of every compressor, all inputs broadcast on the leading (state) axes
+    :param DEM: Demand, cfm (..., bins)
+    :param CAP, HP, ETA, CT, VFD: Inventory, capacity (cfm), horsepower, motor efficiency (%), control type, VFD (..., compressors)
+    :param MUL: Power multiplier of pressure and intake temperature (...)
+    :return: kW (..., bins, compressors), compressors without load are off
+    """
+    CAP = np.asarray(CAP, dtype=float)
+    load = dispatch(DEM, CAP)
+    LF = load / CAP[..., None, :] * 100
+    FP = part_load(np.asarray(CT)[..., None, :], LF, np.asarray(VFD)[..., None, :])
+    kW = np.asarray(HP, dtype=float)[..., None, :] * C5 * FP / 100 / (np.asarray(ETA, dtype=float)[..., None, :] / 100)
+    return np.where(load > 0, kW * np.asarray(MUL, dtype=float)[..., None, None], 0)
+
+def winter_temperature(ZIP) -> int:
+    """
+    Average outside temperature during winter months (October to May)
+    :param ZIP: ZIP code
+    :return: degF
+    """
+    from Shared import Weather, Geocode
+    lat, lon = Geocode.lookup(ZIP)
+    data = Weather.monthly((lat, lon), datetime(2018, 10, 1), datetime(2022, 5, 31))
+    winter = np.isin(Weather.months(data.time), [10, 11, 12, 1, 2, 3, 4, 5])
+    return round(np.nanmean(data.tavg[winter]))
+
+def outside_temperature(db: dict) -> int:
+    """
+    Outside temperature of the Intake Air template, same in the template and in the stack
+    :param db: Database of Intake Air
+    :return: TO of the database if given, otherwise the average winter temperature at its ZIP code, degF
+    """
+    if db.get('TO') not in [None, '']:
+        return db.TO
+    return winter_temperature(db.ZIP)
+
+def load(path: str=SYSTEM) -> dict:
+    """
+    Load the system description
+    :return: EasyDict with inventory arrays, demand profile and STACK
+    """
+    system = EasyDict(json5.load(open(path)))
+    C = np.size(system.HP)
+    for key in ['HP', 'ETA', 'CT', 'N', 'EA']:
+        system[key] = np.broadcast_to(np.asarray(system[key]), (C,))
+    system.LF, system.H = np.broadcast_arrays(np.asarray(system.LF, dtype=float), np.asarray(system.H, dtype=float))
+    return system
+
+def _database(measure: str) -> dict:
+    """
+    Database of a Compressor template
+    """
+    return EasyDict(json5.load(open(os.path.join(DIRECTORY, measure, 'database.json5'))))
+
+def _stage(state: dict, system: dict, measure: str, db: dict) -> dict:
+    """
+    System state after implementing a measure
+    :param state: State before the measure
+    :param measure: Template directory name
+    :param db: Database of the template
+    :return: New state
+    """
+    state = EasyDict({key: np.copy(value) for key, value in state.items()})
+    if measure == 'Repair Leaks':
+        # Leaks are demand that goes away, every leak of the survey if there is one
+        if db.get('SURVEY') and 'DIA' not in db:
+            db = EasyDict(db, **Leaks.inputs(Leaks.read_survey(os.path.join(DIRECTORY, measure, db.SURVEY))))
+        res = Savings.repair_leaks.evaluate(db, ['NL', 'FR'])
+        state.DEM = np.fmax(state.DEM - np.sum(res.NL * res.FR), 0)
+    elif measure == 'Reduce Set Pressure':
+        # Less work to compress the same air
+        state.MUL = state.MUL * specific_power(db.RCP, db.N, 100) / specific_power(system.P0, db.N, 100)
+    elif measure == 'Intake Air':
+        # Less work for colder intake air in winter, averaged over the year
+        TO = outside_temperature(db)
+        winter = np.fmin(db.HR * db.DY * db.WK / np.sum(system.H), 1)
+        state.MUL = state.MUL * (1 - winter * (db.TI - TO) / (db.TI + 460))
+    elif measure == 'Existing Compressor VFD':
+        # VFD on the trim compressor
+        state.VFD[-1] = True
+    elif measure == 'New Compressor VFD':
+        # The trim compressor is replaced by a new one with VFD, same pressure and air end
+        state.CAP[-1] = state.CAP[-1] * db.HPP / state.HP[-1]
+        state.HP[-1] = db.HPP
+        state.ETA[-1] = db.ETAP
+        state.VFD[-1] = True
+    elif measure == 'Exhuast Heat':
+        # No change of electricity
+        pass
+    else:
+        raise Exception("Unknown measure " + measure + ".")
+    return state
+
+def stack(system: dict, databases: dict={}) -> dict:
+    """
+    Evaluate the measures of system.STACK in sequence
+    :param system: System description from load()
+    :param databases: Databases of templates by name, templates not in it are loaded from their directories
+    :return: EasyDict with, for each state (baseline, after each measure, each measure alone on the baseline):
+             E (kWh/yr), D (peak kW), and for each measure in the stack: ES, DS, NGS (in the stack), ESi, DSi, NGSi (alone)
+             and XF (%, savings in the stack relative to savings alone, between 0 and 100)
+    """
+    STACK = list(system.STACK)
+    # Both VFD measures change the trim compressor
+    if 'Existing Compressor VFD' in STACK and 'New Compressor VFD' in STACK:
+        raise Exception("Existing Compressor VFD and New Compressor VFD are alternatives for the trim compressor, keep one of them in STACK.")
+    db = [databases[m] if m in databases else _database(m) for m in STACK]
+    # Baseline, capacity from the isentropic power at system pressure
+    base = EasyDict()
+    base.DEM = system.LF / 100 * np.sum(system.HP / specific_power(system.P0, system.N, system.EA))
+    base.CAP = system.HP / specific_power(system.P0, system.N, system.EA)
+    base.HP = _a(system.HP)
+    base.ETA = _a(system.ETA)
+    base.CT = np.asarray(system.CT)
+    base.VFD = np.zeros(base.HP.shape, dtype=bool)
+    base.MUL = np.array(1.0)
+    # States in the stack, then each measure alone
+    states = [base]
+    for m, d in zip(STACK, db):
+        states.append(_stage(states[-1], system, m, d))
+    states += [_stage(base, system, m, d) for m, d in zip(STACK, db)]
+    # One batched evaluation of all states
+    batch = {key: np.stack([state[key] for state in states]) for key in base}
+    kW = np.sum(power(**batch), axis=-1)
+    res = EasyDict()
+    res.STACK = STACK
+    res.E = np.sum(kW * system.H, axis=-1)
+    res.D = np.max(kW, axis=-1)
+    S = len(STACK)
+    before, after, alone = np.arange(S), np.arange(1, S + 1), np.arange(S + 1, 2 * S + 1)
+    res.ES = res.E[before] - res.E[after]
+    res.DS = (res.D[before] - res.D[after]) * (system.CF / 100) * 12
+    res.ESi = res.E[0] - res.E[alone]
+    res.DSi = (res.D[0] - res.D[alone]) * (system.CF / 100) * 12
+    # Heat recovered from compressors during the heating hours of the exhaust heat measure
+    res.NGS, res.NGSi = np.zeros(S), np.zeros(S)
+    for i, (m, d) in enumerate(zip(STACK, db)):
+        if m == 'Exhuast Heat':
+            heating = np.fmin(d.HR * d.DY * d.WK / np.sum(system.H), 1)
+            res.NGS[i] = res.E[i] * heating * (d.EC / 100) * C6 * (d.EHR / 100)
+            res.NGSi[i] = res.E[0] * heating * (d.EC / 100) * C6 * (d.EHR / 100)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        XF = np.where(res.NGSi > 0, res.NGS / res.NGSi, res.ES / res.ESi)
+    # Conservative, a measure doesn't save more than alone, nor use more energy
+    res.XF = np.clip(np.rint(np.where(np.isfinite(XF), XF, 1) * 100), 0, 100)
+    return res
+
+def interaction(measure: str, iac: dict, path: str=SYSTEM):
+    """
+    Interaction factor of a template with the measures implemented before it on the same system
+    :param measure: Template directory name
+    :param iac: Database of the running template, used instead of the file
+    :return: XF (%, 100 if the measure is not stacked) and the list of measures before it
+    """
+    if not os.path.isfile(path):
+        return 100, []
+    system = load(path)
+    if measure not in system.STACK:
+        return 100, []
+    res = stack(system, {measure: iac})
+    i = res.STACK.index(measure)
+    if res.XF[i] == 0:
+        from Shared.IAC import caveat, combine_words
+        caveat(measure + " saves nothing after " + combine_words(res.STACK[:i]) + " on the same system, consider removing it.")
+    return int(res.XF[i]), res.STACK[:i]
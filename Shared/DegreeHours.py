@@ -0,0 +1,195 @@
+"""
+(Purpose) DegreeHours.py calculates cooling and heating degree hours and temperature bin hours from hourly weather
+and weekly schedules, with the coincident humidity of each bin from Psychrometrics.py
+A schedule is a 7 x 24 array of setpoints, or of 1 and 0 for on and off (Monday first, local standard time).
+All hours of all years and all schedules are evaluated in one numpy call. Results are cached per location, years and schedule, so a template gets them in
+milliseconds after the first run.
+"""
+
+import os, json, hashlib
+import numpy as np
+from datetime import datetime
+from easydict import EasyDict
+from Shared import Weather, Psychrometrics
+
+# Results cache, next to the weather data cache
+CACHE = os.path.join(Weather.DIRECTORY, 'DegreeHours.json')
+# Years of hourly weather
+YEARS = (2018, 2022)
+# Edges of temperature bins, degF
+EDGES = np.arange(-20, 115, 5, dtype=float)
+
+def week(SET, SETBACK, HR: float=24, DY: float=7, START: int=8) -> np.ndarray:
+    """
+    Weekly setpoint schedule
+    :param SET: Setpoint during occupied hours, degF
+    :param SETBACK: Setpoint during unoccupied hours, degF
+    :param HR: Occupied hours per day, starting at START (half hours are rounded up)
+    :param DY: Occupied days per week, starting on Monday (a half day is a half of the occupied hours)
+    :param START: First occupied hour of a day, 0-23
+    :return: 7 x 24 array of setpoints
+    """
+    hours = (np.arange(24) - START) % 24
+    day = np.arange(7)[:, None]
+    # Occupied hours of each day of the week
+    occupied = np.where(day < np.floor(DY), HR, np.where(day < DY, HR * (DY - np.floor(DY)), 0))
+    return np.where(hours[None, :] < np.ceil(occupied), SET, SETBACK).astype(float)
+
+def local_time(time, lon: float):
+    """
+    Day of week (Monday is 0) and hour of UTC times in local standard time, time zone is estimated from longitude
+    :param time: datetime64 array, UTC
+    :param lon: Longitude, degree
+    :return: Day of week, hour
+    """
+    hours = np.asarray(time).astype('datetime64[h]').astype(np.int64) + int(round(lon / 15))
+    # 1970-01-01 is Thursday
+    return (hours // 24 + 3) % 7, hours % 24
+
+def local_week(time, lon: float):
+    """
+    Week of UTC times in local standard time, weeks start on Monday
+    :param time: datetime64 array, UTC
+    :param lon: Longitude, degree
+    :return: Number of the week since 1970
+    """
+    hours = np.asarray(time).astype('datetime64[h]').astype(np.int64) + int(round(lon / 15))
+    return (hours // 24 + 3) // 7
+
+def degree_hours(T, dow, hour, schedules, on=None) -> tuple:
+    """
+    Annual cooling and heating degree hours
+    :param T: Hourly outside temperature, degF, nan if missing
+    :param dow, hour: Day of week and hour of each temperature, from local_time()
+    :param schedules: Setpoint schedules, (..., 7, 24)
+    :param on: Hours to count, 1 or 0 for each temperature, (..., hours), default all hours
+    :return: Cooling and heating degree hours per year, deg.hr, shape of the leading axes of schedules
+    """
+    T = np.asarray(T, dtype=float)
+    valid = np.isfinite(T)
+    # Setpoint of every hour, (..., hours)
+    SET = np.asarray(schedules, dtype=float)[..., dow[valid], hour[valid]]
+    on = 1 if on is None else np.asarray(on, dtype=float)[..., valid]
+    # Missing hours are filled by the average, scaled to a full year
+    scale = 8760 / valid.sum()
+    CDH = np.sum(np.fmax(T[valid] - SET, 0) * on, axis=-1) * scale
+    HDH = np.sum(np.fmax(SET - T[valid], 0) * on, axis=-1) * scale
+    return CDH, HDH
+
+def season(DH, number, WK) -> np.ndarray:
+    """
+    Hours of the weeks with the most degree hours, e.g. the cooling season
+    :param DH: Degree hours of each hour, nan if missing
+    :param number: Week of each hour, from local_week()
+    :param WK: Weeks per year of the season
+    :return: 1 in the season and 0 out of it, for each hour
+    """
+    weeks, index = np.unique(number, return_inverse=True)
+    index = index.ravel()
+    weekly = np.bincount(index, weights=np.nan_to_num(np.asarray(DH, dtype=float)))
+    # Weeks of the season in all years of records, 8760 / 168 weeks per year
+    n = int(round(WK * weeks.size * 168 / 8760))
+    top = np.argsort(-weekly, kind='stable')[:n]
+    return np.isin(index, top).astype(float)
+
+def bins(T, dow, hour, schedules, edges=EDGES, values=None):
+    """
+    Annual hours in each temperature bin when schedules are on
+    :param T: Hourly outside temperature, degF, nan if missing
+    :param dow, hour: Day of week and hour of each temperature, from local_time()
+    :param schedules: On (1) and off (0) schedules, (S, 7, 24)
+    :param edges: Edges of temperature bins, temperatures out of the edges are in the first or last bin
+    :param values: Hourly values to average in each bin, e.g. humidity ratio, nan is skipped
+    :return: Hours per year (bins, S), and the averages of values when schedules are on (bins, S) if values are given
+    """
+    T = np.asarray(T, dtype=float)
+    valid = np.isfinite(T)
+    on = np.asarray(schedules, dtype=float)[:, dow[valid], hour[valid]]
+    B = len(edges) - 1
+    index = np.clip(np.searchsorted(edges, T[valid], side='right') - 1, 0, B - 1)
+    # Bin of each hour of each schedule in one bincount
+    S = on.shape[0]
+    index = (np.arange(S)[:, None] * B + index).ravel()
+    hours = np.bincount(index, weights=on.ravel(), minlength=S * B).reshape(S, B).T * 8760 / valid.sum()
+    if values is None:
+        return hours
+    values = np.asarray(values, dtype=float)[valid]
+    known = on * np.isfinite(values)
+    total = np.bincount(index, weights=(known * np.nan_to_num(values)).ravel(), minlength=S * B)
+    count = np.bincount(index, weights=known.ravel(), minlength=S * B)
+    with np.errstate(invalid='ignore'):
+        return hours, (total / count).reshape(S, B).T
+
+def _key(station, years, schedules) -> str:
+    """
+    Cache key of a location, years and schedules
+    """
+    digest = hashlib.md5(np.ascontiguousarray(schedules, dtype=float).tobytes()).hexdigest()
+    return Weather.station_key(station) + '_' + str(years[0]) + '_' + str(years[1]) + '_' + digest
+
+def thermostat(station, CST, MCST, HST, MHST, HR: float, DY: float, START: int=8, CHR: float=24, CDY: float=7,
+               CWK: float=52, years: tuple=YEARS, path: str=CACHE) -> dict:
+    """
+    Degree hours of a programmable thermostat while the HVAC runs (CHR hours a day, CDY days a week, in the CWK weeks
+    per year with the most degree hours, i.e. the cooling or heating season). The current setpoint is held all the time,
+    the proposed schedule sets back during unoccupied hours
+    :param station: (latitude, longitude)
+    :param CST, MCST: Cooling setpoint and setback, degF
+    :param HST, MHST: Heating setpoint and setback, degF
+    :param HR, DY, START: Occupied hours per day, days per week and first occupied hour, see week()
+    :param CHR, CDY, CWK: Hours per day, days per week (from START) and weeks per year the HVAC runs
+    :param years: First and last year of hourly weather
+    :param path: Results cache file
+    :return: EasyDict with CDH, MCDH, HDH, MHDH, deg.hr per year (integers)
+    """
+    # Current cooling, proposed cooling, current heating, proposed heating
+    schedules = np.stack([week(CST, CST), week(CST, MCST, HR, DY, START), week(HST, HST), week(HST, MHST, HR, DY, START)])
+    run = week(1, 0, CHR, CDY, START)
+    key = _key(station, years, np.concatenate([schedules.ravel(), run.ravel(), [CWK]]))
+    cache = json.load(open(path)) if os.path.isfile(path) else {}
+    if key not in cache:
+        data = Weather.hourly(station, datetime(years[0], 1, 1), datetime(years[1], 12, 31))
+        dow, hour = local_time(data.time, station[1])
+        # Hours the HVAC runs in the cooling and heating seasons, with the most degree hours at the current setpoints
+        T = np.asarray(data.temp, dtype=float)
+        on = run[dow, hour]
+        number = local_week(data.time, station[1])
+        cooling = season(np.fmax(T - CST, 0) * on, number, CWK) * on
+        heating = season(np.fmax(HST - T, 0) * on, number, CWK) * on
+        CDH, HDH = degree_hours(T, dow, hour, schedules, np.stack([cooling, cooling, heating, heating]))
+        cache[key] = [round(CDH[0]), round(CDH[1]), round(HDH[2]), round(HDH[3])]
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(cache, f, indent=1)
+    return EasyDict(zip(['CDH', 'MCDH', 'HDH', 'MHDH'], cache[key]))
+
+def door_hours(station, HR, DY, START, WK=52, years: tuple=YEARS, edges=EDGES, path: str=CACHE) -> dict:
+    """
+    Temperature bin hours of doors (or any equipment) on weekly schedules
+    :param station: (latitude, longitude)
+    :param HR, DY, START: Open hours per day, days per week and first open hour of each door, lists or scalars, see week()
+    :param WK: Open weeks per year of each door, spread evenly over the year
+    :param years: First and last year of hourly weather
+    :param edges: Edges of temperature bins, degF
+    :param path: Results cache file
+    :return: EasyDict with TB (bin temperatures, degF), HB (hours per year, bins x doors)
+             and WO (average outside humidity ratio, lb/lb, bins x doors, nan without humidity data)
+    """
+    HR, DY, START, WK = np.broadcast_arrays(np.atleast_1d(HR), np.atleast_1d(DY), np.atleast_1d(START), np.atleast_1d(WK))
+    schedules = np.stack([week(1, 0, h, d, s) for h, d, s in zip(HR, DY, START)])
+    key = 'bins_' + _key(station, years, np.concatenate([schedules.ravel(), edges]))
+    cache = json.load(open(path)) if os.path.isfile(path) else {}
+    if key not in cache:
+        data = Psychrometrics.hourly(station, datetime(years[0], 1, 1), datetime(years[1], 12, 31))
+        dow, hour = local_time(data.time, station[1])
+        HB, WO = bins(data.temp, dow, hour, schedules, edges, data.W)
+        # nan is not valid json
+        cache[key] = {'HB': np.round(HB, 2).tolist(), 'WO': np.where(np.isfinite(WO), np.round(WO, 5), -1).tolist()}
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(cache, f, indent=1)
+    res = EasyDict()
+    res.TB = (edges[:-1] + edges[1:]) / 2
+    res.HB = np.array(cache[key]['HB']) * WK / 52
+    res.WO = np.where(np.array(cache[key]['WO']) < 0, np.nan, cache[key]['WO'])
+    return res
@@ -0,0 +1,117 @@
+"""
+(Purpose) Finance.py contains vectorized lifecycle financial metrics (NPV, IRR, SIR) of recommendations
+All inputs broadcast element-wise, e.g. an array of recommendations (column) against an array of scenarios (row).
+Annual cost savings escalate with the utility rate, the implementation cost is spent at year 0.
+"""
+
+import numpy as np
+from easydict import EasyDict
+
+def present_worth(DR, ESC, LIFE):
+    """
+    Present worth factor of an escalating annual amount, first amount at the end of year 1
+    :param DR: Discount rate, %
+    :param ESC: Escalation rate of utility cost, %
+    :param LIFE: Equipment life, yr
+    :return: Present worth of $1/yr of the first year savings
+    """
+    d = np.asarray(DR, dtype=float) / 100
+    e = np.asarray(ESC, dtype=float) / 100
+    n = np.asarray(LIFE, dtype=float)
+    d, e, n = np.broadcast_arrays(d, e, n)
+    ratio = (1 + e) / (1 + d)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Growing annuity, or n/(1+d) if the escalation equals the discount rate
+        PW = np.where(np.isclose(d, e), n / (1 + d), (1 - ratio ** n) / (d - e))
+    return PW
+
+def npv(ACS, IC, DR, ESC, LIFE):
+    """
+    Net present value
+    :param ACS: Annual Cost Savings of the first year, $/yr
+    :param IC: Implementation Cost, $
+    :param DR: Discount rate, %
+    :param ESC: Escalation rate of utility cost, %
+    :param LIFE: Equipment life, yr
+    :return: NPV, $
+    """
+    return np.asarray(ACS, dtype=float) * present_worth(DR, ESC, LIFE) - np.asarray(IC, dtype=float)
+
+def sir(ACS, IC, DR, ESC, LIFE):
+    """
+    Savings-to-investment ratio
+    :return: SIR, inf if there's no implementation cost
+    """
+    PV = np.asarray(ACS, dtype=float) * present_worth(DR, ESC, LIFE)
+    IC = np.asarray(IC, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(IC > 0, PV / IC, np.inf)
+
+def irr(ACS, IC, ESC, LIFE, tol: float=1e-7, maxiter: int=100):
+    """
+    Internal rate of return, solved by vectorized bisection on all elements at once
+    :param ACS: Annual Cost Savings of the first year, $/yr
+    :param IC: Implementation Cost, $
+    :param ESC: Escalation rate of utility cost, %
+    :param LIFE: Equipment life, yr
+    :return: IRR, %. inf if there's no implementation cost, nan if there's no savings
+    """
+    ACS, IC, ESC, LIFE = np.broadcast_arrays(*[np.asarray(x, dtype=float) for x in [ACS, IC, ESC, LIFE]])
+    # NPV is decreasing with the rate, bracket between -99% and 10000%
+    low = np.full(ACS.shape, -99.0)
+    high = np.full(ACS.shape, 1e4)
+    for i in range(maxiter):
+        mid = (low + high) / 2
+        positive = npv(ACS, IC, mid, ESC, LIFE) > 0
+        low = np.where(positive, mid, low)
+        high = np.where(positive, high, mid)
+        if np.all(high - low < tol):
+            break
+    IRR = (low + high) / 2
+    IRR = np.where(ACS <= 0, np.nan, IRR)
+    return np.where(IC <= 0, np.inf, IRR)
+
+def metrics(ACS, IC, DR, ESC, LIFE) -> dict:
+    """
+    All lifecycle metrics in a single call
+    :param ACS: Annual Cost Savings of the first year, $/yr
+    :param IC: Implementation Cost, $
+    :param DR: Discount rate, %
+    :param ESC: Escalation rate of utility cost, %
+    :param LIFE: Equipment life, yr
+    :return: EasyDict with PV, NPV, IRR(%) and SIR arrays
+    """
+    res = EasyDict()
+    res.PV = np.asarray(ACS, dtype=float) * present_worth(DR, ESC, LIFE)
+    res.NPV = res.PV - np.asarray(IC, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        res.SIR = np.where(np.asarray(IC) > 0, res.PV / np.asarray(IC, dtype=float), np.inf)
+    res.IRR = irr(ACS, IC, ESC, LIFE)
+    return res
+
+def portfolio(ACS, IC, DR, ESC, LIFE, maxiter: int=100) -> dict:
+    """
+    Lifecycle metrics of a group of recommendations, each with its own equipment life
+    :param ACS, IC, LIFE: Arrays of the recommendations
+    :param DR, ESC: Discount and escalation rates, %
+    :return: EasyDict with NPV, IRR (%) and SIR of the sum of the cash flows
+    """
+    ACS, IC, LIFE = [np.asarray(x, dtype=float) for x in [ACS, IC, LIFE]]
+    res = metrics(ACS, IC, DR, ESC, LIFE)
+    total = EasyDict()
+    total.NPV = np.sum(res.NPV)
+    total.SIR = np.sum(res.PV) / np.sum(IC) if np.sum(IC) > 0 else np.inf
+    # The total NPV is decreasing with the rate, bisection between -99% and 10000%
+    low, high = -99.0, 1e4
+    for i in range(maxiter):
+        mid = (low + high) / 2
+        if np.sum(npv(ACS, IC, mid, ESC, LIFE)) > 0:
+            low = mid
+        else:
+            high = mid
+    total.IRR = (low + high) / 2
+    if np.sum(ACS) <= 0:
+        total.IRR = np.nan
+    if np.sum(IC) <= 0:
+        total.IRR = np.inf
+    return total
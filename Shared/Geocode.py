@@ -0,0 +1,109 @@
+"""
+(Purpose) Geocode.py looks up the coordinates of US ZIP codes from a compact local index, without network or pandas
+The index is a sorted numpy structured array (Shared/ZIP.npy, about 0.6 MB) that is memory-mapped and binary searched.
+It's built once from the GeoNames postal code file (the same data used by pgeocode), see build().
+Until the index is built, lookups fall back to pgeocode, which downloads the same file on first use.
+"""
+
+import os, io, zipfile
+import numpy as np
+
+# Index file
+INDEX = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ZIP.npy')
+# GeoNames postal codes of the US, CC BY 4.0
+SOURCE = 'https://download.geonames.org/export/zip/US.zip'
+# Record of the index
+DTYPE = np.dtype([('zip', '<u4'), ('lat', '<f4'), ('lon', '<f4'), ('state', 'S2')])
+
+_index = None
+
+def _load():
+    """
+    Memory-map the index on first use
+    :return: Index, None if it's not built
+    """
+    global _index
+    if _index is None and os.path.isfile(INDEX):
+        _index = np.load(INDEX, mmap_mode='r')
+    return _index
+
+def _pgeocode(ZIP):
+    """
+    Look up a ZIP code with pgeocode when the index is not built
+    :return: pgeocode query result
+    """
+    try:
+        import pgeocode
+    except ImportError:
+        raise Exception("ZIP code index not found and pgeocode is not installed. Run Geocode.build() once with network.")
+    query = pgeocode.Nominatim('us').query_postal_code(str(ZIP).strip()[:5])
+    if not np.isfinite(query['latitude']):
+        raise Exception("ZIP code " + str(ZIP) + " is not found.")
+    return query
+
+def _find(ZIP) -> int:
+    """
+    Binary search a ZIP code
+    :param ZIP: ZIP code, string or integer
+    :return: Row of the index
+    """
+    index = _load()
+    code = int(str(ZIP).strip()[:5])
+    i = np.searchsorted(index['zip'], code)
+    if i >= len(index) or index['zip'][i] != code:
+        raise Exception("ZIP code " + str(ZIP) + " is not found.")
+    return i
+
+def lookup(ZIP) -> tuple:
+    """
+    Coordinates of a ZIP code
+    :param ZIP: ZIP code, string or integer, e.g. "18015"
+    :return: (latitude, longitude), degree
+    """
+    if _load() is None:
+        query = _pgeocode(ZIP)
+        return round(float(query['latitude']), 4), round(float(query['longitude']), 4)
+    row = _load()[_find(ZIP)]
+    # float32 keeps 4 decimal places (~10 m)
+    return round(float(row['lat']), 4), round(float(row['lon']), 4)
+
+def state(ZIP) -> str:
+    """
+    State abbreviation of a ZIP code, e.g. "PA"
+    """
+    if _load() is None:
+        return str(_pgeocode(ZIP)['state_code'])
+    return _load()[_find(ZIP)]['state'].decode()
+
+def build(source: str=SOURCE, path: str=INDEX) -> int:
+    """
+    Build the index from the GeoNames postal code file
+    :param source: URL or local path of US.zip or US.txt (pgeocode keeps a copy in ~/pgeocode_data)
+    :param path: Index file
+    :return: Number of ZIP codes
+    """
+    if source.startswith('http'):
+        import requests
+        response = requests.get(source, timeout=60)
+        response.raise_for_status()
+        data = response.content
+    else:
+        data = open(source, 'rb').read()
+    if data[:2] == b'PK':
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            data = archive.read('US.txt')
+    records = {}
+    # Tab separated: country, postal code, place, state, state code, county, county code, community, community code, lat, lon, accuracy
+    for line in data.decode('utf-8').splitlines():
+        fields = line.split('\t')
+        if len(fields) < 11 or not fields[1].isdigit() or fields[9] == '' or fields[10] == '':
+            continue
+        code = int(fields[1])
+        # Keep the first place of each ZIP code
+        if code not in records:
+            records[code] = (code, float(fields[9]), float(fields[10]), fields[4].encode()[:2])
+    index = np.array(sorted(records.values()), dtype=DTYPE)
+    np.save(path, index)
+    global _index
+    _index = None
+    return len(index)
@@ -0,0 +1,166 @@
+"""
+(Purpose) Graph.py is a small declarative calculation graph for recommendation templates
+Every derived field is a node, registered with the fields it depends on (the argument names of its function).
+A Model holds the inputs and caches node values: only the requested fields and their dependencies are evaluated,
+and changing an input only invalidates the nodes that depend on it.
+A node may depend on its own name, e.g. IC = float(IC), then the dependency is the input with that name.
+"""
+
+import inspect
+from easydict import EasyDict
+
+class Graph:
+    """
+    Calculation graph of a measure
+    Usage:
+        g = Graph("Measure name")
+        @g.node
+        def OH(HR, DY, WK):
+            return HR * DY * WK
+        g(**inputs)           # evaluate all nodes, returns EasyDict
+        m = g.model(**inputs) # lazy model
+        m.OH                  # evaluate OH only
+        m.update(HR=10)       # recompute OH next time it is accessed
+    """
+    def __init__(self, name: str):
+        self.name = name
+        # name: (function, list of dependencies, dictionary of default values)
+        self.nodes = {}
+        self._dependents = None
+
+    def node(self, func):
+        """
+        Decorator to register a function as a node, dependencies are the argument names
+        Arguments with default values are optional inputs
+        """
+        deps = []
+        defaults = {}
+        for p in inspect.signature(func).parameters.values():
+            if p.kind in (p.VAR_POSITIONAL, p.VAR_KEYWORD):
+                continue
+            deps.append(p.name)
+            if p.default is not p.empty:
+                defaults[p.name] = p.default
+        self.add(func.__name__, func, deps, defaults)
+        return func
+
+    def add(self, name: str, func, deps: list, defaults: dict=None):
+        """
+        Register a node
+        :param name: Field name
+        :param func: Function taking the dependencies as positional arguments
+        :param deps: List of field names
+        :param defaults: Dictionary of default values of optional inputs
+        """
+        self.nodes[name] = (func, list(deps), defaults or {})
+        self._dependents = None
+
+    @property
+    def inputs(self) -> list:
+        """
+        List of all inputs of the graph
+        """
+        inputs = []
+        for func, deps, defaults in self.nodes.values():
+            for dep in deps:
+                if (dep not in self.nodes or dep in self.nodes[dep][1]) and dep not in inputs:
+                    inputs.append(dep)
+        return inputs
+
+    def dependents(self, names) -> set:
+        """
+        All nodes that directly or indirectly depend on the given fields
+        :param names: Iterable of field names
+        :return: Set of node names
+        """
+        if self._dependents is None:
+            self._dependents = {}
+            for name, (func, deps, defaults) in self.nodes.items():
+                for dep in deps:
+                    self._dependents.setdefault(dep, []).append(name)
+        found = set()
+        stack = list(names)
+        while stack:
+            for name in self._dependents.get(stack.pop(), []):
+                if name not in found:
+                    found.add(name)
+                    stack.append(name)
+        return found
+
+    def model(self, **inputs):
+        """
+        Make a lazy model with inputs
+        """
+        return Model(self, inputs)
+
+    def evaluate(self, inputs: dict, outputs: list=None) -> dict:
+        """
+        Evaluate nodes, unrequested nodes that are not needed are never evaluated
+        :param inputs: Dictionary of inputs, keys that are not inputs of the graph are ignored
+        :param outputs: List of node names, default all nodes
+        :return: EasyDict of results
+        """
+        if outputs is None:
+            outputs = list(self.nodes)
+        return Model(self, inputs).get(*outputs)
+
+    def __call__(self, **inputs) -> dict:
+        """
+        Evaluate all nodes
+        """
+        return self.evaluate(inputs)
+
+class Model:
+    """
+    Lazy evaluation of a Graph with cached node values
+    """
+    def __init__(self, graph: Graph, inputs: dict):
+        self.graph = graph
+        self.inputs = dict(inputs)
+        self.cache = {}
+
+    def __getitem__(self, name: str):
+        if name in self.cache:
+            return self.cache[name]
+        # Nodes are always calculated, even if an input has the same name
+        if name in self.graph.nodes:
+            func, deps, defaults = self.graph.nodes[name]
+            args = []
+            for dep in deps:
+                if dep == name and dep in self.inputs:
+                    args.append(self.inputs[dep])
+                elif dep != name and (dep in self.graph.nodes or dep in self.inputs):
+                    args.append(self[dep])
+                elif dep in defaults:
+                    args.append(defaults[dep])
+                else:
+                    raise Exception("Input " + dep + " of " + self.graph.name + " is missing.")
+            self.cache[name] = func(*args)
+            return self.cache[name]
+        if name in self.inputs:
+            return self.inputs[name]
+        raise Exception(name + " is not found in " + self.graph.name + ".")
+
+    def __getattr__(self, name: str):
+        # Only called for attributes that are not found normally
+        if name in ('graph', 'inputs', 'cache'):
+            raise AttributeError(name)
+        return self[name]
+
+    def get(self, *names) -> dict:
+        """
+        :param names: Field names
+        :return: EasyDict of values
+        """
+        return EasyDict({name: self[name] for name in names})
+
+    def update(self, **changes):
+        """
+        Change inputs and invalidate the nodes that depend on them
+        """
+        for name in changes:
+            if name in self.graph.nodes and name not in self.graph.nodes[name][1]:
+                raise Exception(name + " is calculated and can't be changed.")
+        self.inputs.update(changes)
+        for name in self.graph.dependents(changes):
+            self.cache.pop(name, None)
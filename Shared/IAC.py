@@ -27,14 +27,35 @@ def rebate(dic: dict) -> dict:
         dic.MIC = dic.IC
         
     dic.MPB = payback(dic.ACS, dic.MIC)
+    dic = lifecycle(dic)
     return dic
 
-def savefile(doc, rec: str, add=False):
+def lifecycle(dic: dict) -> dict:
+    """
+    Calculates lifecycle financial metrics based on values provided by Utility.json5 and database.json5
+    Uses modified implementation cost (MIC) if available
+    :param dic: EasyDict with ACS, IC, DR, ESC and LIFE
+    :return: EasyDict with NPV, IRR (%) and SIR
+    """
+    import math
+    from Shared import Finance
+    cost = dic.MIC if "MIC" in dic else dic.IC
+    res = Finance.metrics(dic.ACS, cost, dic.DR, dic.ESC, dic.LIFE)
+    dic.NPV = round(res.NPV.item())
+    # IRR and SIR are not available without cost or savings
+    IRR = res.IRR.item()
+    dic.IRR = round(IRR, 1) if math.isfinite(IRR) else "N/A"
+    SIR = res.SIR.item()
+    dic.SIR = round(SIR, 2) if math.isfinite(SIR) else "N/A"
+    return dic
+
+def savefile(doc, rec: str, add=False, profile=None):
     """
     Avoid overwriting recommendation documents directly
     :param doc: python-docx or docxcompose object
     :param rec: Recommendation No., string
     :param add(optional): additional flag, bool
+    :param profile(optional): hourly electricity savings from Profile.profile(), saved next to the document as .npy
     """
     import os
     if add:
@@ -59,6 +80,9 @@ def savefile(doc, rec: str, add=False):
             print("Command not recongnized.")
     doc.save(filepath)
     print("File saved to " + os.path.abspath(filepath))
+    if profile is not None:
+        from Shared import Profile
+        Profile.save(os.path.splitext(filepath)[0] + '.npy', profile)
                 
 def title_case(text: str) -> str:
     """
@@ -0,0 +1,116 @@
+"""
+(Purpose) Insulation.py solves the heat loss of bare and insulated hot surfaces (pipes, vessels, barrels, flanges)
+The surface temperature of the insulation is solved by Newton's method on all surfaces at once (numpy arrays),
+with natural convection (Churchill-Chu) and radiation coefficients from Properties.py.
+Surfaces with diameter 0 are flat, treated as 1 ft high vertical plates.
+Units: temperature degF, length in, heat flux Btu/hr.ft2, conductivity Btu.in/hr.ft2.degF
+"""
+
+import numpy as np
+from Shared import Properties
+
+## Constants
+# Stefan-Boltzmann constant, Btu/hr.ft2.R4
+SIGMA = 0.1714e-8
+# Gravity, ft/hr2
+G = 32.174 * 3600 ** 2
+# Height of flat surfaces, ft
+HEIGHT = 1.0
+
+def coefficient(TS, TA, DIA, EPS):
+    """
+    Combined natural convection and radiation heat transfer coefficient
+    :param TS: Surface temperature, degF
+    :param TA: Ambient temperature, degF
+    :param DIA: Outer diameter, in (0 for flat surfaces)
+    :param EPS: Surface emissivity
+    :return: Coefficient, Btu/hr.ft2.degF
+    """
+    TS, TA, DIA, EPS = np.broadcast_arrays(*[np.asarray(x, dtype=float) for x in [TS, TA, DIA, EPS]])
+    air = Properties.properties((TS + TA) / 2)
+    cylinder = DIA > 0
+    # Characteristic length, ft
+    L = np.where(cylinder, DIA / 12, HEIGHT)
+    RA = G * air.beta * np.abs(TS - TA) * L ** 3 * air.prandtl / air.nu ** 2
+    # Churchill-Chu, horizontal cylinder and vertical plate
+    F = (1 + (0.559 / air.prandtl) ** (9 / 16)) ** (8 / 27)
+    NU = np.where(cylinder, (0.60 + 0.387 * RA ** (1 / 6) / F) ** 2, (0.825 + 0.387 * RA ** (1 / 6) / F) ** 2)
+    HC = NU * air.conductivity / L
+    # Radiation to surroundings at ambient temperature
+    TSR, TAR = TS + 459.67, TA + 459.67
+    HR = EPS * SIGMA * (TSR ** 2 + TAR ** 2) * (TSR + TAR)
+    return HC + HR
+
+def resistance(THK, DIA, KINS):
+    """
+    Thermal resistance of insulation per outer surface area
+    :param THK: Insulation thickness, in
+    :param DIA: Outer diameter of the bare surface, in (0 for flat surfaces)
+    :param KINS: Insulation conductivity, Btu.in/hr.ft2.degF
+    :return: Resistance, hr.ft2.degF/Btu, and ratio of outer to bare surface area
+    """
+    THK, DIA, KINS = np.broadcast_arrays(*[np.asarray(x, dtype=float) for x in [THK, DIA, KINS]])
+    cylinder = DIA > 0
+    ri = np.where(cylinder, DIA / 2, 1)
+    ro = ri + THK
+    R = np.where(cylinder, ro * np.log(ro / ri) / KINS, THK / KINS)
+    ratio = np.where(cylinder, ro / ri, 1)
+    return R, ratio
+
+def bare(TEMP, AMB, DIA, EB):
+    """
+    Heat loss of bare surfaces
+    :param TEMP: Surface temperature, degF
+    :param AMB: Ambient temperature, degF
+    :param DIA: Outer diameter, in (0 for flat surfaces)
+    :param EB: Emissivity of the bare surface
+    :return: Heat flux, Btu/hr.ft2
+    """
+    return coefficient(TEMP, AMB, DIA, EB) * (np.asarray(TEMP, dtype=float) - AMB)
+
+def surface(TEMP, AMB, THK, DIA, KINS, EJ, tol: float=1e-6, maxiter: int=50):
+    """
+    Surface temperature of insulated surfaces, the process side is at the bare surface temperature
+    Newton's method on (TEMP - TS) / R = h(TS) * (TS - AMB), all surfaces are iterated together
+    :param TEMP: Temperature of the bare surface, degF
+    :param AMB: Ambient temperature, degF
+    :param THK: Insulation thickness, in
+    :param DIA: Outer diameter of the bare surface, in (0 for flat surfaces)
+    :param KINS: Insulation conductivity, Btu.in/hr.ft2.degF
+    :param EJ: Emissivity of the insulation jacket
+    :return: Surface temperature of the insulation, degF
+    """
+    TEMP, AMB, THK, DIA, KINS, EJ = np.broadcast_arrays(*[np.asarray(x, dtype=float) for x in [TEMP, AMB, THK, DIA, KINS, EJ]])
+    R, ratio = resistance(THK, DIA, KINS)
+    DO = np.where(DIA > 0, DIA + 2 * THK, 0)
+    residual = lambda TS: (TEMP - TS) / R - coefficient(TS, AMB, DO, EJ) * (TS - AMB)
+    # Start close to ambient, the insulation takes most of the temperature difference
+    TS = AMB + 0.1 * (TEMP - AMB)
+    for i in range(maxiter):
+        f = residual(TS)
+        # Numerical derivative
+        df = (residual(TS + 0.01) - f) / 0.01
+        step = f / df
+        TS = np.clip(TS - step, np.fmin(AMB, TEMP), np.fmax(AMB, TEMP))
+        if np.all(np.abs(step) < tol):
+            break
+    return TS
+
+def conduction(TEMP, TS, THK, DIA, KINS):
+    """
+    Heat loss through the insulation
+    :param TEMP: Temperature of the bare surface, degF
+    :param TS: Surface temperature of the insulation, degF
+    :return: Heat flux per bare surface area, Btu/hr.ft2
+    """
+    R, ratio = resistance(THK, DIA, KINS)
+    # Heat flow per outer area times outer to bare area ratio
+    return (np.asarray(TEMP, dtype=float) - TS) / R * ratio
+
+def insulated(TEMP, AMB, THK, DIA, KINS, EJ, **kwargs):
+    """
+    Heat loss of insulated surfaces, parameters are the same as surface()
+    :return: Surface temperature of the insulation (degF), heat flux per bare surface area (Btu/hr.ft2)
+    """
+    TS = surface(TEMP, AMB, THK, DIA, KINS, EJ, **kwargs)
+    return TS, conduction(TEMP, TS, THK, DIA, KINS)
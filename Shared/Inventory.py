@@ -0,0 +1,113 @@
+"""
+(Purpose) Inventory.py reads equipment inventory files and writes long equipment tables in the docx templates
+An inventory has one row per unit (rooftop units, motors...), campuses can have hundreds of them.
+Columns are read into numpy arrays so the savings of all units are calculated at once, and table rows are generated
+from one template row in a single pass over the table XML, so rendering time grows linearly with the number of units.
+"""
+
+import csv
+import numpy as np
+from copy import deepcopy
+from easydict import EasyDict
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+
+def read(path: str, strings: list=[], numbers: list=[], defaults: dict={}) -> dict:
+    """
+    Read an inventory, rows are streamed from the file
+    :param path: CSV file with a header row, blank rows are skipped
+    :param strings: Columns of text
+    :param numbers: Columns of numbers
+    :param defaults: Values of empty cells by column, columns without default are required on every row
+    :return: EasyDict of columns, numpy arrays of strings or floats
+    """
+    columns = {key: [] for key in strings + numbers}
+    with open(path, newline='') as f:
+        reader = csv.DictReader(f)
+        for key in columns:
+            if key not in reader.fieldnames and key not in defaults:
+                raise Exception("Column " + key + " is not in " + path + ".")
+        for row in reader:
+            if not any((value or '').strip() for value in row.values()):
+                continue
+            for key in columns:
+                text = (row.get(key) or '').strip()
+                if text:
+                    columns[key].append(text if key in strings else float(text.replace(',', '')))
+                elif key in defaults:
+                    columns[key].append(defaults[key])
+                else:
+                    raise Exception("Row " + str(reader.line_num) + " of " + path + " has no " + key + ".")
+    inventory = EasyDict()
+    for key in strings:
+        inventory[key] = np.array(columns[key], dtype=str)
+    for key in numbers:
+        inventory[key] = np.array(columns[key], dtype=float)
+    return inventory
+
+def rank(PB, PBMAX) -> np.ndarray:
+    """
+    Screen units by payback period and rank them
+    :param PB: Numeric payback period of each unit, yr
+    :param PBMAX: Longest payback period to keep, yr
+    :return: Indices of the units to keep, shortest payback first
+    """
+    PB = np.asarray(PB, dtype=float)
+    index = np.flatnonzero(PB <= PBMAX)
+    return index[np.argsort(PB[index], kind='stable')]
+
+def total(res: dict, index, keys: list) -> dict:
+    """
+    Totals of the kept units
+    :param res: Results of all units
+    :param index: Indices of the kept units, from rank()
+    :param keys: Fields to add up
+    :return: EasyDict of totals
+    """
+    return EasyDict({key: np.sum(np.asarray(res[key])[index]) for key in keys})
+
+def fill(table, rows: list, first: int=1, footer: int=0, alignment=WD_ALIGN_PARAGRAPH.CENTER):
+    """
+    Replace the data rows of a table, the first data row is the template of the formatting
+    Rows are copied from the template and added to the XML directly, python-docx row and cell objects
+    are not used because looking them up is slow on long tables.
+    :param table: docx table
+    :param rows: List of rows, each is a list of strings, one per cell
+    :param first: Number of header rows, repeated on every page
+    :param footer: Number of rows at the end to keep, e.g. total
+    :param alignment: Alignment of cells
+    """
+    tbl = table._tbl
+    trs = tbl.tr_lst
+    # Template row, one paragraph with one empty text in each cell, in the font of the first run of the cell
+    template = deepcopy(trs[first])
+    for tc in template.tc_lst:
+        for p in tc.p_lst[1:]:
+            tc.remove(p)
+        p = tc.p_lst[0]
+        rPr = p.r_lst[0].rPr if p.r_lst else None
+        for r in p.r_lst:
+            p.remove(r)
+        p.get_or_add_pPr().jc_val = alignment
+        r = p.add_r()
+        if rPr is not None:
+            r.append(rPr)
+        r.add_t('')
+    # Header rows are repeated on every page
+    for tr in trs[:first]:
+        trPr = tr.get_or_add_trPr()
+        if trPr.find(qn('w:tblHeader')) is None:
+            trPr.append(OxmlElement('w:tblHeader'))
+    # Remove the old data rows
+    for tr in trs[first:len(trs) - footer]:
+        tbl.remove(tr)
+    # Add new rows after the header, or after the grid of a table without header
+    anchor = trs[first - 1] if first > 0 else tbl.tblGrid
+    T = qn('w:t')
+    for values in rows:
+        tr = deepcopy(template)
+        for t, text in zip(tr.iter(T), values):
+            t.text = str(text)
+        anchor.addnext(tr)
+        anchor = tr
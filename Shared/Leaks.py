@@ -0,0 +1,85 @@
+"""
+(Purpose) Leaks.py reads ultrasonic leak survey files for Repair Leaks in Compressed Air Lines
+A survey has one row per tagged leak, with its own diameter or measured flow, line pressure and location.
+Leaks are grouped into the standard size bins (1/64 to 1/4 in) and by location with numpy, so surveys with
+thousands of leaks are summarized in one pass.
+"""
+
+import csv
+import numpy as np
+from fractions import Fraction
+from easydict import EasyDict
+from Shared.Savings import LeakDiameter
+
+# Labels of the standard size bins
+LeakString = ["1/64", "1/32", "1/16", "1/8", "3/16", "1/4"]
+
+def _float(text: str) -> float:
+    """
+    Parse a number or a fraction like 1/16, empty is nan
+    """
+    text = text.strip()
+    if not text:
+        return np.nan
+    return float(Fraction(text))
+
+def read_survey(path: str) -> dict:
+    """
+    Read a leak survey, rows are streamed from the file
+    :param path: CSV file with a header row, columns TAG, AREA (location), DIA (in, decimal or fraction),
+                 FLOW (measured free air flow, cfm) and P1 (line pressure, psig). DIA or FLOW is required on each row,
+                 empty P1 uses the line pressure of the database.
+    :return: EasyDict of columns, TAG and AREA are arrays of strings, the others are float arrays with nan if empty
+    """
+    columns = {key: [] for key in ['TAG', 'AREA', 'DIA', 'FLOW', 'P1']}
+    with open(path, newline='') as f:
+        for n, row in enumerate(csv.DictReader(f)):
+            for key in ['TAG', 'AREA']:
+                columns[key].append((row.get(key) or '').strip())
+            for key in ['DIA', 'FLOW', 'P1']:
+                columns[key].append(_float(row.get(key) or ''))
+            if np.isnan(columns['DIA'][-1]) and np.isnan(columns['FLOW'][-1]):
+                raise Exception("Leak " + (columns['TAG'][-1] or str(n + 1)) + " has neither diameter nor flow.")
+    survey = EasyDict()
+    for key in ['TAG', 'AREA']:
+        survey[key] = np.array(columns[key])
+    for key in ['DIA', 'FLOW', 'P1']:
+        survey[key] = np.array(columns[key], dtype=float)
+    return survey
+
+def inputs(survey: dict) -> dict:
+    """
+    Inputs of Savings.repair_leaks from a survey, one leak per row
+    :param survey: Survey from read_survey()
+    :return: EasyDict of NL, DIA, FLOW and PLEAK
+    """
+    return EasyDict(NL=np.ones(survey.TAG.size), DIA=survey.DIA, FLOW=survey.FLOW, PLEAK=survey.P1)
+
+def size_bin(DIA):
+    """
+    Nearest standard leak size on a log scale
+    :param DIA: Leak diameters, in
+    :return: Index of LeakDiameter
+    """
+    edges = np.sqrt(LeakDiameter[1:] * LeakDiameter[:-1])
+    return np.searchsorted(edges, DIA)
+
+def group(keys: list, weights=None, **values) -> dict:
+    """
+    Sum values over unique combinations of keys
+    :param keys: List of arrays with the same length, e.g. [AREA, BIN]
+    :param weights: Weights of each row, default 1 (counts)
+    :param values: Arrays to sum
+    :return: EasyDict with the unique keys (list of arrays, sorted by the first key), N (sum of weights), and the sums of values
+    """
+    weights = np.ones(len(keys[0])) if weights is None else np.asarray(weights)
+    # Integer codes of each key, sorted in its own order (numbers as numbers, strings alphabetically)
+    codes = np.stack([np.unique(np.asarray(key), return_inverse=True)[1].ravel() for key in keys])
+    unique, first, index = np.unique(codes, axis=1, return_index=True, return_inverse=True)
+    index = index.ravel()
+    res = EasyDict()
+    res.keys = [np.asarray(key)[first] for key in keys]
+    res.N = np.bincount(index, weights=weights)
+    for key, value in values.items():
+        res[key] = np.bincount(index, weights=np.asarray(value, dtype=float))
+    return res
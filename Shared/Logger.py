@@ -0,0 +1,55 @@
+"""
+(Purpose) Logger.py converts amp or kW data logger files into load duration histograms for the VFD templates
+Logger files can have millions of rows (weeks of 1-second data), they are read in chunks and only the histogram
+is kept in memory. Every sample has the same weight, so the histogram is the fraction of time at each load.
+"""
+
+import numpy as np
+import pandas as pd
+from easydict import EasyDict
+
+# Edges of load fraction bins, %
+EDGES = np.arange(0, 105, 5, dtype=float)
+# Samples below this load fraction are off, %
+OFF = 5
+
+def load_fraction(x, FULL):
+    """
+    Convert logger readings to load fraction
+    :param x: Current (A) or power (kW) readings
+    :param FULL: Reading at full load, full load amps (A) or power (kW) from the nameplate
+    :return: Load fraction, %
+    """
+    return np.asarray(x, dtype=float) / FULL * 100
+
+def histogram(path: str, column: str, FULL: float, chunksize: int=1000000, **kwargs) -> dict:
+    """
+    Load duration histogram of a logger file, streamed in chunks
+    :param path: CSV file with a header row
+    :param column: Name of the column of current (A) or power (kW) readings, other columns are not read
+    :param FULL: Reading at full load, A or kW
+    :param chunksize: Number of rows per chunk
+    :param kwargs: Other arguments of pandas.read_csv, e.g. skiprows of logger headers
+    :return: EasyDict with LFB (bin centers, %), DUR (% of operating time in each bin), LF (average load, %),
+             ON (% of samples that the equipment is on) and N (number of samples)
+    """
+    counts = np.zeros(EDGES.size - 1)
+    N = 0
+    total = 0.0
+    for chunk in pd.read_csv(path, usecols=[column], chunksize=chunksize, **kwargs):
+        LF = load_fraction(pd.to_numeric(chunk[column], errors='coerce').to_numpy(), FULL)
+        LF = LF[np.isfinite(LF)]
+        N += LF.size
+        # Overloaded samples are in the last bin
+        LF = np.fmin(LF[LF >= OFF], EDGES[-1])
+        total += np.sum(LF)
+        counts += np.histogram(LF, EDGES)[0]
+    if counts.sum() == 0:
+        raise Exception("No readings above " + str(OFF) + "% load in " + path + ".")
+    res = EasyDict()
+    res.LFB = (EDGES[:-1] + EDGES[1:]) / 2
+    res.DUR = counts / counts.sum() * 100
+    res.LF = total / counts.sum()
+    res.ON = counts.sum() / N * 100
+    res.N = N
+    return res
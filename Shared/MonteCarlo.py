@@ -0,0 +1,130 @@
+"""
+(Purpose) MonteCarlo.py propagates the uncertainty of field estimates through the vectorized calculations in Savings.py
+Each batch of samples is evaluated with a single call, batches can be spread over a process pool.
+"""
+
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from easydict import EasyDict
+from Shared import Savings
+
+# Reported percentiles
+PERCENTILES = [10, 50, 90]
+# Reported results, if the measure has them
+OUTPUTS = ['ES', 'DS', 'NGS', 'ACS', 'IC', 'PB', 'MPB']
+
+def sample(dist: dict, n: int, rng) -> dict:
+    """
+    Draw samples for every uncertain input
+    :param dist: Dictionary of distributions, key: [type, parameters...]
+                 ["normal", mean, standard deviation, (optional) low, (optional) high]
+                 ["uniform", low, high]
+                 ["triangular", low, mode, high]
+                 Parameters can be lists for per-area inputs
+    :param n: Number of samples
+    :param rng: numpy random Generator
+    :return: Dictionary of arrays, the first axis is the sample axis
+    """
+    samples = {}
+    for key, spec in dist.items():
+        kind = spec[0].lower()
+        par = [np.asarray(p, dtype=float) for p in spec[1:]]
+        size = (n,) + np.broadcast(*par).shape
+        if kind == "normal":
+            x = rng.normal(par[0], par[1], size)
+            # Optional truncation, e.g. load factor can't be negative
+            if len(par) > 2:
+                x = np.clip(x, par[2], par[3] if len(par) > 3 else np.inf)
+        elif kind == "uniform":
+            x = rng.uniform(par[0], par[1], size)
+        elif kind == "triangular":
+            x = rng.triangular(par[0], par[1], par[2], size)
+        else:
+            raise Exception("Distribution " + spec[0] + " is not supported.")
+        samples[key] = x
+    return samples
+
+def _required(graph, outputs: list) -> list:
+    """
+    Inputs without default values that the outputs depend on
+    """
+    required = []
+    stack = list(outputs)
+    seen = set()
+    while stack:
+        name = stack.pop()
+        if name in seen:
+            continue
+        seen.add(name)
+        func, deps, defaults = graph.nodes[name]
+        for dep in deps:
+            if dep in graph.nodes and dep != name:
+                stack.append(dep)
+            elif dep not in defaults and dep not in required:
+                required.append(dep)
+    return required
+
+def _batch(measure: str, inputs: dict, dist: dict, n: int, seed) -> dict:
+    """
+    Evaluate one batch of samples, runs in a worker process if a pool is used
+    """
+    rng = np.random.default_rng(seed)
+    kwargs = dict(inputs)
+    kwargs.update(sample(dist, n, rng))
+    graph = Savings.MEASURES[measure]
+    # Only the reported results and their dependencies are evaluated
+    try:
+        res = graph.evaluate(kwargs, [key for key in OUTPUTS if key in graph.nodes])
+    except ValueError as e:
+        raise Exception("Inputs of " + measure + " can't be combined (" + str(e) + "). Distributions of per-area "
+                        "inputs need lists of parameters, one per area.")
+    # Results that don't depend on any sampled input are broadcast to the batch size
+    return {key: np.broadcast_to(value, (n,)).astype(float) for key, value in res.items()}
+
+def simulate(measure: str, inputs: dict, dist: dict, n: int=100000, batch: int=100000, workers: int=1, seed=None) -> dict:
+    """
+    Monte Carlo simulation of a recommendation
+    :param measure: Template directory, key of Savings.MEASURES, e.g. "Compressor/Reduce Set Pressure"
+    :param inputs: Dictionary of point values, usually Utility.json5 + database.json5
+    :param dist: Dictionary of distributions, see sample()
+    :param n: Number of samples
+    :param batch: Number of samples evaluated in one vectorized call
+    :param workers: Number of worker processes, 1 runs in the current process
+    :param seed: Random seed, results are the same for any number of workers
+    :return: Dictionary of sampled results, each is an array of length n
+    """
+    if measure not in Savings.MEASURES:
+        raise Exception("Measure " + measure + " not found.")
+    # Inputs the template derives (weather, geocoding, bills...) are not in database.json5, or left empty
+    graph = Savings.MEASURES[measure]
+    missing = [key for key in _required(graph, [key for key in OUTPUTS if key in graph.nodes])
+               if (key not in inputs or isinstance(inputs[key], str) and inputs[key] == '') and key not in dist]
+    if missing:
+        raise Exception(measure + " needs " + ', '.join(missing) + ", which the template derives. "
+                        "Give point values in INPUTS or distributions in DIST.")
+    sizes = [batch] * (n // batch)
+    if n % batch:
+        sizes.append(n % batch)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    inputs = dict(inputs)
+    dist = dict(dist)
+    args = [[measure] * len(sizes), [inputs] * len(sizes), [dist] * len(sizes), sizes, seeds]
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_batch, *args))
+    else:
+        results = list(map(_batch, *args))
+    return {key: np.concatenate([r[key] for r in results]) for key in results[0]}
+
+def percentiles(samples: dict, q: list=PERCENTILES) -> dict:
+    """
+    Summarize sampled results
+    :param samples: Dictionary of sampled results from simulate()
+    :param q: List of percentiles, default P10/P50/P90
+    :return: EasyDict, key: array of percentiles
+    """
+    summary = EasyDict()
+    for key, x in samples.items():
+        # Nearest rank handles infinite payback
+        summary[key] = np.percentile(x, q, method='nearest')
+    return summary
@@ -0,0 +1,138 @@
+"""
+(Purpose) Occupancy.py converts occupancy and light logger event files into occupied and lights on hours per area
+A logger records an event when the occupancy (or light) state of its area changes, usually for 1 to 4 weeks.
+Events of all loggers are read in chunks into compact arrays, then all areas are integrated over the hours of the week
+in one numpy pass, so dozens of loggers and hundreds of thousands of events take a second or two.
+Timestamps are local time of the plant, weekdays start on Monday.
+"""
+
+import numpy as np
+import pandas as pd
+from easydict import EasyDict
+
+# Hours of a week
+WEEK = 168
+# Text of on and off states
+ON = ['1', '1.0', 'on', 'true', 'occupied']
+OFF = ['0', '0.0', 'off', 'false', 'vacant', 'unoccupied']
+
+def _state(x) -> np.ndarray:
+    """
+    Convert states to 1 (occupied, on), 0 (vacant, off) or nan (empty)
+    """
+    text = pd.Series(x, dtype=str).str.strip().str.lower()
+    return np.select([text.isin(ON), text.isin(OFF)], [1.0, 0.0], np.nan)
+
+def read(path: str, chunksize: int=1000000, **kwargs) -> dict:
+    """
+    Read a logger event file in chunks
+    :param path: CSV file with a header row, columns AREA, TIME (local date and time), OCC (occupancy state)
+                 and LIGHT (light state, optional). A row is an event, an empty state is unchanged.
+    :param chunksize: Number of rows per chunk
+    :param kwargs: Other arguments of pandas.read_csv
+    :return: EasyDict with AREA (names), area (index of AREA of each event), time (s), OCC and LIGHT (nan if empty)
+    """
+    names = {}
+    area, time, OCC, LIGHT = [], [], [], []
+    for chunk in pd.read_csv(path, chunksize=chunksize, dtype=str, keep_default_na=False, **kwargs):
+        for key in ['AREA', 'TIME', 'OCC']:
+            if key not in chunk:
+                raise Exception("Column " + key + " is not in " + path + ".")
+        # Area names to integer codes
+        codes, uniques = pd.factorize(chunk['AREA'].str.strip())
+        mapping = np.array([names.setdefault(name, len(names)) for name in uniques], dtype=np.int64)
+        area.append(mapping[codes])
+        time.append(pd.to_datetime(chunk['TIME']).to_numpy().astype('datetime64[s]').astype(np.int64))
+        OCC.append(_state(chunk['OCC']))
+        LIGHT.append(_state(chunk['LIGHT']) if 'LIGHT' in chunk else np.full(len(chunk), np.nan))
+    log = EasyDict()
+    log.AREA = np.array(list(names), dtype=str)
+    log.area = np.concatenate(area)
+    log.time = np.concatenate(time)
+    log.OCC = np.concatenate(OCC)
+    log.LIGHT = np.concatenate(LIGHT)
+    return log
+
+def _fill(start, x) -> np.ndarray:
+    """
+    Forward fill nan within groups of sorted events, nan at the start of a group is 0
+    :param start: True at the first event of each group
+    """
+    x = np.where(start & np.isnan(x), 0, x)
+    index = np.where(np.isnan(x), 0, np.arange(x.size))
+    return x[np.maximum.accumulate(index)]
+
+def _integrate(area, time, states: list, A: int):
+    """
+    Seconds in each hour of the week when the states are 1, and logged seconds, all areas at once
+    The time integral of a state is a piecewise linear function, it's evaluated at every hour boundary of every area
+    :param area, time: Sorted events
+    :param states: State arrays of the events, each state lasts until the next event of the same area
+    :param A: Number of areas
+    :return: List of (A, 168) arrays, seconds of each state, then logged seconds
+    """
+    first = np.searchsorted(area, np.arange(A))
+    last = np.searchsorted(area, np.arange(A), side='right') - 1
+    # Areas are laid end to end on one time axis
+    t0 = time.min()
+    SPAN = float(time.max() - t0 + 7200)
+    u = area * SPAN + (time - t0)
+    dt = np.diff(u, append=u[-1])
+    # The last event of an area is the end of its log
+    dt[last] = 0
+    # Hour boundaries of each area, from the hour of its first event to the hour after its last event
+    H0 = time[first] // 3600 * 3600
+    N = (time[last] - H0) // 3600 + 2
+    a = np.repeat(np.arange(A), N)
+    H = np.repeat(H0, N) + (np.arange(N.sum()) - np.repeat(np.cumsum(N) - N, N)) * 3600
+    x = np.clip(a * SPAN + (H - t0), u[first][a], u[last][a])
+    # Event before each boundary
+    i = np.searchsorted(u, x, side='right') - 1
+    # Hour of the week of each hour, 1970-01-01 is Thursday
+    how = (((H // 86400 + 3) % 7) * 24 + (H // 3600) % 24)[:-1]
+    # Hours within the same area
+    same = a[1:] == a[:-1]
+    index = (a[:-1] * WEEK + how)[same]
+    res = []
+    for s in states + [np.ones(u.size)]:
+        C = np.concatenate([[0], np.cumsum(s * dt)])[:-1]
+        X = C[i] + s[i] * (x - u[i])
+        res.append(np.bincount(index, weights=np.diff(X)[same], minlength=A * WEEK).reshape(A, WEEK))
+    return res
+
+def profile(path: str, **kwargs) -> dict:
+    """
+    Weekly occupied and lights on hours of each area of a logger event file
+    Hours of the week that are not logged take the average of the logged hours of the area.
+    :param path: Logger event file, see read()
+    :param kwargs: Other arguments of read()
+    :return: EasyDict with AREA (names), DAYS (logged days), and hours per week by weekday (areas x 7, Monday first):
+             OCC (occupied), UNOCC (unoccupied), ON (lights on), OCCON (occupied with lights on),
+             and the totals per week OCCW, UNOCCW, ONW, OCCONW. Light hours are nan without light data.
+    """
+    log = read(path, **kwargs)
+    A = log.AREA.size
+    # Sort events by area and time
+    order = np.lexsort((log.time, log.area))
+    area, time = log.area[order], log.time[order]
+    start = np.ones(area.size, dtype=bool)
+    start[1:] = area[1:] != area[:-1]
+    OCC = _fill(start, log.OCC[order])
+    light = np.bincount(area, weights=np.isfinite(log.LIGHT[order]), minlength=A) > 0
+    LIGHT = _fill(start, log.LIGHT[order])
+    occ, on, both, logged = _integrate(area, time, [OCC, LIGHT, OCC * LIGHT], A)
+    res = EasyDict()
+    res.AREA = log.AREA
+    res.DAYS = logged.sum(axis=1) / 86400
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for key, x in [('OCC', occ), ('ON', on), ('OCCON', both)]:
+            # Fraction of each hour of the week
+            average = x.sum(axis=1, keepdims=True) / logged.sum(axis=1, keepdims=True)
+            fraction = np.where(logged > 0, x / logged, average)
+            res[key] = fraction.reshape(A, 7, 24).sum(axis=2)
+    res.UNOCC = 24 - res.OCC
+    res.ON[~light] = np.nan
+    res.OCCON[~light] = np.nan
+    for key in ['OCC', 'UNOCC', 'ON', 'OCCON']:
+        res[key + 'W'] = res[key].sum(axis=1)
+    return res
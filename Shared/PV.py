@@ -0,0 +1,155 @@
+"""
+(Purpose) PV.py estimates the AC output of a PV system from TMY hourly data, without network
+It follows the PVWatts approach: solar position, plane-of-array irradiance (Hay-Davies sky diffuse), incidence angle
+modifier, cell temperature, temperature derating, system losses and the PVWatts inverter model.
+Everything is vectorized: the LAST axis is the 8760 hours, system parameters (CAP, tilt, azimuth, losses...) broadcast
+on the leading axes, so a grid of tilts and azimuths is evaluated in one call.
+"""
+
+import csv
+import numpy as np
+from easydict import EasyDict
+
+# Days per month of a TMY year
+DAYS = np.array([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+
+def _b(x):
+    """
+    Convert a system parameter to float numpy array with a trailing axis, so it broadcasts against hours
+    """
+    return np.asarray(x, dtype=float)[..., None]
+
+def read_tmy(path: str) -> dict:
+    """
+    Read a TMY file, NSRDB PSM (.csv) or TMY3 (.csv) format
+    :param path: File path
+    :return: EasyDict with lat, lon, tz (h), and hourly arrays month, day, hour, GHI, DNI, DHI (W/m2), TA (degC), WS (m/s)
+    """
+    rows = list(csv.reader(open(path, newline='')))
+    tmy = EasyDict()
+    if rows[0][0] == 'Source':
+        # NSRDB PSM: metadata names, metadata values, column names, data
+        meta = dict(zip(rows[0], rows[1]))
+        tmy.lat = float(meta['Latitude'])
+        tmy.lon = float(meta['Longitude'])
+        tmy.tz = float(meta['Time Zone'])
+        header = rows[2]
+        data = np.array(rows[3:], dtype=object)
+        col = lambda name: data[:, header.index(name)].astype(float)
+        tmy.month = col('Month').astype(int)
+        tmy.day = col('Day').astype(int)
+        tmy.hour = col('Hour').astype(int)
+        tmy.GHI, tmy.DNI, tmy.DHI = col('GHI'), col('DNI'), col('DHI')
+        tmy.TA = col('Temperature')
+        tmy.WS = col('Wind Speed')
+    else:
+        # TMY3: station, name, state, time zone, latitude, longitude, elevation, then column names, data
+        tmy.lat = float(rows[0][4])
+        tmy.lon = float(rows[0][5])
+        tmy.tz = float(rows[0][3])
+        header = rows[1]
+        data = np.array(rows[2:], dtype=object)
+        col = lambda name: data[:, header.index(name)].astype(float)
+        date = np.array([d.split('/') for d in data[:, 0]], dtype=int)
+        tmy.month = date[:, 0]
+        tmy.day = date[:, 1]
+        # Hour ending 1-24 to hour starting 0-23
+        tmy.hour = np.array([t.split(':')[0] for t in data[:, 1]], dtype=int) - 1
+        tmy.GHI, tmy.DNI, tmy.DHI = col('GHI (W/m^2)'), col('DNI (W/m^2)'), col('DHI (W/m^2)')
+        tmy.TA = col('Dry-bulb (C)')
+        tmy.WS = col('Wspd (m/s)')
+    return tmy
+
+def solar_position(lat, lon, tz, month, day, hour):
+    """
+    Solar position at the middle of each hour (Spencer equations)
+    :param lat: Latitude, degree
+    :param lon: Longitude, degree
+    :param tz: Time zone of local standard time, h
+    :param month, day, hour: Arrays of local standard time
+    :return: Zenith and azimuth (clockwise from north) in degree, day of year
+    """
+    doy = np.cumsum(np.concatenate([[0], DAYS[:-1]]))[np.asarray(month) - 1] + np.asarray(day)
+    B = 2 * np.pi * (doy - 1) / 365
+    # Declination, rad
+    decl = 0.006918 - 0.399912 * np.cos(B) + 0.070257 * np.sin(B) - 0.006758 * np.cos(2 * B) \
+        + 0.000907 * np.sin(2 * B) - 0.002697 * np.cos(3 * B) + 0.00148 * np.sin(3 * B)
+    # Equation of time, min
+    EOT = 229.18 * (0.000075 + 0.001868 * np.cos(B) - 0.032077 * np.sin(B) - 0.014615 * np.cos(2 * B) - 0.040849 * np.sin(2 * B))
+    solar_time = np.asarray(hour) + 0.5 + (4 * (lon - 15 * tz) + EOT) / 60
+    omega = np.radians(15 * (solar_time - 12))
+    phi = np.radians(lat)
+    cosz = np.sin(phi) * np.sin(decl) + np.cos(phi) * np.cos(decl) * np.cos(omega)
+    zenith = np.degrees(np.arccos(np.clip(cosz, -1, 1)))
+    azimuth = np.degrees(np.arctan2(np.sin(omega), np.cos(omega) * np.sin(phi) - np.tan(decl) * np.cos(phi))) + 180
+    return zenith, azimuth, doy
+
+def poa(GHI, DNI, DHI, zenith, sun_azimuth, doy, tilt, azimuth, albedo=0.2):
+    """
+    Plane-of-array irradiance, Hay-Davies sky diffuse model
+    Hourly inputs are on the last axis, tilt and azimuth must already broadcast (e.g. with a trailing axis)
+    :return: Beam, diffuse (sky + ground) POA irradiance and angle of incidence (degree)
+    """
+    z = np.radians(zenith)
+    beta = np.radians(tilt)
+    cos_aoi = np.cos(z) * np.cos(beta) + np.sin(z) * np.sin(beta) * np.cos(np.radians(sun_azimuth - azimuth))
+    aoi = np.degrees(np.arccos(np.clip(cos_aoi, -1, 1)))
+    # Extraterrestrial normal irradiance, W/m2
+    E0 = 1367 * (1 + 0.033 * np.cos(2 * np.pi * doy / 365))
+    # Anisotropy index and beam ratio
+    AI = np.clip(DNI / E0, 0, 1)
+    RB = np.fmax(cos_aoi, 0) / np.fmax(np.cos(z), np.cos(np.radians(85)))
+    beam = DNI * np.fmax(cos_aoi, 0)
+    sky = DHI * (AI * RB + (1 - AI) * (1 + np.cos(beta)) / 2)
+    ground = GHI * albedo * (1 - np.cos(beta)) / 2
+    up = zenith < 90
+    return np.where(up, beam, 0), np.where(up, sky + ground, 0), aoi
+
+def estimate(tmy: dict, CAP, tilt=20, azimuth=180, losses=14.08, gamma=-0.37, DCAC=1.2, ETAI=96, albedo=0.2) -> dict:
+    """
+    AC output of a PV system, parameters broadcast against each other for sweeps, e.g. tilt=np.arange(0, 45, 5)[:, None]
+    :param tmy: TMY data from read_tmy()
+    :param CAP: DC system capacity, kW
+    :param tilt: Tilt angle, degree
+    :param azimuth: Azimuth angle, degree (180 is south)
+    :param losses: System losses, %
+    :param gamma: Temperature coefficient of power, %/degC
+    :param DCAC: DC to AC size ratio
+    :param ETAI: Nominal inverter efficiency, %
+    :param albedo: Ground reflectance
+    :return: EasyDict with ac_annual (kWh), ac_monthly (kWh), solrad_monthly (kWh/m2/day), and hourly poa (W/m2), ac (kW)
+    """
+    zenith, sun_azimuth, doy = solar_position(tmy.lat, tmy.lon, tmy.tz, tmy.month, tmy.day, tmy.hour)
+    beam, diffuse, aoi = poa(tmy.GHI, tmy.DNI, tmy.DHI, zenith, sun_azimuth, doy, _b(tilt), _b(azimuth), _b(albedo))
+    # Incidence angle modifier of the glass cover (ASHRAE, b0 = 0.05)
+    IAM = np.clip(1 - 0.05 * (1 / np.fmax(np.cos(np.radians(aoi)), 1e-6) - 1), 0, 1)
+    POA = beam + diffuse
+    TPOA = beam * IAM + diffuse
+    # Cell temperature, open rack glass/polymer (Sandia)
+    TC = TPOA * np.exp(-3.56 - 0.075 * tmy.WS) + tmy.TA + TPOA / 1000 * 3
+    # DC output, kW
+    DC = _b(CAP) * TPOA / 1000 * (1 + _b(gamma) / 100 * (TC - 25)) * (1 - _b(losses) / 100)
+    # PVWatts inverter model
+    PAC0 = _b(CAP) / _b(DCAC)
+    PDC0 = PAC0 / (_b(ETAI) / 100)
+    zeta = np.fmax(DC, 1e-9) / PDC0
+    eta = (_b(ETAI) / 100) / 0.9637 * (-0.0162 * zeta - 0.0059 / zeta + 0.9858)
+    AC = np.where(DC > 0, np.clip(DC * eta, 0, PAC0), 0)
+    # Monthly results, hours are sorted by month in a TMY file
+    starts = np.searchsorted(tmy.month, np.arange(1, 13))
+    res = EasyDict()
+    res.poa = POA
+    res.ac = AC
+    res.ac_monthly = np.add.reduceat(AC, starts, axis=-1)
+    res.ac_annual = np.sum(AC, axis=-1)
+    res.solrad_monthly = np.add.reduceat(POA, starts, axis=-1) / 1000 / DAYS
+    return res
+
+def best(tmy: dict, CAP, tilts=np.arange(0, 61, 5), azimuths=np.arange(90, 271, 15), **kwargs) -> dict:
+    """
+    Sweep tilt and azimuth angles to find the maximum annual output
+    :return: EasyDict with tilt, azimuth, ac_annual and the annual output grid (tilts x azimuths)
+    """
+    grid = estimate(tmy, CAP, np.asarray(tilts)[:, None], np.asarray(azimuths)[None, :], **kwargs).ac_annual
+    i, j = np.unravel_index(np.argmax(grid), grid.shape)
+    return EasyDict(tilt=tilts[i], azimuth=azimuths[j], ac_annual=grid[i, j], grid=grid)
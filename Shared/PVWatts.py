@@ -0,0 +1,150 @@
+"""
+(Purpose) PVWatts.py is the NREL PVWatts V8 client of the Solar Panel template
+Responses are cached on disk by request parameters (capacity, location, tilt, azimuth, losses...), so a report can be
+regenerated without network. Network errors, rate limits and server errors are retried with timeouts; error responses
+of wrong parameters are not.
+For tests or demos without network, serve() runs a local stand-in server that answers from a fixture, scaled by capacity.
+Set the environment variable PVWATTS_URL to use another server, and IAC_OFFLINE=1 to only use the cache.
+"""
+
+import os, json, time
+from easydict import EasyDict
+
+# PVWatts API
+URL = os.environ.get('PVWATTS_URL', 'https://developer.nrel.gov/api/pvwatts/v8.json')
+# Cache directory
+DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'PVWatts')
+# Default system parameters
+PARAMETERS = {
+    'module_type': 0,
+    'losses': 14.08,
+    'array_type': 0,
+    'tilt': 20,
+    'azimuth': 180,
+}
+# Outputs kept in the cache
+OUTPUTS = ['ac_annual', 'ac_monthly', 'solrad_monthly', 'solrad_annual', 'dc_monthly', 'poa_monthly', 'capacity_factor']
+
+class PVWattsError(Exception):
+    """
+    PVWatts result is not available: network or HTTP error, error response, or not cached in offline mode
+    """
+
+def _key(parameters: dict) -> str:
+    """
+    Cache key of a request, the API key is not part of it
+    """
+    return '_'.join(str(k) + '=' + str(parameters[k]) for k in sorted(parameters) if k not in ['api_key', 'format'])
+
+def query(api: str, CAP, ZIP: str=None, lat: float=None, lon: float=None, retries: int=3, timeout: float=10,
+          directory: str=DIRECTORY, offline: bool=None, **system) -> dict:
+    """
+    Annual and monthly output of a PV system
+    :param api: NREL API key
+    :param CAP: System capacity, kW
+    :param ZIP: ZIP code of the plant, used if lat/lon are not given
+    :param lat: Latitude, degree
+    :param lon: Longitude, degree
+    :param retries: Number of attempts
+    :param timeout: Timeout of each attempt, s
+    :param directory: Cache directory
+    :param offline: Only use the cache, default from environment variable IAC_OFFLINE
+    :param system: Overrides of PARAMETERS, e.g. tilt=30, azimuth=170, losses=14
+    :return: EasyDict of outputs, ac_annual (kWh), ac_monthly (kWh), solrad_monthly (kWh/m2/day)...
+    """
+    parameters = dict(PARAMETERS)
+    parameters.update(system)
+    parameters['system_capacity'] = CAP
+    if lat is not None and lon is not None:
+        parameters['lat'] = lat
+        parameters['lon'] = lon
+    else:
+        parameters['address'] = str(ZIP)
+    path = os.path.join(directory, _key(parameters) + '.json')
+    if os.path.isfile(path):
+        return EasyDict(json.load(open(path)))
+    if offline is None:
+        offline = os.environ.get('IAC_OFFLINE', '0') not in ['', '0']
+    if offline:
+        raise PVWattsError("PVWatts result of " + _key(parameters) + " is not cached.")
+
+    import requests
+    parameters['api_key'] = api
+    parameters['format'] = 'json'
+    for attempt in range(retries):
+        try:
+            response = requests.get(URL, params=parameters, timeout=timeout)
+            result = response.json()
+        except (requests.RequestException, ValueError) as e:
+            # Connection error, timeout or not a JSON response
+            error = str(e)
+        else:
+            # Wrong parameters won't be fixed by retrying
+            if result.get('errors'):
+                raise PVWattsError("PVWatts error (HTTP " + str(response.status_code) + "): " + '; '.join(map(str, result['errors'])))
+            if isinstance(result.get('outputs'), dict) and 'ac_annual' in result['outputs']:
+                break
+            # Rate limit or server error, e.g. {"error": {"code": "OVER_RATE_LIMIT", ...}}
+            error = "HTTP " + str(response.status_code) + " without outputs: " + str(result.get('error', result))[:200]
+        if attempt == retries - 1:
+            raise PVWattsError("PVWatts request failed after " + str(retries) + " attempts: " + error)
+        # Back off 1, 2, 4... seconds
+        time.sleep(2 ** attempt)
+    outputs = {key: value for key, value in result['outputs'].items() if key in OUTPUTS}
+    os.makedirs(directory, exist_ok=True)
+    json.dump(outputs, open(path, 'w'), indent=4)
+    return EasyDict(outputs)
+
+def serve(fixture: str, port: int=8080):
+    """
+    Local stand-in of the PVWatts API, answers every request from a fixture scaled by system_capacity
+    Run it in another terminal, then set PVWATTS_URL=http://localhost:8080/ before running the template
+    :param fixture: JSON file of the outputs of a 1 kW system, e.g. 'Others/Solar Panel/PVWatts 1kW.json' (approximate
+                    output in eastern Pennsylvania) or a cached response saved by make_fixture()
+    :param port: Port number
+    """
+    from http.server import HTTPServer, BaseHTTPRequestHandler
+    from urllib.parse import urlparse, parse_qs
+    outputs = json.load(open(fixture))
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            query = parse_qs(urlparse(self.path).query)
+            try:
+                CAP = float(query['system_capacity'][0])
+                result = {'errors': [], 'outputs': _scale(outputs, CAP)}
+                code = 200
+            except (KeyError, ValueError):
+                result = {'errors': ['system_capacity is required.'], 'outputs': {}}
+                code = 422
+            body = json.dumps(result).encode()
+            self.send_response(code)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+    server = HTTPServer(('localhost', port), Handler)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+def make_fixture(outputs: dict, CAP: float, path: str):
+    """
+    Save outputs of a query() as a 1 kW fixture for serve()
+    :param outputs: Outputs of query()
+    :param CAP: System capacity of the query, kW
+    :param path: Fixture file
+    """
+    json.dump(_scale(outputs, 1 / CAP), open(path, 'w'), indent=4)
+
+def _scale(outputs: dict, CAP: float) -> dict:
+    """
+    Scale energy outputs of a 1 kW system, irradiance and capacity factor don't depend on capacity
+    """
+    scaled = {}
+    for key, value in outputs.items():
+        if key.startswith('ac_') or key.startswith('dc_'):
+            scaled[key] = [v * CAP for v in value] if isinstance(value, list) else value * CAP
+        else:
+            scaled[key] = value
+    return scaled
@@ -0,0 +1,120 @@
+"""
+(Purpose) Profile.py spreads the annual electricity savings of a recommendation over the 8760 hours of a year
+Every profile is a float32 array of 8760 hourly kW savings (35 KB), made from the operating schedule (HR/DY/WK) of
+the measure and saved next to the recommendation document. Compiler.py stacks the profiles of all recommendations and
+adds them up in one reduction, so demand savings come from the coincident peak of each month instead of a
+coincidence factor.
+The reference year starts on Monday, January 1 (e.g. 2018), hours are 0-23 of local time.
+"""
+
+import os
+import numpy as np
+
+# Hours of the reference year
+HOURS = 8760
+# Days per month of the reference year
+DAYS = np.array([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+# Month (0-11) and weekday (0-6, Monday is 0) of each hour
+MONTH = np.repeat(np.arange(12), DAYS * 24)
+WEEKDAY = (np.arange(HOURS) // 24) % 7
+HOUR = np.arange(HOURS) % 24
+
+def schedule(HR, DY, WK, START=8, FIRST=0) -> np.ndarray:
+    """
+    Operating schedule, fraction of each hour the equipment is on
+    Days start on Monday, a fraction of a day (e.g. DY = 5.5) is the next day with a fraction of the hours.
+    Hours past midnight run into the next day. WK weeks are on from week FIRST, wrapping around the end of the year.
+    :param HR: Hours per day, float
+    :param DY: Days per week, float
+    :param WK: Weeks per year, float
+    :param START: Starting hour of a day, 0-24
+    :param FIRST: First week of the season, 0 is the week of January 1, e.g. 29 - WK/2 for cooling centered on July
+    :return: float32 array, leading axes broadcast from the inputs, last axis 8760 hours
+    """
+    HR, DY, WK, START, FIRST = [np.asarray(x, dtype=float)[..., None, None] for x in [HR, DY, WK, START, FIRST]]
+    d = np.arange(7)[:, None]
+    k = np.arange(168)[None, :]
+    # Operating hours of each day of the week
+    start = d * 24 + START
+    end = start + HR * np.clip(DY - d, 0, 1)
+    # Overlap of each day with each hour of the week, the last day may wrap to Monday
+    overlap = sum(np.clip(np.fmin(end, k + 1 + shift) - np.fmax(start, k + shift), 0, 1) for shift in [0, 168])
+    week = np.fmin(overlap.sum(axis=-2), 1)
+    # Weeks of the season, the reference year has 52 weeks and a day
+    weeks = np.clip(WK[..., 0] - (np.arange(HOURS) // 168 - np.round(FIRST[..., 0])) % 53, 0, 1)
+    return (np.tile(week, HOURS // 168 + 1)[..., :HOURS] * weeks).astype(np.float32)
+
+def profile(ES, HR, DY, WK, START=8, FIRST=0) -> np.ndarray:
+    """
+    Hourly electricity savings of a recommendation
+    :param ES: Annual electricity savings, kWh. A scalar is spread over the operating hours of all equipment,
+               an array (e.g. per area or per motor) is spread over the operating hours of each one
+    :param HR, DY, WK, START, FIRST: Operating schedule, see schedule()
+    :return: float32 array of 8760 kW savings, adds up to the annual savings
+    """
+    on = schedule(HR, DY, WK, START, FIRST)
+    ES = np.asarray(ES, dtype=float)
+    if ES.ndim == 0:
+        on = on.reshape(-1, HOURS).sum(axis=0)
+    total = on.sum(axis=-1, keepdims=True)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        kW = np.where(total > 0, ES[..., None] * on / total, 0)
+    return kW.reshape(-1, HOURS).sum(axis=0).astype(np.float32)
+
+def save(path: str, kW):
+    """
+    Save a profile, the file name is the recommendation document with .npy
+    """
+    np.save(path, np.asarray(kW, dtype=np.float32))
+
+def load(paths: list) -> np.ndarray:
+    """
+    Stack profiles of recommendations
+    :param paths: List of .npy files, None or missing files are recommendations without profile (zeros)
+    :return: float32 array, recommendations x 8760
+    """
+    profiles = np.zeros((len(paths), HOURS), dtype=np.float32)
+    for i, path in enumerate(paths):
+        if path is not None and os.path.isfile(path):
+            profiles[i] = np.load(path)
+    return profiles
+
+def monthly_peak(kW) -> np.ndarray:
+    """
+    Peak of each month
+    :param kW: Array with 8760 hours on the last axis
+    :return: Array with 12 months on the last axis
+    """
+    starts = np.concatenate([[0], np.cumsum(DAYS * 24)[:-1]])
+    return np.maximum.reduceat(np.asarray(kW), starts, axis=-1)
+
+def demand(profiles, load: dict=None) -> dict:
+    """
+    Demand savings from coincident peaks
+    :param profiles: Hourly savings, recommendations x 8760, kW
+    :param load: Interval data of the facility (see Tariff.read), optional. The savings of each interval are the
+                 savings of the reference year in the same month, weekday and hour
+    :return: Dictionary with total (8760 kW of all recommendations), DS (monthly demand savings, kW) and
+             TDS (annual demand savings, kW/yr, sum of the months scaled to 12 months)
+    """
+    # One reduction over the recommendations
+    total = np.sum(profiles, axis=0, dtype=np.float64)
+    if load is None:
+        # Without load data, the monthly peak of the savings is coincident with the peak of the facility
+        DS = monthly_peak(total)
+        return {'total': total, 'DS': DS, 'TDS': DS.sum()}
+    # Savings by month, weekday and hour of the reference year
+    index = (MONTH * 7 + WEEKDAY) * 24 + HOUR
+    table = np.bincount(index, weights=total, minlength=12 * 168) / np.fmax(np.bincount(index, minlength=12 * 168), 1)
+    month = load['time'].astype('datetime64[M]')
+    MONTHS, m = np.unique(month, return_inverse=True)
+    day = load['time'].astype('datetime64[D]').astype(np.int64)
+    hour = (load['time'].astype(np.int64) // 60) % 24
+    saved = table[((MONTHS.astype(np.int64) % 12)[m.ravel()] * 7 + (day + 3) % 7) * 24 + hour]
+    # Monthly peak before and after the recommendations
+    before = np.full(MONTHS.size, -np.inf)
+    after = np.full(MONTHS.size, -np.inf)
+    np.maximum.at(before, m.ravel(), load['kW'])
+    np.maximum.at(after, m.ravel(), load['kW'] - saved)
+    DS = before - after
+    return {'total': total, 'DS': DS, 'TDS': DS.sum() * 12 / MONTHS.size}
@@ -0,0 +1,134 @@
+"""
+(Purpose) Properties.py provides thermophysical properties of air and natural gas flue gas at 1 atm
+Every property is a precomputed interpolant of temperature, built once at import, evaluated over arrays in one call.
+Units: temperature degF, density lb/ft3, specific heat Btu/lb.degF, viscosity lb/ft.hr, conductivity Btu/hr.ft.degF
+"""
+
+import numpy as np
+from functools import lru_cache
+from easydict import EasyDict
+
+## Constants
+# Atmospheric pressure, psia
+P = 14.696
+# Universal gas constant, psia.ft3/lbmol.R
+R = 10.7316
+# kJ/kmol.K to Btu/lbmol.R
+KJ = 0.238846
+# Pa.s to lb/ft.hr
+PAS = 2419.09
+# W/m.K to Btu/hr.ft.degF
+WMK = 0.577789
+# Temperature grid of precomputed interpolants, degF
+GRID = np.arange(-100, 3001, 10, dtype=float)
+
+# Ideal gas specific heat polynomials, cp = a + bT + cT^2 + dT^3, kJ/kmol.K, T in K (273-1800 K)
+CP = {
+    'N2': [28.90, -0.1571e-2, 0.8081e-5, -2.873e-9],
+    'O2': [25.48, 1.520e-2, -0.7155e-5, 1.312e-9],
+    'CO2': [22.26, 5.981e-2, -3.501e-5, 7.469e-9],
+    'H2O': [32.24, 0.1923e-2, 1.055e-5, -3.595e-9],
+    'Air': [28.11, 0.1967e-2, 0.4802e-5, -1.966e-9],
+}
+# Molar mass, lb/lbmol
+M = {'N2': 28.013, 'O2': 31.999, 'CO2': 44.01, 'H2O': 18.015, 'Air': 28.97}
+
+# Tabulated air density, degF and lb/ft3
+TrhoList = np.array([0, 10, 20, 30, 40, 50, 60, 70, 80, 100, 120, 140, 160, 180, 200, 250, 300, 350, 400, 450, 500, 600, 700, 800, 1000, 1200, 1400, 1600])
+rhoList = np.array([0.0862, 0.0844, 0.0826, 0.081, 0.0793, 0.0778, 0.0763, 0.0749, 0.0735, 0.0709, 0.0685, 0.0662 , 0.0641, 0.0621\
+                    , 0.0602, 0.0559, 0.0522, 0.0489, 0.0461, 0.0436, 0.041, 0.0371, 0.034, 0.0315, 0.0272, 0.0239, 0.0213, 0.0193])
+# Tabulated air specific heat at constant volume, degF and Btu/lb.degF
+TCvList = np.array([-352, -318, -313, -280, -244, -208, -172, -136, -99.7, -63.7, -27.7, 8.3, 32, 44.3, 60, 80.3, 116, 152, 188, 224, 260, 440, 620, 800, 980, 1160, 1520, 2240, 2960])
+CvList = np.array([0.2802, 0.251, 0.1791, 0.1739, 0.1726, 0.1716, 0.1713, 0.1712, 0.1711, 0.1711, 0.1711, 0.1712, 0.1713, 0.1713, 0.1714\
+                   , 0.1715, 0.1718, 0.1721, 0.1725, 0.173, 0.1735, 0.1773, 0.1825, 0.1881, 0.1939, 0.1991, 0.2082, 0.2204, 0.2277])
+
+class Table:
+    """
+    Precomputed interpolant of a property
+    """
+    def __init__(self, T, values):
+        """
+        :param T: Increasing temperatures, degF
+        :param values: Property values
+        """
+        self.T = np.asarray(T, dtype=float)
+        self.values = np.asarray(values, dtype=float)
+
+    def __call__(self, T):
+        """
+        :param T: Temperature, degF, scalar or array. Clamped to the range of the table
+        """
+        return np.interp(T, self.T, self.values)
+
+def _kelvin(T):
+    return (np.asarray(T, dtype=float) - 32) / 1.8 + 273.15
+
+def _cp(species: str, T):
+    """
+    Molar specific heat, Btu/lbmol.R
+    """
+    a, b, c, d = CP[species]
+    K = np.clip(_kelvin(T), 273, 1800)
+    return (a + b * K + c * K ** 2 + d * K ** 3) * KJ
+
+def _sutherland(T, ref: float, T0: float, S: float):
+    """
+    Sutherland's law of viscosity and conductivity of dilute gases
+    """
+    K = _kelvin(T)
+    return ref * (K / T0) ** 1.5 * (T0 + S) / (K + S)
+
+def _gas(fractions: dict) -> dict:
+    """
+    Build interpolants of an ideal gas mixture
+    :param fractions: Mole fractions of species
+    :return: EasyDict of Tables: density, cp, cv, viscosity, conductivity, prandtl
+    """
+    MW = sum(x * M[s] for s, x in fractions.items())
+    gas = EasyDict()
+    gas.MW = MW
+    gas.density = Table(GRID, P * MW / (R * (GRID + 459.67)))
+    cp = sum(x * _cp(s, GRID) for s, x in fractions.items()) / MW
+    gas.cp = Table(GRID, cp)
+    # R in Btu/lbmol.R is 1.98588
+    gas.cv = Table(GRID, cp - 1.98588 / MW)
+    # Air-like viscosity and conductivity, good for air and flue gas with excess air
+    mu = _sutherland(GRID, 1.716e-5, 273.15, 110.4) * PAS
+    k = _sutherland(GRID, 0.0241, 273.15, 194.0) * WMK
+    gas.viscosity = Table(GRID, mu)
+    gas.conductivity = Table(GRID, k)
+    gas.prandtl = Table(GRID, cp * mu / k)
+    return gas
+
+# Dry air, density and cv are from the tables used by the IAC templates
+AIR = _gas({'Air': 1.0})
+AIR.density = Table(TrhoList, rhoList)
+AIR.cv = Table(TCvList, CvList)
+
+@lru_cache(maxsize=None)
+def flue_gas(XA: float=10) -> dict:
+    """
+    Flue gas of natural gas (methane) with excess air
+    CH4 + 2(1+x)(O2 + 3.76 N2) -> CO2 + 2 H2O + 2x O2 + 7.52(1+x) N2
+    :param XA: Excess air, %
+    :return: EasyDict of Tables, same as AIR
+    """
+    x = XA / 100
+    moles = {'CO2': 1.0, 'H2O': 2.0, 'O2': 2 * x, 'N2': 7.52 * (1 + x)}
+    total = sum(moles.values())
+    return _gas({s: n / total for s, n in moles.items()})
+
+def properties(T, gas: dict=AIR) -> dict:
+    """
+    All properties at temperatures in a single call
+    :param T: Temperature, degF, scalar or array
+    :param gas: AIR or flue_gas(XA)
+    :return: EasyDict of arrays: density, cp, cv, viscosity, conductivity, prandtl, and
+             kinematic viscosity nu (ft2/hr) and thermal expansion coefficient beta (1/R) of ideal gas
+    """
+    res = EasyDict()
+    for key in ['density', 'cp', 'cv', 'viscosity', 'conductivity', 'prandtl']:
+        res[key] = gas[key](T)
+    res.nu = res.viscosity / res.density
+    res.beta = 1 / (np.asarray(T, dtype=float) + 459.67)
+    return res
@@ -0,0 +1,179 @@
+"""
+(Purpose) Psychrometrics.py calculates properties of moist air for the HVAC templates
+Humidity ratio, enthalpy, dew point and wet bulb temperature are evaluated over numpy arrays (all hours of hourly
+weather in one call), equations from ASHRAE Handbook Fundamentals (2017), Chapter 1.
+Properties of hourly weather are cached next to the weather data, so a location is only calculated once.
+Units: temperature degF, pressure psia, humidity ratio lb water/lb dry air, enthalpy Btu/lb dry air, relative humidity %
+"""
+
+import os
+import numpy as np
+from datetime import datetime
+from easydict import EasyDict
+from Shared import Weather
+
+## Constants
+# Atmospheric pressure at sea level, psia
+P = 14.696
+# hPa to psia
+HPA = 0.0145038
+# Ratio of molar masses of water and dry air
+MW = 0.621945
+# Latent heat of water vapor at 0 degF, Btu/lb
+HG = 1061.0
+# Hyland-Wexler coefficients, saturation pressure over ice (below 32 degF) and water, T in R, psia
+ICE = [-1.0214165e4, -4.8932428, -5.3765794e-3, 1.9202377e-7, 3.5575832e-10, -9.0344688e-14, 4.1635019]
+WATER = [-1.0440397e4, -1.1294650e1, -2.7022355e-2, 1.2890360e-5, -2.4780681e-9, 0.0, 6.5459673]
+
+def _a(x):
+    """
+    Convert input to float numpy array
+    """
+    return np.asarray(x, dtype=float)
+
+def pressure(ELEV):
+    """
+    Standard atmospheric pressure
+    :param ELEV: Elevation, ft
+    :return: psia
+    """
+    return P * (1 - 6.8754e-6 * _a(ELEV)) ** 5.2559
+
+def saturation_pressure(T):
+    """
+    Saturation pressure of water vapor, over ice below 32 degF
+    :param T: Temperature, degF
+    :return: psia
+    """
+    TR = _a(T) + 459.67
+    C = [np.where(TR < 491.67, ice, water) for ice, water in zip(ICE, WATER)]
+    return np.exp(C[0] / TR + C[1] + C[2] * TR + C[3] * TR ** 2 + C[4] * TR ** 3 + C[5] * TR ** 4 + C[6] * np.log(TR))
+
+def humidity_ratio(T, RH, P=P):
+    """
+    Humidity ratio from relative humidity
+    :param T: Dry bulb temperature, degF
+    :param RH: Relative humidity, %
+    :param P: Pressure, psia
+    :return: lb/lb
+    """
+    PW = _a(RH) / 100 * saturation_pressure(T)
+    return MW * PW / (P - PW)
+
+def dew_point_ratio(DP, P=P):
+    """
+    Humidity ratio from dew point
+    :param DP: Dew point temperature, degF
+    :param P: Pressure, psia
+    :return: lb/lb
+    """
+    PW = saturation_pressure(DP)
+    return MW * PW / (P - PW)
+
+def relative_humidity(T, W, P=P):
+    """
+    Relative humidity
+    :param T: Dry bulb temperature, degF
+    :param W: Humidity ratio, lb/lb
+    :param P: Pressure, psia
+    :return: %
+    """
+    PW = P * _a(W) / (MW + _a(W))
+    return PW / saturation_pressure(T) * 100
+
+def enthalpy(T, W):
+    """
+    Enthalpy of moist air
+    :param T: Dry bulb temperature, degF
+    :param W: Humidity ratio, lb/lb
+    :return: Btu/lb dry air
+    """
+    return 0.240 * _a(T) + _a(W) * (HG + 0.444 * _a(T))
+
+def _solve(f, low, high, iterations: int=40):
+    """
+    Bisection of f(x) = 0 on arrays, f is increasing between low and high
+    """
+    low, high = np.broadcast_arrays(_a(low), _a(high))
+    low, high = low.copy(), high.copy()
+    for i in range(iterations):
+        x = (low + high) / 2
+        above = f(x) > 0
+        high = np.where(above, x, high)
+        low = np.where(above, low, x)
+    x = (low + high) / 2
+    # No solution if f is nan, e.g. humidity is missing
+    return np.where(np.isnan(f(x)), np.nan, x)
+
+def dew_point(W, P=P):
+    """
+    Dew point temperature
+    :param W: Humidity ratio, lb/lb
+    :param P: Pressure, psia
+    :return: degF
+    """
+    W = _a(W)
+    return _solve(lambda DP: dew_point_ratio(DP, P) - W, np.full(W.shape, -100.0), np.full(W.shape, 200.0))
+
+def wet_bulb(T, W, P=P):
+    """
+    Thermodynamic wet bulb temperature, between the dew point and the dry bulb temperature
+    :param T: Dry bulb temperature, degF
+    :param W: Humidity ratio, lb/lb
+    :param P: Pressure, psia
+    :return: degF
+    """
+    T, W = np.broadcast_arrays(_a(T), _a(W))
+    def f(WB):
+        WS = dew_point_ratio(WB, P)
+        # Humidity ratio of air at T that is saturated adiabatically at WB, over water or ice
+        water = ((1093 - 0.556 * WB) * WS - 0.240 * (T - WB)) / (1093 + 0.444 * T - WB)
+        ice = ((1220 - 0.04 * WB) * WS - 0.240 * (T - WB)) / (1220 + 0.444 * T - 0.48 * WB)
+        return np.where(WB < 32, ice, water) - W
+    return _solve(f, dew_point(W, P), T)
+
+def weather(data: dict, P=P) -> dict:
+    """
+    Psychrometric properties of weather data
+    :param data: Columns of weather data, temp (degF) and dwpt (degF) or rhum (%), pres (hPa) if available
+    :param P: Pressure when pres is not available, psia
+    :return: EasyDict with W, H, DP, WB and RH, nan if humidity is missing
+    """
+    T = _a(data['temp'])
+    if 'pres' in data:
+        P = np.where(np.isfinite(data['pres']), _a(data['pres']) * HPA, P)
+    if 'dwpt' in data:
+        W = dew_point_ratio(data['dwpt'], P)
+    elif 'rhum' in data:
+        W = humidity_ratio(T, data['rhum'], P)
+    else:
+        W = np.full(T.shape, np.nan)
+    res = EasyDict()
+    res.W = W
+    res.H = enthalpy(T, W)
+    res.DP = dew_point(W, P)
+    res.WB = wet_bulb(T, W, P)
+    res.RH = relative_humidity(T, W, P)
+    return res
+
+def hourly(station, start: datetime, end: datetime, cache=None) -> dict:
+    """
+    Hourly weather with psychrometric properties, cached next to the weather data
+    :param station: Meteostat station ID or (latitude, longitude)
+    :param start, end: Date range, see Weather.Cache.get()
+    :param cache: Weather cache, default Weather.CACHE
+    :return: EasyDict with time, temp and the columns of weather()
+    """
+    cache = Weather.CACHE if cache is None else cache
+    data = cache.hourly(station, start, end)
+    path = cache.path(Weather.station_key(station), 'psychrometrics', start, end)
+    if os.path.isfile(path):
+        with np.load(path) as columns:
+            res = EasyDict({name: columns[name] for name in columns.files})
+    else:
+        res = weather(data)
+        os.makedirs(cache.directory, exist_ok=True)
+        np.savez(path, **res)
+    res.time = data.time
+    res.temp = data.temp
+    return res
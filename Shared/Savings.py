@@ -0,0 +1,1136 @@
+"""
+(Purpose) Savings.py contains the calculation core of every recommendation template.
+Every measure is a calculation graph (see Graph.py): each derived field is a pure function of the fields it depends on.
+Inputs broadcast element-wise, so a single call can evaluate thousands of input combinations.
+For templates with multiple areas/units, the LAST axis is the area/unit axis and totals are summed over it.
+Keyword names are the same as the keys in Utility.json5 and database.json5, so a template can simply call
+Savings.measure(**iac) to evaluate all fields. Unused keys are ignored.
+Savings.measure.model(**iac) returns a lazy model, only the accessed fields are evaluated and changing an input
+with update() only recomputes the fields that depend on it.
+"""
+
+import numpy as np
+from easydict import EasyDict
+from Shared.AFR import AFR
+from Shared.Graph import Graph
+from Shared import Properties, Insulation, Psychrometrics
+
+## Part load tables
+# Load fraction, %
+VFDLoad = np.linspace(20, 100, num=17)
+# Power fraction of air compressor with VFD, %
+CompressorVFD = np.array([25, 28, 33, 38, 42, 47, 52, 57, 61, 65, 70, 75, 80, 85, 90, 95, 105])
+# Power fraction of electric motor with VFD, %
+MotorVFD = np.array([5, 6, 8, 11, 14, 17, 21, 26, 32, 38, 44, 50, 57, 64, 73, 86, 105])
+
+def _a(x):
+    """
+    Convert input to float numpy array
+    """
+    return np.asarray(x, dtype=float)
+
+def _b(x):
+    """
+    Convert a per-recommendation input to float numpy array with a trailing axis,
+    so it can broadcast against per-area/unit arrays
+    """
+    return np.asarray(x, dtype=float)[..., None]
+
+def payback_years(ACS, IC):
+    """
+    Numeric simple payback period
+    :param ACS: Annual Cost Savings ($/yr), scalar or array
+    :param IC: Implementation Cost ($), scalar or array
+    :return: Payback period (yr), 0 if immediate, inf if never
+    """
+    ACS, IC = np.broadcast_arrays(_a(ACS), _a(IC))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        PB = np.where(ACS > 0, IC / ACS, np.inf)
+    return np.where(IC == 0, 0.0, PB)
+
+def _operating_hours(g, trunc: bool=False):
+    """
+    Register OH, operating hours
+    :param trunc: Truncate to integer
+    """
+    @g.node
+    def OH(HR, DY, WK):
+        OH = _a(HR) * DY * WK
+        return np.trunc(OH) if trunc else OH
+
+def _cost_savings(g):
+    """
+    Register ECS, DCS and ACS from ES and DS
+    """
+    @g.node
+    def ECS(ES, EC):
+        return np.rint(ES * EC)
+    @g.node
+    def DCS(DS, DC):
+        return np.rint(DS * DC)
+    @g.node
+    def ACS(ECS, DCS):
+        return ECS + DCS
+
+def _payback(g, cost: str='IC'):
+    """
+    Register PB, numeric payback period
+    :param cost: Field of the implementation cost
+    """
+    g.add('PB', payback_years, ['ACS', cost])
+
+def _rebate(g):
+    """
+    Vectorized version of IAC.rebate(), registers RB, MRB, MIC and numeric MPB
+    """
+    # ES or NGS is 0 if the measure has no such savings
+    @g.node
+    def RB(REB=False, ES=0, NGS=0, ERR=0, NRR=0):
+        # electricity and natural gas rebate if savings are positive
+        RB = np.rint(np.fmax(ES, 0) * _a(ERR)) + np.rint(np.fmax(NGS, 0) * _a(NRR))
+        return np.where(np.asarray(REB, dtype=bool), RB, 0)
+    # Modified rebate, up to 50% IC
+    @g.node
+    def MRB(RB, IC, REB=False):
+        return np.where(np.asarray(REB, dtype=bool), np.fmin(RB, _a(IC) / 2), 0)
+    @g.node
+    def MIC(IC, MRB):
+        return IC - MRB
+    @g.node
+    def MPB(ACS, MIC):
+        return payback_years(ACS, MIC)
+
+def scalarize(res: dict) -> dict:
+    """
+    Convert numpy results to python types before string formatting.
+    0-d arrays become int or float, whole-number floats become int.
+    :param res: EasyDict of results
+    :return: res
+    """
+    for key in res.keys():
+        value = np.asarray(res[key])
+        if value.dtype.kind not in 'biuf':
+            continue
+        if value.dtype.kind == 'f' and np.all(np.isfinite(value)) and np.all(np.mod(value, 1) == 0):
+            value = value.astype(np.int64)
+        if value.dtype.kind == 'b':
+            value = value.astype(bool)
+        if value.ndim == 0:
+            res[key] = value.item()
+        else:
+            res[key] = value
+    return res
+
+def _duration(x, DUR):
+    """
+    Average over a load duration histogram
+    :param x: Values at the bins of the histogram (trailing axis)
+    :param DUR: Percent of time in each bin
+    """
+    return np.sum(_a(x) * _a(DUR), axis=-1) / np.sum(_a(DUR), axis=-1)
+
+def _sigfig(x, n: int):
+    """
+    Round to n significant digits, element-wise
+    """
+    x = _a(x)
+    safe = np.where(x == 0, 1, np.abs(x))
+    scale = 10.0 ** (n - 1 - np.floor(np.log10(safe)))
+    return np.rint(x * scale) / scale
+
+## Boiler
+
+def _afr_controller():
+    g = Graph("Install Air-Fuel Ratio Controller")
+    _operating_hours(g, trunc=True)
+    # Current and proposed (2% O2) available heat, %, nan if invalid
+    @g.node
+    def CAH(CAT, FGT, O2):
+        return np.round(AFR(CAT, FGT, O2).filled(np.nan), 2)
+    @g.node
+    def PAH(CAT, FGT):
+        return np.round(AFR(CAT, FGT, 2).filled(np.nan), 2)
+    # No savings if O2 is already at or below 2%
+    @g.node
+    def SAV(CAH, PAH):
+        return np.maximum(np.round((PAH - CAH) / PAH * 100, 2), 0)
+    @g.node
+    def IC(LABOR, PARTS):
+        return np.rint(_a(LABOR) + PARTS)
+    @g.node
+    def NGS(SIZE, OH, LF, SAV):
+        return np.rint(_a(SIZE) * OH * (_a(LF) / 100) * (SAV / 100))
+    @g.node
+    def ACS(NGS, NGC):
+        return np.rint(NGS * NGC)
+    _payback(g)
+    _rebate(g)
+    return g
+
+# Install Air-Fuel Ratio Controller, proposed condition is 2% O2
+# Fields: OH, CAH, PAH, SAV, IC, NGS, ACS, PB and rebate results
+afr_controller = _afr_controller()
+
+def _afr_controllers():
+    g = Graph("Install Air-Fuel Ratio Controllers on multiple boilers")
+    _operating_hours(g, trunc=True)
+    # Per-boiler current and proposed (2% O2) available heat, %, nan if invalid
+    @g.node
+    def CAHi(CAT, FGT, O2):
+        return np.round(AFR(CAT, FGT, O2).filled(np.nan), 2)
+    @g.node
+    def PAHi(CAT, FGT):
+        return np.round(AFR(CAT, FGT, 2).filled(np.nan), 2)
+    # No savings of a boiler if its O2 is already at or below 2%
+    @g.node
+    def SAVi(CAHi, PAHi):
+        return np.maximum(np.round((PAHi - CAHi) / PAHi * 100, 2), 0)
+    # Firing rate of each boiler, MMBtu/hr
+    @g.node
+    def FIRE(SIZE, LF, SAVi):
+        return np.broadcast_to(_a(SIZE) * (_a(LF) / 100), np.shape(SAVi))
+    @g.node
+    def NGSi(FIRE, OH, SAVi):
+        return np.rint(FIRE * OH[..., None] * (SAVi / 100))
+    # One controller per boiler
+    @g.node
+    def ICi(LABOR, PARTS, NGSi):
+        return np.broadcast_to(np.rint(_a(LABOR) + PARTS)[..., None], np.shape(NGSi))
+    # Savings curve of target O2 levels, boiler x target
+    @g.node
+    def SAVc(CAT, FGT, CAHi, O2T=[2, 3, 4, 5]):
+        PAHc = np.round(AFR(_b(CAT), _b(FGT), O2T).filled(np.nan), 2)
+        return np.maximum(np.round((PAHc - CAHi[..., None]) / PAHc * 100, 2), 0)
+    @g.node
+    def NGSc(FIRE, OH, SAVc):
+        return np.rint(FIRE[..., None] * OH[..., None, None] * (SAVc / 100))
+    ## Totals
+    @g.node
+    def TSIZE(SIZE, SAVi):
+        return np.sum(np.broadcast_to(_a(SIZE), np.shape(SAVi)), axis=-1)
+    # Firing rate weighted savings, %
+    @g.node
+    def SAV(SAVi, FIRE):
+        return np.round(np.sum(SAVi * FIRE, axis=-1) / np.sum(FIRE, axis=-1), 2)
+    @g.node
+    def NGS(NGSi):
+        return np.sum(NGSi, axis=-1)
+    @g.node
+    def ACS(NGS, NGC):
+        return np.rint(NGS * NGC)
+    @g.node
+    def IC(ICi):
+        return np.sum(ICi, axis=-1)
+    _payback(g)
+    _rebate(g)
+    return g
+
+# Install Air-Fuel Ratio Controllers on multiple boilers, proposed condition is 2% O2
+# SIZE, LF, O2, FGT and CAT are per boiler (trailing axis), O2T is the list of target O2 of the savings curve
+# Fields: OH, per-boiler CAHi, PAHi, SAVi, FIRE, NGSi, ICi, savings curve SAVc and NGSc (boiler x target),
+#         and totals TSIZE, SAV, NGS, ACS, IC, PB and rebate results
+afr_controllers = _afr_controllers()
+
+def _exhaust_gas_heat():
+    g = Graph("Recover Exhaust Gas Heat")
+    # Air density and specific heat from the tables of the template (the specific heat table is at constant volume)
+    @g.node
+    def RHO(TI):
+        return np.round(Properties.AIR.density(TI), 3)
+    @g.node
+    def CP(TI):
+        return np.round(Properties.AIR.cv(TI), 3)
+    _operating_hours(g, trunc=True)
+    @g.node
+    def NGS(CFM, RHO, CP, TI, TO, ETA, OH):
+        return np.rint(_a(CFM) * RHO * 60 * CP * (_a(TI) - TO) * (_a(ETA) / 100) * OH / 1e6)
+    # Electricity and demand usage of the blower
+    @g.node
+    def EU(HP, OH):
+        return np.rint(_a(HP) * 0.746 * OH)
+    @g.node
+    def DU(HP, CF):
+        return np.rint(_a(HP) * 0.746 * 12 * (_a(CF) / 100))
+    @g.node
+    def NGCS(NGS, NGC):
+        return np.rint(NGS * NGC)
+    @g.node
+    def EUC(EU, EC):
+        return np.rint(EU * EC)
+    @g.node
+    def DUC(DU, DC):
+        return np.rint(DU * DC)
+    @g.node
+    def ES(EU):
+        return -EU
+    @g.node
+    def DS(DU):
+        return -DU
+    @g.node
+    def ACS(NGCS, EUC, DUC):
+        return NGCS - EUC - DUC
+    g.add('IC', _a, ['IC'])
+    _payback(g)
+    _rebate(g)
+    return g
+
+# Recover Exhaust Gas Heat
+# Fields: RHO, CP, OH, NGS, EU, DU, NGCS, EUC, DUC, ES, DS, ACS, IC, PB and rebate results
+exhaust_gas_heat = _exhaust_gas_heat()
+
+## Compressor
+# Optional input XF of the compressor measures scales the savings for the measures implemented before them
+# on the same system (interaction factor from Compressor.py), %, default 100
+
+def _compressor_exhaust_heat():
+    g = Graph("Use Compressor Exhaust to Heat during Winter Months")
+    _operating_hours(g)
+    # EC in database.json5 is the fraction of electrical energy turned into heat, %
+    @g.node
+    def NGS(HP, FR, EC, EHR, OH, XF=100):
+        return np.rint(_a(HP) * FR / 100 * _a(EC) / 100 * 0.002544 * _a(EHR) / 100 * OH * (_a(XF) / 100))
+    @g.node
+    def ACS(NGS, NGC):
+        return np.rint(NGS * NGC)
+    g.add('IC', _a, ['IC'])
+    _payback(g)
+    return g
+
+# Use Compressor Exhaust to Heat during Winter Months
+# Fields: OH, NGS, ACS, IC, PB
+compressor_exhaust_heat = _compressor_exhaust_heat()
+
+def _compressor_vfd(g):
+    """
+    Register FPC and FPV, power fractions of air compressor without and with VFD, %
+    CT is the control type, 1: blow off, 2: modulation, 3: load/unload
+    LF is the load fraction, %
+    With a data logger, LFB and DUR are the load duration histogram (see Logger.py) and the power fractions are
+    averaged over it instead of evaluated at LF
+    """
+    @g.node
+    def FPC(CT, LF, LFB=None, DUR=None):
+        CT = np.asarray(CT)
+        if not np.all(np.isin(CT, [1, 2, 3])):
+            raise Exception("Wrong control type!")
+        if DUR is None:
+            LF = _a(LF)
+            return np.select([CT == 1, CT == 2, CT == 3], [np.full_like(LF, 100), np.rint(0.3 * LF + 70), np.rint(0.5 * LF + 50)])
+        LFB = _a(LFB)
+        FPC = np.select([_b(CT) == 1, _b(CT) == 2, _b(CT) == 3], [np.full_like(LFB, 100), 0.3 * LFB + 70, 0.5 * LFB + 50])
+        return np.rint(_duration(FPC, DUR))
+    @g.node
+    def FPV(LF, LFB=None, DUR=None):
+        if DUR is None:
+            return np.rint(np.interp(LF, VFDLoad, CompressorVFD))
+        return np.rint(_duration(np.interp(LFB, VFDLoad, CompressorVFD), DUR))
+    @g.node
+    def IC(VFD, AIC, TANK=False, ATP=0):
+        # Additional tank if needed
+        return np.where(TANK, _a(VFD) + AIC + ATP, _a(VFD) + AIC)
+
+def _existing_compressor_vfd():
+    g = Graph("Install VFD on Existing Air Compressor")
+    _operating_hours(g)
+    _compressor_vfd(g)
+    @g.node
+    def CPD(HP, FPC, ETAE):
+        return np.rint((_a(HP) * 0.746 * (FPC / 100)) / (_a(ETAE) / 100))
+    @g.node
+    def PPD(HP, FPV, ETAP):
+        return np.rint((_a(HP) * 0.746 * (FPV / 100)) / (_a(ETAP) / 100))
+    @g.node
+    def ES(CPD, PPD, OH, XF=100):
+        return (CPD - PPD) * OH * (_a(XF) / 100)
+    @g.node
+    def DS(CPD, PPD, CF, XF=100):
+        return (CPD - PPD) * (_a(CF) / 100) * 12 * (_a(XF) / 100)
+    _cost_savings(g)
+    _payback(g)
+    _rebate(g)
+    return g
+
+# Install VFD on Existing Air Compressor
+# Fields: OH, FPC, FPV, IC, CPD, PPD, ES, DS, ECS, DCS, ACS, PB and rebate results
+existing_compressor_vfd = _existing_compressor_vfd()
+
+def _new_compressor_vfd():
+    g = Graph("Install New Air Compressor with VFD")
+    _operating_hours(g)
+    _compressor_vfd(g)
+    @g.node
+    def CPD(HPC, FPC, ETAE):
+        return np.rint((_a(HPC) * 0.746 * (FPC / 100)) / (_a(ETAE) / 100))
+    @g.node
+    def PPD(HPP, FPV, ETAP):
+        return np.rint((_a(HPP) * 0.746 * (FPV / 100)) / (_a(ETAP) / 100))
+    @g.node
+    def ES(CPD, PPD, OH, XF=100):
+        return np.rint((CPD - PPD) * OH * (_a(XF) / 100))
+    @g.node
+    def DS(CPD, PPD, CF, XF=100):
+        return np.rint((CPD - PPD) * (_a(CF) / 100) * 12 * (_a(XF) / 100))
+    _cost_savings(g)
+    _payback(g)
+    _rebate(g)
+    return g
+
+# Install New Air Compressor with VFD
+# Fields: OH, FPC, FPV, IC, CPD, PPD, ES, DS, ECS, DCS, ACS, PB and rebate results
+new_compressor_vfd = _new_compressor_vfd()
+
+def _intake_air():
+    g = Graph("Draw Compressor Intake Air from Outside")
+    # Compressor Work Reduction, TO is the average outside temperature during winter months
+    @g.node
+    def CWR(TI, TO):
+        return np.round((_a(TI) - TO) / (_a(TI) + 460) * 100, 2)
+    _operating_hours(g)
+    # Power Reduction
+    @g.node
+    def PR(HP, FR, CWR, ETA):
+        return np.round((_a(HP) * 0.746 * (_a(FR) / 100) * (CWR / 100)) / (_a(ETA) / 100), 1)
+    @g.node
+    def ES(PR, OH, XF=100):
+        return np.rint(PR * OH * (_a(XF) / 100))
+    @g.node
+    def DS(PR, CF, C2, XF=100):
+        return np.rint(PR * (_a(CF) / 100) * C2 * (_a(XF) / 100))
+    _cost_savings(g)
+    g.add('IC', _a, ['IC'])
+    _payback(g)
+    return g
+
+# Draw Compressor Intake Air from Outside
+# Fields: CWR, OH, PR, ES, DS, ECS, DCS, ACS, IC, PB
+intake_air = _intake_air()
+
+def _reduce_set_pressure():
+    g = Graph("Reduce Compressor Set Pressure")
+    # Constants
+    AP = 14.7
+    k = 1.4
+    # Power reduction, 1 decimal point percent
+    @g.node
+    def POW(RCP, CCP, N):
+        N = _a(N)
+        POW = 1 - (((_a(RCP) + AP) / AP) ** ((k - 1) / (k * N)) - 1) / (((_a(CCP) + AP) / AP) ** ((k - 1) / (k * N)) - 1)
+        return np.round(POW * 100, 1)
+    # Power Draw Reduction, 3 significant digits
+    @g.node
+    def PDR(HP, LF, POW, ETA):
+        return _sigfig(_a(HP) * 0.746 * (_a(LF) / 100) * (POW / 100) / (_a(ETA) / 100), 3)
+    _operating_hours(g)
+    @g.node
+    def ES(PDR, OH, XF=100):
+        return np.rint(PDR * OH * (_a(XF) / 100))
+    @g.node
+    def DS(PDR, CF, XF=100):
+        return np.rint(PDR * (_a(CF) / 100) * 12 * (_a(XF) / 100))
+    _cost_savings(g)
+    g.add('IC', _a, ['IC'])
+    _payback(g)
+    return g
+
+# Reduce Compressor Set Pressure
+# Fields: POW, PDR, OH, ES, DS, ECS, DCS, ACS, IC, PB
+reduce_set_pressure = _reduce_set_pressure()
+
+# Leak diameters, in
+LeakDiameter = np.array([1.0/64, 1.0/32, 1.0/16, 1.0/8, 3.0/16, 1.0/4])
+
+def _repair_leaks():
+    g = Graph("Repair Leaks in Compressed Air Lines")
+    # Constants
+    PA = 14.7 # Atmosphere, psia
+    C1 = 28.37 # Isentropic sonic volumetric flow constant
+    C2 = 60.0 # Conversion constant; sec/min
+    C3 = 144.0 # Conversion constant; in2/ft2
+    C4 = 3.03e-5 # Conversion constant; HP.min/ft.lb
+    C5 = 0.746 # Conversion factor; kW/HP
+    CD = 0.8 # Coefficient of discharge for square edged orifice
+    k = 1.4 # Specific heat ratio of air
+
+    _operating_hours(g)
+    @g.node
+    def RT(P0):
+        return np.round(PA / _a(P0), 4)
+    @g.node
+    def VF0(T0, T1, P1):
+        return np.pi / 4 * (_a(T0) + 460) * _a(P1) / PA * C1 * C2 * CD / C3 / np.sqrt(_a(T1) + 460)
+    # Number of leaks, of each size in LeakDiameter, or of each leak in DIA (usually 1 per surveyed leak)
+    @g.node
+    def NL(NL1=0, NL2=0, NL3=0, NL4=0, NL5=0, NL6=0, NL=None):
+        if NL is not None:
+            return _a(NL)
+        return np.stack(np.broadcast_arrays(*[np.asarray(x) for x in [NL1, NL2, NL3, NL4, NL5, NL6]]), axis=-1)
+    # Flow rate (cfm), measured flow (FLOW) is used where it is not nan
+    # Flow is proportional to line pressure, leaks at their own pressure (PLEAK) are scaled from P1
+    @g.node
+    def VF(VF0, P1, PLEAK=np.nan):
+        PLEAK = _a(PLEAK)
+        return VF0[..., None] * np.where(np.isnan(PLEAK), 1, PLEAK / _b(P1))
+    @g.node
+    def FR(VF, DIA=LeakDiameter, FLOW=np.nan):
+        return np.where(np.isnan(_a(FLOW)), _a(DIA) * _a(DIA) * VF, _a(FLOW))
+    # Equivalent leak diameter (in)
+    @g.node
+    def DE(FR, VF):
+        return np.sqrt(FR / VF)
+    # Power Loss (hp)
+    @g.node
+    def PL(FR, N, P0, EA, EM):
+        return PA * C3 * FR * k/(k-1.0) * _b(N) * C4 * \
+            (np.power(_b(P0)/PA, (k-1.0)/(k*_b(N))) - 1.0) / ((_b(EA)/100) * (_b(EM)/100))
+    # Demand Loss (kW/yr)
+    @g.node
+    def DL(PL, CF):
+        return PL * C5 * (_b(CF)/100) * 12
+    # Energy Loss (kWh/yr)
+    @g.node
+    def EL(PL, OH):
+        return PL * C5 * OH[..., None]
+    # Leak Cost ($/yr)
+    @g.node
+    def LC(DL, EL, DC, EC):
+        return DL * _b(DC) + EL * _b(EC)
+    @g.node
+    def DSi(NL, DL, XF=100):
+        return NL * DL * (_b(XF) / 100)
+    @g.node
+    def ESi(NL, EL, XF=100):
+        return NL * EL * (_b(XF) / 100)
+    @g.node
+    def CSi(NL, LC, XF=100):
+        return NL * LC * (_b(XF) / 100)
+    @g.node
+    def SNL(NL):
+        return np.sum(NL, axis=-1)
+    @g.node
+    def ADS(DSi):
+        return np.rint(np.sum(DSi, axis=-1))
+    @g.node
+    def AES(ESi):
+        return np.rint(np.sum(ESi, axis=-1))
+    @g.node
+    def ACS(CSi):
+        return np.rint(np.sum(CSi, axis=-1))
+    g.add('ES', lambda AES: AES, ['AES'])
+    g.add('DS', lambda ADS: ADS, ['ADS'])
+    # Estimate 1+1 hour per leak
+    @g.node
+    def FLC(SNL, LR):
+        return (1+1) * SNL * _a(LR)
+    @g.node
+    def IC(FLC, USLD):
+        return FLC + USLD
+    _payback(g)
+    return g
+
+# Repair Leaks in Compressed Air Lines
+# Per-size fields have a trailing axis of 6 leak sizes (1/64 to 1/4 in) by default, or of each surveyed leak
+# when the per-leak inputs DIA (in), NL, FLOW (cfm, nan if not measured) and PLEAK (psig, nan for P1) are given
+# Fields: OH, RT, VF0, per-size NL, VF, FR, DE, PL, DL, EL, LC, DSi, ESi, CSi,
+#         and totals SNL, ADS, AES, ACS, ES, DS, FLC, IC, PB
+repair_leaks = _repair_leaks()
+
+## HVAC
+
+def _air_curtain(chart: bool=False):
+    g = Graph("Install Air Curtain for Doorways" + (" (heat transfer chart)" if chart else ""))
+    ## Constants
+    # Conversion constant; m/yr
+    C2 = 6
+    # Coincidence factor; %
+    CF = 100
+    # Conversion constant; KW/HP
+    C3 = 0.746
+    # Discharge coefficient of the two-way flow through an open door
+    CD = 0.65
+    # Gravity; ft/s^2
+    G = 32.174
+    # Correction Coefficient; kWh/MMBtu
+    C1 = 293
+
+    ## Table
+    @g.node
+    def AREA(DW, DH):
+        return _a(DW) * DH
+    @g.node
+    def TOTALAREA(AREA, AMT):
+        return np.sum(AREA * AMT, axis=-1)
+    if chart:
+        ## Heat transfer per door from the chart, summer only
+        # Total heat transfer, MMBtu/yr
+        @g.node
+        def HT(HTF, AMT):
+            return np.sum(_a(HTF) * AMT, axis=-1)
+        # Summer heat transfer, corrected for operating days and outside temperature, kWh/yr
+        @g.node
+        def SHT(HTF, AMT, DY, OT, RT, TDC, TC=5):
+            return np.rint(np.sum(_a(HTF) * AMT * (_a(DY) / TC) * C1 * (_a(OT) - RT), axis=-1)) / TDC
+        @g.node
+        def WHT(SHT):
+            return np.zeros(np.shape(SHT))
+    else:
+        ## Infiltration, temperature bins x doors
+        # Air flow through an open door by the two-way stack flow, ft^3/s
+        @g.node
+        def VA(TB, RT, DW, DH):
+            TB = _a(TB)[..., None]
+            TM = (TB + _a(RT)) / 2
+            return CD / 3 * _a(DW) * _a(DH) * np.sqrt(G * _a(DH) * np.abs(TB - _a(RT)) / (TM + 459.67))
+        # Sensible heat flow, Btu/hr (negative when heat is lost)
+        @g.node
+        def QB(TB, RT, VA):
+            TB = _a(TB)[..., None]
+            air = Properties.properties((TB + _a(RT)) / 2)
+            return air.density * air.cp * VA * 3600 * (TB - _a(RT))
+        # Latent heat flow of the moisture brought in by outside air, Btu/hr, 0 without humidity data
+        @g.node
+        def QL(TB, RT, VA, WO=np.nan, RH=50):
+            TB = _a(TB)[..., None]
+            air = Properties.properties((TB + _a(RT)) / 2)
+            WR = Psychrometrics.humidity_ratio(RT, RH)
+            return np.nan_to_num(air.density * VA * 3600 * Psychrometrics.HG * np.fmax(_a(WO) - WR, 0))
+        # Cooling and heating load of all doors in each door group, Btu/yr
+        # Latent heat is removed by the cooling system when the outside air is warmer than the room
+        @g.node
+        def CL(QB, QL, HB, AMT):
+            return np.sum((np.fmax(QB, 0) + np.where(QB > 0, QL, 0)) * HB, axis=-2) * AMT
+        @g.node
+        def HL(QB, HB, AMT):
+            return np.sum(np.fmax(-QB, 0) * HB, axis=-2) * AMT
+        # Total cooling load, and heating load of the door groups in heated spaces, Btu/yr
+        @g.node
+        def CLT(CL):
+            return np.rint(np.sum(CL, axis=-1))
+        @g.node
+        def HLT(HL, HEAT=False):
+            return np.rint(np.sum(HL * _a(HEAT), axis=-1))
+        # Summer heat transfer, electricity of cooling, kWh/yr
+        @g.node
+        def SHT(CLT, EER):
+            return np.rint(CLT / (_a(EER) * 1000))
+        # Winter heat transfer of heated spaces, MMBtu/yr
+        @g.node
+        def WHT(HLT):
+            return np.round(HLT / 1e6, 1)
+    # Summer operating hours for HVAC
+    @g.node
+    def OHS(HRHV, DY, WK):
+        return np.rint(_a(HRHV) * DY * WK)
+    # Total horsepower
+    @g.node
+    def HP(HPF, AMT):
+        return np.sum(_a(HPF) * AMT, axis=-1)
+    # Operating hours for air curtains, horsepower weighted average of door groups
+    @g.node
+    def OHAC(HRAC, DY, WK, HPF, AMT, HP):
+        return np.rint(np.sum(_a(HPF) * AMT * _a(HRAC) * DY * WK, axis=-1) / HP)
+    # Electricity usage of the air curtain system
+    @g.node
+    def EU(HP, OHAC):
+        return np.rint(HP * C3 * OHAC)
+    # Demand usage for the air curtain system
+    @g.node
+    def DU(HP):
+        return np.rint(HP * C3 * C2 * CF/100)
+    ## Savings
+    @g.node
+    def SES(SHT, EF, EFES):
+        return np.rint(SHT * (_a(EF)/100 - _a(EFES)/100))
+    @g.node
+    def SDS(SES, OHS):
+        return np.rint((SES / OHS) * C2 * CF/100)
+    @g.node
+    def NGS(WHT, EF, EFES, ETAH=80):
+        return np.rint(WHT * (_a(EF)/100 - _a(EFES)/100) / (_a(ETAH)/100))
+    @g.node
+    def ES(SES, EU):
+        return SES - EU
+    @g.node
+    def DS(SDS, DU):
+        return SDS - DU
+    @g.node
+    def ECS(ES, EC):
+        return ES * EC
+    @g.node
+    def DCS(DS, DC):
+        return DS * DC
+    @g.node
+    def NGCS(NGS, NGC):
+        return np.rint(NGS * NGC)
+    @g.node
+    def ACS(ECS, DCS, NGCS):
+        return ECS + DCS + NGCS
+    @g.node
+    def IC(COST, AMT, LABOR):
+        return np.sum(_a(COST) * AMT, axis=-1) + LABOR
+    _payback(g)
+    _rebate(g)
+    return g
+
+# Install Air Curtain for Doorways (bin hour infiltration model)
+# AMT, DW, DH, RT, HRAC, HPF, COST and HEAT are per door group (trailing axis)
+# TB is the temperature of bins (degF), HB the hours per year in each bin when doors are open and WO the outside
+# humidity ratio (bins x door groups), see DegreeHours.door_hours()
+# Fields: AREA, per-group VA, QB, QL (bins x groups), CL, HL and totals TOTALAREA, CLT, HLT, SHT, WHT, OHS, HP, OHAC, EU, DU,
+#         SES, SDS, NGS, ES, DS, ECS, DCS, NGCS, ACS, IC, PB and rebate results
+air_curtain = _air_curtain()
+
+# Install Air Curtain for Doorways without weather data, heat transfer factor per door (HTF, MMBtu/yr) from the chart,
+# corrected by the average outside summer temperature OT and the temperature difference correction TDC (degF)
+# Fields: AREA, TOTALAREA, HT, SHT, WHT (0, summer only) and the same fields from OHS on as air_curtain
+air_curtain_chart = _air_curtain(chart=True)
+
+def _insulate_bare_equipment():
+    g = Graph("Insulate Bare Equipment")
+    ## Constants
+    # Conversion constant; Btu/hr
+    C1 = 0.000293
+
+    @g.node
+    def OH(HR, DY, WK):
+        return _a(HR) * _a(DY) * _a(WK)
+    # Heat flux of bare surfaces, Btu/hr/ft^2
+    @g.node
+    def QB(TEMP, AMB, DIA=0, EB=0.8):
+        return Insulation.bare(_a(TEMP), _a(AMB), _a(DIA), _a(EB))
+    # Surface temperature after insulation, solved for all surfaces at once; Farenheit
+    @g.node
+    def PTEMP(TEMP, AMB, SIZE, DIA=0, KINS=0.3, EJ=0.9):
+        return np.rint(Insulation.surface(_a(TEMP), _a(AMB), _a(SIZE), _a(DIA), _a(KINS), _a(EJ)))
+    # Heat flux of insulated surfaces, Btu/hr/ft^2
+    @g.node
+    def QI(TEMP, PTEMP, SIZE, DIA=0, KINS=0.3):
+        return Insulation.conduction(_a(TEMP), PTEMP, _a(SIZE), _a(DIA), _a(KINS))
+    @g.node
+    def TD(TEMP, AMB):
+        return _a(TEMP) - AMB
+    @g.node
+    def PTD(PTEMP, AMB):
+        return PTEMP - AMB
+    # Effective combined convective and radiative heat transfer coefficient; BTU/hr/Ft^2/Farenheit
+    # 0 if the surface is at ambient temperature, no heat loss to save
+    @g.node
+    def H(QB, QI, TD, PTD):
+        D = np.broadcast_to(TD - PTD, np.broadcast(QB - QI, TD - PTD).shape)
+        return np.round(np.divide(QB - QI, D, out=np.zeros(D.shape), where=D != 0), 2)
+    # Annual Heat Loss
+    @g.node
+    def AHL(H, SFA, TD, PTD, OH):
+        return np.rint(H * C1 * _a(SFA) * (TD - PTD) * OH)
+    ## Savings
+    @g.node
+    def ES(AHL):
+        return np.sum(AHL, axis=-1)
+    @g.node
+    def DS(AHL, OH):
+        return np.round(np.sum(AHL / OH, axis=-1), 1)
+    _cost_savings(g)
+    ## Implementation cost
+    @g.node
+    def LAB(COST, LABOR):
+        return np.broadcast_to(_b(LABOR), np.broadcast(_a(COST), _b(LABOR)).shape)
+    @g.node
+    def EST(COST, LAB):
+        return _a(COST) + LAB
+    @g.node
+    def IC(SFA, EST):
+        return np.sum(_a(SFA) * EST, axis=-1)
+    _payback(g)
+    return g
+
+# Insulate Bare Equipment
+# All inputs except LABOR, EC and DC are per area (trailing axis), SIZE is the insulation thickness (in)
+# Optional per-area inputs: DIA (outer diameter, in, 0 for flat surfaces), KINS (insulation conductivity, Btu.in/hr.ft2.F),
+# EB and EJ (emissivity of bare surface and insulation jacket)
+# Fields: per-area OH, QB, PTEMP, QI, TD, PTD, H, AHL, LAB, EST and totals ES, DS, ECS, DCS, ACS, IC, PB
+insulate_bare_equipment = _insulate_bare_equipment()
+
+def _programmable_thermostat():
+    g = Graph("Install Programmable Thermostat")
+    # Constants
+    C1 = 12000.0 # Conversion constant; 12,000 BTU/hr/ton
+    C2 = 1000.0 # Conversion constant; kW/W
+    @g.node
+    def PD(TON, LF, EER):
+        return np.rint(_a(TON) * C1 * (_a(LF)/100) / (_a(EER) * C2))
+    @g.node
+    def OHE(CHR, CDY, CWK):
+        return _a(CHR) * CDY * CWK
+    @g.node
+    def OHP(PHR, PDY, PWK):
+        return _a(PHR) * PDY * PWK
+    @g.node
+    def ES(PD, OHE, MCDH, CDH):
+        return np.rint(PD * OHE * (1 - _a(MCDH) / CDH))
+    @g.node
+    def NGS(NGU, MHDH, HDH):
+        return np.rint(_a(NGU) * (1 - _a(MHDH) / HDH))
+    @g.node
+    def ECS(ES, EC, COOL):
+        return np.where(COOL, np.rint(ES * EC), 0)
+    @g.node
+    def NGCS(NGS, NGC, HEAT):
+        return np.where(HEAT, np.rint(NGS * NGC), 0)
+    @g.node
+    def ACS(ECS, NGCS):
+        return ECS + NGCS
+    # Implementation
+    @g.node
+    def MC(PT, NT):
+        return _a(PT) * NT
+    @g.node
+    def LB(NT, IT, LR):
+        return np.rint(_a(NT) * IT * LR)
+    @g.node
+    def IC(MC, LB):
+        return MC + LB
+    _payback(g)
+    return g
+
+# Install Programmable Thermostat (based on degree hours)
+# Fields: PD, OHE, OHP, ES, NGS, ECS, NGCS, ACS, MC, LB, IC, PB
+programmable_thermostat = _programmable_thermostat()
+
+def _replace_hvac():
+    g = Graph("Replace Old HVAC Units")
+    # Maintenance Factor
+    @g.node
+    def M(FM):
+        return np.where(FM, 0.01, 0.03)
+    @g.node
+    def SIZE(TON):
+        return _a(TON) * 12000
+    @g.node
+    def EERC(EERB, M, AGE):
+        return np.round(_a(EERB) * (1 - M[..., None]) ** np.fmin(_a(AGE), 15), 1)
+    # Total Values
+    @g.node
+    def TTON(TON):
+        return np.sum(_a(TON), axis=-1)
+    @g.node
+    def CC(SIZE):
+        return np.sum(SIZE, axis=-1)
+    # Electrical Demand of each unit
+    @g.node
+    def CEDi(SIZE, LF, EERC):
+        return (SIZE/1000 * _b(LF)/100) / EERC
+    @g.node
+    def PEDi(SIZE, LF, EERP):
+        return (SIZE * 0.001 * _b(LF)/100) / _a(EERP)
+    @g.node
+    def CED(CEDi):
+        return np.round(np.sum(CEDi, axis=-1), 1)
+    @g.node
+    def PED(PEDi):
+        return np.round(np.sum(PEDi, axis=-1), 1)
+    _operating_hours(g)
+    # Power Reduction
+    @g.node
+    def PR(CED, PED):
+        return np.round(CED - PED, 1)
+    # Energy savings of each unit
+    @g.node
+    def ESi(CEDi, PEDi, OH):
+        return np.rint((CEDi - PEDi) * _b(OH))
+    @g.node
+    def ES(PR, OH):
+        return np.rint(PR * OH)
+    @g.node
+    def DS(PR, CF, CS):
+        return np.rint(PR * _a(CF)/100 * CS)
+    _cost_savings(g)
+    @g.node
+    def IC(TTON, UC):
+        return np.rint(TTON * UC)
+    _payback(g)
+    _rebate(g)
+    return g
+
+# Replace Old HVAC Units
+# TON, AGE, EERB and EERP are per unit (trailing axis)
+# Fields: M, per-unit SIZE, EERC, CEDi, PEDi, ESi, and totals TTON, CC, CED, PED, OH, PR, ES, DS, ECS, DCS, ACS, IC, PB and rebate results
+replace_hvac = _replace_hvac()
+
+## Lighting
+
+def _motion_sensor():
+    g = Graph("Install Motion Sensor")
+    # Conversion constant; W/kW
+    C1 = 1000
+    @g.node
+    def OH(HR, DY, WK):
+        return _a(HR) * _a(DY) * _a(WK)
+    @g.node
+    def ESi(LED, CFW, OH, FR):
+        return np.rint((_a(LED) * _a(CFW) * OH * (100/100 - _a(FR)/100)) / C1)
+    @g.node
+    def ES(ESi):
+        return np.sum(ESi, axis=-1)
+    @g.node
+    def ACS(ES, EC):
+        return ES * EC
+    # Total cost for all sensors, one sensor per area
+    @g.node
+    def TCOST(COST, ESi):
+        return _a(COST) * np.atleast_1d(ESi).shape[-1]
+    @g.node
+    def TLABOR(LABOR, ESi):
+        return _a(LABOR) * np.atleast_1d(ESi).shape[-1]
+    @g.node
+    def IC(TCOST, TLABOR):
+        return TCOST + TLABOR
+    _payback(g)
+    _rebate(g)
+    return g
+
+# Install Motion Sensor
+# LED, CFW, HR, DY, WK and FR are per area (trailing axis)
+# Fields: per-area OH, ESi and totals ES, ACS, TCOST, TLABOR, IC, PB and rebate results
+motion_sensor = _motion_sensor()
+
+def _led():
+    g = Graph("Switch to LED lighting")
+    @g.node
+    def COH(CHR, CDY, CWK):
+        return _a(CHR) * _a(CDY) * _a(CWK)
+    @g.node
+    def POH(PHR, PDY, PWK):
+        return _a(PHR) * _a(PDY) * _a(PWK)
+    # Electricity savings
+    @g.node
+    def ESi(CN, CPR, COH, PN, PPR, POH):
+        return np.rint((_a(CN) * _a(CPR) * COH - _a(PN) * _a(PPR) * POH) / 1000.0)
+    @g.node
+    def ES(ESi):
+        return np.sum(ESi, axis=-1)
+    # Demand savings
+    @g.node
+    def DSi(CN, CPR, PN, PPR, CF):
+        return np.rint((_a(CN) * _a(CPR) - _a(PN) * _a(PPR)) * (_a(CF)/100) * 12.0 / 1000.0)
+    @g.node
+    def DS(DSi):
+        return np.sum(DSi, axis=-1)
+    _cost_savings(g)
+    # Bulb cost
+    @g.node
+    def BCi(PN, BP):
+        return np.rint(_a(PN) * _a(BP))
+    @g.node
+    def BC(BCi):
+        return np.sum(BCi, axis=-1)
+    # Labor cost
+    @g.node
+    def LCi(CN, BL):
+        return np.rint(_a(CN) * _a(BL))
+    @g.node
+    def LC(LCi):
+        return np.sum(LCi, axis=-1)
+    # Implementation cost
+    @g.node
+    def LN(CN):
+        return np.sum(_a(CN), axis=-1)
+    @g.node
+    def MSC(MSN, MSPL):
+        return _a(MSN) * MSPL
+    @g.node
+    def IC(MSC, BC, LC):
+        return MSC + BC + LC
+    _payback(g)
+    _rebate(g)
+    return g
+
+# Switch to LED lighting
+# All inputs except MSN, MSPL, EC and DC are per area (trailing axis)
+# Fields: per-area COH, POH, ESi, DSi, BCi, LCi and totals ES, DS, ECS, DCS, ACS, BC, LC, LN, MSC, IC, PB
+#         and rebate results
+led = _led()
+
+## Motor
+
+def _big_ass_fan():
+    g = Graph("Install industrial fans to improve air circulation")
+    ## Constants
+    # Conversion constant
+    C1 = 0.7457
+    # Coincidence factor, %
+    CF = 100
+    _operating_hours(g)
+    @g.node
+    def NGS(PR, NGU):
+        return _a(PR)/100 * NGU
+    @g.node
+    def ES(FAN, HP, OH):
+        return np.rint(-_a(FAN) * HP * C1 * OH)
+    @g.node
+    def DS(FAN, HP):
+        return np.round(-_a(FAN) * HP * C1 * 6 * CF/100, 1)
+    @g.node
+    def NGCS(NGS, NGC):
+        return np.rint(NGS * NGC)
+    @g.node
+    def ECS(ES, EC):
+        return np.rint(ES * EC)
+    @g.node
+    def DCS(DS, DC):
+        return np.rint(DS * DC)
+    @g.node
+    def ACS(NGCS, ECS, DCS):
+        return NGCS + ECS + DCS
+    @g.node
+    def IC(FAN, COST):
+        return _a(FAN) * COST
+    _payback(g)
+    _rebate(g)
+    return g
+
+# Install industrial fans to improve air circulation
+# Fields: OH, NGS, ES, DS, NGCS, ECS, DCS, ACS, IC, PB and rebate results
+big_ass_fan = _big_ass_fan()
+
+def _cogged_v_belts():
+    g = Graph("Replace Cogged V-Belts")
+    _operating_hours(g)
+    # 1.5% efficiency improvement
+    @g.node
+    def ES(HP, LF, OH, ETA):
+        return np.rint(_a(HP) * 0.746 * _a(LF)/100 * OH * ((1.5/100)/(_a(ETA)/100)))
+    @g.node
+    def DS(HP, LF, CF, ETA):
+        return np.rint(_a(HP) * 0.746 * _a(LF)/100 * _a(CF)/100 * 12 * ((1.5/100)/(_a(ETA)/100)))
+    _cost_savings(g)
+    @g.node
+    def IC(CBELT, AMT):
+        return _a(CBELT) * AMT
+    _payback(g)
+    return g
+
+# Replace Cogged V-Belts, 1.5% efficiency improvement
+# Fields: OH, ES, DS, ECS, DCS, ACS, IC, PB
+cogged_v_belts = _cogged_v_belts()
+
+def _motor_vfd():
+    g = Graph("Install VFD on Electric Motor")
+    _operating_hours(g)
+    # Power fraction with VFD, averaged over the load duration histogram (LFB, DUR) of a data logger if given
+    @g.node
+    def FR(LF, LFB=None, DUR=None):
+        if DUR is None:
+            return np.rint(np.interp(LF, VFDLoad, MotorVFD))
+        return np.rint(_duration(np.interp(LFB, VFDLoad, MotorVFD), DUR))
+    @g.node
+    def CPD(HP, ETAE):
+        return np.rint((_a(HP) * 0.746) / (_a(ETAE)/100))
+    @g.node
+    def PPD(HP, FR, ETAP):
+        return np.rint((_a(HP) * 0.746 * (FR/100)) / (_a(ETAP)/100))
+    @g.node
+    def ES(CPD, PPD, OH):
+        return (CPD - PPD) * OH
+    @g.node
+    def DS(CPD, PPD, CF):
+        return (CPD - PPD) * (_a(CF)/100) * 12
+    _cost_savings(g)
+    @g.node
+    def IC(VFD, AIC):
+        return _a(VFD) + AIC
+    _payback(g)
+    _rebate(g)
+    return g
+
+# Install VFD on Electric Motor
+# Fields: OH, FR, CPD, PPD, ES, DS, ECS, DCS, ACS, IC, PB and rebate results
+motor_vfd = _motor_vfd()
+
+## Others
+
+def _negotiate_energy_charge():
+    g = Graph("Negotiate Utility Charge")
+    # CEC and PEC are current and proposed energy cost, $/unit
+    @g.node
+    def ACS(EU, CEC, PEC):
+        return _a(EU) * (_a(CEC) - PEC)
+    # No implementation cost
+    @g.node
+    def IC(ACS):
+        return np.zeros_like(ACS)
+    _payback(g)
+    return g
+
+# Negotiate Utility Charge, no implementation cost
+# Fields: ACS, IC, PB
+negotiate_energy_charge = _negotiate_energy_charge()
+
+def _solar_panel():
+    g = Graph("Install Solar Panel")
+    # Available space, ft2
+    @g.node
+    def AS(RS, ASR):
+        return np.rint(_a(RS) * ASR / 100)
+    # Capacity, kW
+    @g.node
+    def CAP(AS):
+        return np.rint(AS / 100)
+    # Approx. energy savings, kWh
+    @g.node
+    def AES(CAP):
+        return CAP * 1200
+    # ES is the annual AC output from PVWatts, kWh. If not available, AES is used.
+    @g.node
+    def ES(AES, ES=None):
+        return AES if ES is None else _a(ES)
+    @g.node
+    def ACSel(ES, EC):
+        return np.rint(ES * EC)
+    # AMV is the average market value of solar renewable energy credits, $/MWh
+    @g.node
+    def credits(ES):
+        return np.rint(ES / 1000)
+    @g.node
+    def ACSsr(AMV, credits):
+        return np.rint(_a(AMV) * credits)
+    @g.node
+    def ACS(ACSel, ACSsr):
+        return ACSel + ACSsr
+    # Implementation cost
+    @g.node
+    def IC(CAP, PPW):
+        return np.rint(CAP * PPW * 1000)
+    @g.node
+    def ITC(IC, ITCR):
+        return np.rint(IC * _a(ITCR) / 100)
+    @g.node
+    def MIC(IC, ITC):
+        return IC - ITC
+    _payback(g, 'MIC')
+    return g
+
+# Install Solar Panel
+# Fields: AS, CAP, AES, ES, ACSel, credits, ACSsr, ACS, IC, ITC, MIC, PB
+solar_panel = _solar_panel()
+
+# Template directory and the corresponding calculation graph
+MEASURES = {
+    'Boiler/Install Air-Fuel Ratio Controller': afr_controller,
+    'Boiler/Recover Exhaust Gas Heat': exhaust_gas_heat,
+    'Compressor/Exhuast Heat': compressor_exhaust_heat,
+    'Compressor/Existing Compressor VFD': existing_compressor_vfd,
+    'Compressor/Intake Air': intake_air,
+    'Compressor/New Compressor VFD': new_compressor_vfd,
+    'Compressor/Reduce Set Pressure': reduce_set_pressure,
+    'Compressor/Repair Leaks': repair_leaks,
+    'HVAC/Install Air Curtain for Doorways': air_curtain,
+    'HVAC/Insulate Bare Equipment': insulate_bare_equipment,
+    'HVAC/Programmable Thermostat': programmable_thermostat,
+    'HVAC/Replace Old HVAC Units': replace_hvac,
+    'Lighting/Install Motion Sensor': motion_sensor,
+    'Lighting/LED': led,
+    'Motor/Big Ass Fan': big_ass_fan,
+    'Motor/Replace Cogged V-Belts': cogged_v_belts,
+    'Motor/Single Motor VFD': motor_vfd,
+    'Others/Negotiate Energy Charge': negotiate_energy_charge,
+    'Others/Solar Panel': solar_panel,
+}
@@ -0,0 +1,173 @@
+"""
+(Purpose) Tariff.py evaluates electricity tariffs (flat, time-of-use, tiered, demand with ratchet) against interval data
+Interval data (usually 15-minute kW readings of a year or more) are streamed from CSV in chunks, then binned once into
+energy and peak demand by billing month, weekday and hour. Every tariff is converted to the same rate tables, so any
+number of supplier offers are evaluated against the same load in one numpy pass.
+Billing months are calendar months, weekdays start on Monday (0), hours are 0-23 of local time.
+"""
+
+import numpy as np
+import pandas as pd
+from easydict import EasyDict
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Months of the ratchet window, the current month and the previous 11
+RATCHET = 12
+
+def read(path: str, time: str='Time', column: str='kW', chunksize: int=1000000, **kwargs) -> dict:
+    """
+    Read an interval data file in chunks
+    :param path: CSV file with a header row
+    :param time: Name of the column of local date and time (start of each interval)
+    :param column: Name of the column of average demand, kW
+    :param chunksize: Number of rows per chunk
+    :param kwargs: Other arguments of pandas.read_csv, e.g. skiprows of meter headers
+    :return: EasyDict with time (datetime64[m]), kW (float32) and DT (length of the interval, h)
+    """
+    times, kWs = [], []
+    for chunk in pd.read_csv(path, usecols=[time, column], chunksize=chunksize, **kwargs):
+        times.append(pd.to_datetime(chunk[time]).to_numpy().astype('datetime64[m]'))
+        kWs.append(pd.to_numeric(chunk[column], errors='coerce').to_numpy(dtype=np.float32))
+    return interval(np.concatenate(times), np.concatenate(kWs))
+
+def interval(time, kW) -> dict:
+    """
+    Interval data from arrays, e.g. from a meter API
+    :param time: Start of each interval, anything convertible to datetime64
+    :param kW: Average demand of each interval, kW. Missing readings (nan) are dropped
+    :return: EasyDict with time (datetime64[m]), kW (float32) and DT (length of the interval, h)
+    """
+    time = np.asarray(time, dtype='datetime64[m]')
+    kW = np.asarray(kW, dtype=np.float32)
+    keep = np.isfinite(kW)
+    order = np.argsort(time[keep], kind='stable')
+    load = EasyDict(time=time[keep][order], kW=kW[keep][order])
+    if load.time.size < 2:
+        raise Exception("Interval data needs at least 2 readings.")
+    # Most common interval length, gaps of missing readings are not counted
+    load.DT = float(np.median(np.diff(load.time).astype(float))) / 60
+    return load
+
+def bins(load: dict) -> dict:
+    """
+    Energy and peak demand by billing month, weekday and hour
+    :param load: Interval data from read() or interval()
+    :return: EasyDict with MONTH (datetime64[M] of billing months), MOY (month of year, 1-12), E (kWh) and P (peak kW),
+             both billing months x 7 x 24, and H (hours of data)
+    """
+    month = load.time.astype('datetime64[M]')
+    MONTH, m = np.unique(month, return_inverse=True)
+    day = load.time.astype('datetime64[D]').astype(np.int64)
+    # 1970-01-01 is Thursday
+    weekday = (day + 3) % 7
+    hour = (load.time.astype(np.int64) // 60) % 24
+    index = (m.ravel() * 7 + weekday) * 24 + hour
+    size = MONTH.size * 168
+    res = EasyDict()
+    res.MONTH = MONTH
+    res.MOY = MONTH.astype(np.int64) % 12 + 1
+    res.E = np.bincount(index, weights=load.kW * load.DT, minlength=size).reshape(-1, 7, 24)
+    P = np.zeros(size)
+    np.maximum.at(P, index, load.kW)
+    res.P = P.reshape(-1, 7, 24)
+    res.H = load.kW.size * load.DT
+    return res
+
+def _hours(period: dict) -> np.ndarray:
+    """
+    Months x weekdays x hours mask of a period
+    :param period: Dictionary with optional MONTHS (1-12), DAYS (0-6, Monday is 0) and HOURS ([start, end) pairs, 0-24)
+    """
+    months = np.zeros(12, dtype=bool)
+    months[np.asarray(period.get('MONTHS', range(1, 13)), dtype=int) - 1] = True
+    days = np.zeros(7, dtype=bool)
+    days[np.asarray(period.get('DAYS', range(7)), dtype=int)] = True
+    hours = np.zeros(24, dtype=bool)
+    spans = period.get('HOURS', [0, 24])
+    # A single [start, end) pair or a list of pairs, a pair may wrap around midnight, e.g. [22, 6]
+    for start, end in np.reshape(spans, (-1, 2)):
+        h = np.arange(24)
+        hours |= (h >= start) & (h < end) if start <= end else (h >= start) | (h < end)
+    return months[:, None, None] & days[None, :, None] & hours[None, None, :]
+
+def tables(tariffs: list) -> dict:
+    """
+    Convert tariffs to rate tables
+    :param tariffs: List of dictionaries, all keys are optional:
+                    NAME: name of the tariff
+                    CUST: customer charge, $/month
+                    EC: energy charge of all hours, $/kWh
+                    TOU: list of periods (see _hours) with RATE, $/kWh, the energy charge of their hours.
+                         Later periods override earlier ones
+                    TIERS: list of [upper limit of monthly kWh, RATE $/kWh] added to the energy charge,
+                           the limit of the last tier can be null (no limit)
+                    DC: demand charge, $/kW of the billed demand
+                    PEAK: period (see _hours) when demand is measured, default all hours
+                    RATCHET: billed demand is at least this % of the highest demand of the previous 11 months
+    :return: EasyDict of arrays, the first axis is the tariff
+    """
+    T = len(tariffs)
+    K = max([len(t.get('TIERS', [])) for t in tariffs] + [1])
+    res = EasyDict()
+    res.NAME = np.array([t.get('NAME', 'Tariff ' + str(i + 1)) for i, t in enumerate(tariffs)], dtype=str)
+    res.CUST = np.array([t.get('CUST', 0) for t in tariffs], dtype=float)
+    res.DC = np.array([t.get('DC', 0) for t in tariffs], dtype=float)
+    res.RATCHET = np.array([t.get('RATCHET', 0) for t in tariffs], dtype=float) / 100
+    res.RATE = np.zeros((T, 12, 7, 24))
+    res.PEAK = np.zeros((T, 12, 7, 24), dtype=bool)
+    # Tiers are padded with empty tiers
+    res.LIMIT = np.full((T, K), np.inf)
+    res.TIER = np.zeros((T, K))
+    for i, t in enumerate(tariffs):
+        res.RATE[i] = t.get('EC', 0)
+        for period in t.get('TOU', []):
+            res.RATE[i][_hours(period)] = period['RATE']
+        res.PEAK[i] = _hours(t.get('PEAK', {}))
+        for k, (limit, rate) in enumerate(t.get('TIERS', [])):
+            res.LIMIT[i, k] = np.inf if limit is None else limit
+            res.TIER[i, k] = rate
+    return res
+
+def evaluate(load: dict, tariffs: list) -> dict:
+    """
+    Bills of tariffs against the same load, all tariffs and billing months at once
+    :param load: Interval data from read() or interval(), or bins() of it
+    :param tariffs: List of tariffs, see tables()
+    :return: EasyDict with NAME, per tariff and billing month (tariffs x months) CUST, ENERGY, DEMAND and BILL ($),
+             BD (billed demand, kW), per tariff COST ($) and ANNUAL ($/yr, COST scaled to 8760 hours),
+             and MONTH, KWH (kWh of the data), AKWH (kWh/yr)
+    """
+    b = load if 'E' in load else bins(load)
+    t = tables(tariffs)
+    M = b.MONTH.size
+    res = EasyDict()
+    res.NAME = t.NAME
+    res.MONTH = b.MONTH
+    res.CUST = np.broadcast_to(t.CUST[:, None], (t.CUST.size, M))
+    # Energy charge of each bin in the month of year of each billing month
+    res.ENERGY = np.einsum('tmdh,mdh->tm', t.RATE[:, b.MOY - 1], b.E)
+    # Tiers of monthly energy
+    kWh = b.E.sum(axis=(1, 2))
+    lower = np.concatenate([np.zeros((t.LIMIT.shape[0], 1)), t.LIMIT[:, :-1]], axis=1)
+    # Energy between the limits, padded tiers after a tier without limit are empty
+    block = np.minimum(kWh[None, :, None], t.LIMIT[:, None, :]) - np.minimum(kWh[None, :, None], lower[:, None, :])
+    res.ENERGY = res.ENERGY + np.sum(block * t.TIER[:, None, :], axis=-1)
+    # Peak demand in the demand window of each tariff
+    peak = np.max(np.where(t.PEAK[:, b.MOY - 1], b.P[None], 0), axis=(2, 3))
+    # Highest peak of the ratchet window, months before the data are not known
+    window = sliding_window_view(np.pad(peak, ((0, 0), (RATCHET - 1, 0))), RATCHET, axis=1).max(axis=-1)
+    res.BD = np.fmax(peak, t.RATCHET[:, None] * window)
+    res.DEMAND = t.DC[:, None] * res.BD
+    res.BILL = res.CUST + res.ENERGY + res.DEMAND
+    res.COST = res.BILL.sum(axis=1)
+    res.ANNUAL = res.COST * 8760 / b.H
+    res.KWH = kWh.sum()
+    res.AKWH = res.KWH * 8760 / b.H
+    return res
+
+def rank(res: dict) -> np.ndarray:
+    """
+    :param res: Results of evaluate()
+    :return: Indices of tariffs, lowest annual cost first
+    """
+    return np.argsort(res.ANNUAL, kind='stable')
@@ -0,0 +1,219 @@
+"""
+(Purpose) Weather.py is a local cache of weather station data, so weather based templates can run offline
+Monthly and hourly data are stored as columnar .npz files (one array per column) keyed by station, frequency and date range.
+A query is served from any cached file that covers its date range, otherwise it's fetched from the data source once.
+Coordinates are snapped to a grid, so a region can be pre-seeded before going to a plant without network.
+Set the environment variable IAC_OFFLINE=1 (or Cache(offline=True)) to never touch the network.
+"""
+
+import os, glob
+import numpy as np
+from datetime import datetime
+from easydict import EasyDict
+
+# Default cache directory
+DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Weather')
+# Grid of coordinates, degree
+GRID = 0.25
+# Supported frequencies
+FREQS = ['monthly', 'hourly']
+
+def station_key(station) -> str:
+    """
+    Cache key of a station
+    :param station: Meteostat station ID (string) or (latitude, longitude)
+    :return: Station ID, or coordinates snapped to the grid, e.g. "40.50_-75.50"
+    """
+    if isinstance(station, str):
+        return station
+    lat, lon = snap(station)
+    return "%.2f_%.2f" % (lat, lon)
+
+def snap(station) -> tuple:
+    """
+    Snap coordinates to the grid
+    :param station: (latitude, longitude)
+    :return: (latitude, longitude)
+    """
+    lat, lon = station
+    return round(float(lat) / GRID) * GRID, round(float(lon) / GRID) * GRID
+
+class MeteostatSource:
+    """
+    Weather data from meteostat (network), converted to imperial units
+    """
+    def fetch(self, station, freq: str, start: datetime, end: datetime) -> dict:
+        """
+        :param station: Meteostat station ID or (latitude, longitude)
+        :param freq: 'monthly' or 'hourly'
+        :param start: Start date
+        :param end: End date, inclusive
+        :return: Dictionary of columns, 'time' is datetime64[s]
+        """
+        from meteostat import Point, Monthly, Hourly, units
+        location = station if isinstance(station, str) else Point(*snap(station))
+        data = Monthly(location, start, end) if freq == 'monthly' else Hourly(location, start, end)
+        data.convert(units.imperial)
+        df = data.fetch()
+        columns = {'time': df.index.to_numpy().astype('datetime64[s]')}
+        for name in df.columns:
+            columns[name] = df[name].to_numpy(dtype=float)
+        return columns
+
+    def stations(self, region: tuple) -> list:
+        """
+        Grid points in a region
+        :param region: (north, west, south, east), degree
+        :return: List of (latitude, longitude)
+        """
+        north, west, south, east = region
+        lats = np.arange(np.ceil(south / GRID), np.floor(north / GRID) + 1) * GRID
+        lons = np.arange(np.ceil(west / GRID), np.floor(east / GRID) + 1) * GRID
+        return [(lat, lon) for lat in lats for lon in lons]
+
+class LocalSource(MeteostatSource):
+    """
+    Stand-in data source without network, e.g. for tests or recorded data
+    """
+    def __init__(self, tables: dict):
+        """
+        :param tables: Dictionary, key: station key, value: {freq: dictionary of columns}
+                       'time' column is required, anything convertible to datetime64
+        """
+        self.tables = tables
+
+    def fetch(self, station, freq: str, start: datetime, end: datetime) -> dict:
+        key = station_key(station)
+        if key not in self.tables or freq not in self.tables[key]:
+            raise Exception("No " + freq + " weather data of " + key + ".")
+        columns = {name: np.asarray(value) for name, value in self.tables[key][freq].items()}
+        columns['time'] = columns['time'].astype('datetime64[s]')
+        return _slice(columns, start, end)
+
+def _slice(columns: dict, start: datetime, end: datetime) -> dict:
+    """
+    Rows within [start, end], end date is inclusive
+    """
+    time = columns['time']
+    mask = (time >= np.datetime64(start, 's')) & (time < np.datetime64(end, 'D') + np.timedelta64(1, 'D'))
+    return {name: value[mask] for name, value in columns.items()}
+
+class Cache:
+    """
+    Weather data cache
+    Usage:
+        cache = Cache()
+        data = cache.monthly((40.6, -75.4), datetime(2018, 10, 1), datetime(2022, 5, 31))
+        data.time, data.tavg
+    """
+    def __init__(self, directory: str=DIRECTORY, source=None, offline: bool=None):
+        """
+        :param directory: Cache directory
+        :param source: Data source, default MeteostatSource()
+        :param offline: Never fetch from the source, default from environment variable IAC_OFFLINE
+        """
+        self.directory = directory
+        self.source = source if source is not None else MeteostatSource()
+        if offline is None:
+            offline = os.environ.get('IAC_OFFLINE', '0') not in ['', '0']
+        self.offline = offline
+        # Loaded files
+        self.memory = {}
+
+    def path(self, key: str, freq: str, start: datetime, end: datetime) -> str:
+        """
+        File path of a cache entry
+        """
+        name = key + '_' + freq + '_' + start.strftime('%Y%m%d') + '_' + end.strftime('%Y%m%d') + '.npz'
+        return os.path.join(self.directory, name)
+
+    def _find(self, key: str, freq: str, start: datetime, end: datetime):
+        """
+        Find a cached file that covers the date range
+        """
+        for path in glob.glob(os.path.join(self.directory, glob.escape(key) + '_' + freq + '_*.npz')):
+            first, last = os.path.basename(path)[:-4].split('_')[-2:]
+            if first <= start.strftime('%Y%m%d') and last >= end.strftime('%Y%m%d'):
+                return path
+        return None
+
+    def _load(self, path: str) -> dict:
+        if path not in self.memory:
+            with np.load(path) as data:
+                self.memory[path] = {name: data[name] for name in data.files}
+        return self.memory[path]
+
+    def get(self, station, freq: str, start: datetime, end: datetime) -> dict:
+        """
+        Weather data of a station
+        :param station: Meteostat station ID or (latitude, longitude)
+        :param freq: 'monthly' or 'hourly'
+        :param start: Start date
+        :param end: End date, inclusive
+        :return: EasyDict of columns, 'time' is datetime64[s], missing values are nan
+        """
+        if freq not in FREQS:
+            raise Exception("Frequency " + freq + " is not supported.")
+        key = station_key(station)
+        path = self._find(key, freq, start, end)
+        if path is None:
+            if self.offline:
+                raise Exception("Weather data of " + key + " from " + str(start.date()) + " to " + str(end.date()) + " is not cached.")
+            path = self.store(station, freq, start, end)
+        return EasyDict(_slice(self._load(path), start, end))
+
+    def monthly(self, station, start: datetime, end: datetime) -> dict:
+        return self.get(station, 'monthly', start, end)
+
+    def hourly(self, station, start: datetime, end: datetime) -> dict:
+        return self.get(station, 'hourly', start, end)
+
+    def store(self, station, freq: str, start: datetime, end: datetime) -> str:
+        """
+        Fetch data from the source and save it
+        :return: File path
+        """
+        columns = self.source.fetch(station, freq, start, end)
+        if len(columns['time']) == 0:
+            raise Exception("No " + freq + " weather data of " + station_key(station) + ".")
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path(station_key(station), freq, start, end)
+        np.savez(path, **columns)
+        self.memory.pop(path, None)
+        return path
+
+    def seed(self, stations, start: datetime, end: datetime, freqs: list=FREQS) -> list:
+        """
+        Pre-seed the cache
+        :param stations: List of station IDs or (latitude, longitude), or a region (north, west, south, east)
+        :return: List of file paths
+        """
+        if isinstance(stations, tuple) and len(stations) == 4:
+            stations = self.source.stations(stations)
+        paths = []
+        for station in stations:
+            for freq in freqs:
+                path = self._find(station_key(station), freq, start, end)
+                paths.append(path if path is not None else self.store(station, freq, start, end))
+        return paths
+
+# Default cache shared by all templates
+CACHE = Cache()
+
+def monthly(station, start: datetime, end: datetime) -> dict:
+    """
+    Monthly data from the default cache, see Cache.get()
+    """
+    return CACHE.monthly(station, start, end)
+
+def hourly(station, start: datetime, end: datetime) -> dict:
+    """
+    Hourly data from the default cache, see Cache.get()
+    """
+    return CACHE.hourly(station, start, end)
+
+def months(time) -> np.ndarray:
+    """
+    Month numbers (1-12) of a datetime64 array
+    """
+    return np.asarray(time).astype('datetime64[M]').astype(int) % 12 + 1
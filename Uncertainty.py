@@ -0,0 +1,40 @@
+"""
+Monte Carlo uncertainty analysis of a recommendation
+Usage: Fill in the template database.json5, then fill in distributions of uncertain inputs in Uncertainty.json5,
+then run this script.
+"""
+
+import json5, os, time
+import numpy as np
+from easydict import EasyDict
+from Shared.IAC import caveat
+from Shared import MonteCarlo
+
+# Process pool requires the main module guard on Windows
+if __name__ == '__main__':
+    # Load config file
+    config = EasyDict(json5.load(open('Uncertainty.json5')))
+    # Load utility cost, database and overrides
+    jsonDict = json5.load(open('Utility.json5'))
+    jsonDict.update(json5.load(open(os.path.join(*config.MEASURE.split('/'), 'database.json5'))))
+    jsonDict.update(config.INPUTS)
+
+    print("Simulating " + config.MEASURE + " with " + f"{config.N:,}" + " samples...", end ="")
+    start = time.time()
+    samples = MonteCarlo.simulate(config.MEASURE, jsonDict, config.DIST, n=config.N, batch=config.BATCH,
+                                  workers=config.WORKERS, seed=config.SEED)
+    summary = MonteCarlo.percentiles(samples)
+    print("done in " + str(round(time.time() - start, 2)) + " s")
+
+    # Print percentiles
+    names = {'ES': 'Electricity (kWh)', 'DS': 'Demand (kW)', 'NGS': 'Natural Gas (MMBtu)', 'ACS': 'Annual Cost Savings ($)',
+             'IC': 'Implementation Cost ($)', 'PB': 'Payback Period (yr)', 'MPB': 'Payback w/ Rebate (yr)'}
+    print(f"{'':<26}" + ''.join(f"{'P' + str(q):>14}" for q in MonteCarlo.PERCENTILES))
+    for key, value in summary.items():
+        if key in ['PB', 'MPB']:
+            row = [f"{v:>14.1f}" if np.isfinite(v) else f"{'Infinite':>14}" for v in value]
+        else:
+            row = [f"{v:>14,.0f}" for v in value]
+        print(f"{names[key]:<26}" + ''.join(row))
+
+    caveat("Payback percentiles are not a payback of the cost savings percentiles, P10 payback is the optimistic case.")
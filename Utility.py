@@ -1,90 +1,73 @@
-"""
-Extract Data from Energy Charts.xlsx
-Save statistics to Utility.json5
-"""
-
-import os, re, openpyxl
-
-# Read Energy Charts.xlsx
-wb = openpyxl.load_workbook(os.path.join('Energy Charts' ,'Energy Charts.xlsx'), data_only=True)
-# Get Raw Data worksheet
-ws = wb['Raw Data']
-
-## Save statistics to Utility.json5
-# Get Electricity cost from cell D21, 3 digits
-EC = round(ws['D21'].value,3)
-# Get Demand cost from cell D23, 2 digits
-DC = round(ws['D23'].value,2)
-# Get Fees from cell G19, 2 digits
-Fees = round(ws['G19'].value,2)
-# Get Fuel cost from cell D24, 2 digits
-FC = round(ws['D24'].value,2)
-# Get Fuel type from cell Q2, string
-FuelType = ws['Q2'].value
-# Get Fuel unit from cell Q3, string
-FuelUnit = ws['Q3'].value
-# Get Start Month from cell B7, string
-StartMo = ws['B7'].value
-# Get End Month from cell B18, string
-EndMo = ws['B18'].value
-# Get Total Electricity kWh from cell C19
-TotalEkWh = round(ws['C19'].value)
-# Get Total Electricity MMBtu from cell I19
-TotalEBtu = round(ws['I19'].value)
-# Get Total Demand kW from cell E19
-TotalDkW = round(ws['E19'].value)
-# Get Total Fuel MMBtu from cell M19
-TotalFBtu = round(ws['M19'].value)
-
-# Get Total Energy worksheet
-ws = wb['Total Energy']
-# Get Total Electricity cost from cell E5+E6
-TotalECost = round(ws['E5'].value+ws['E6'].value+Fees)
-# Get Total Fuel cost from cell E7
-TotalFCost = round(ws['E7'].value)
-# Get Total Energy MMBtu from cell D8
-TotalBtu = round(ws['D8'].value)
-# Get Total Energy Cost from cell E8
-TotalCost = round(ws['E8'].value)
-
-# Write Natural Gas Cost for compatibility.
-if FuelType == 'Natural Gas':
-    NGC = FC
-else:
-    NGC = 0
-
-# Open Utility.json5 as text
-try:
-    with open('utility.json5', 'r') as f:
-        utility = f.read()
-        f.close()
-except FileNotFoundError:
-    print('utility.json5 not found.')
-    os._exit(1)
-
-# Replace values in Utility.json5
-utility = re.sub(r'EC: .*', 'EC: ' + str(EC) + ',', utility)
-utility = re.sub(r'DC: .*', 'DC: ' + str(DC) + ',', utility)
-utility = re.sub(r'FC: .*', 'FC: ' + str(FC) + ',', utility)
-utility = re.sub(r'FuelType: .*', 'FuelType: "' + FuelType + '",', utility)
-utility = re.sub(r'FuelUnit: .*', 'FuelUnit: "' + FuelUnit + '",', utility)
-utility = re.sub(r'NGC: .*', 'NGC: ' + str(NGC) + ',', utility)
-utility = re.sub(r'StartMo: .*', 'StartMo: "' + str(StartMo) + '",', utility)
-utility = re.sub(r'EndMo: .*', 'EndMo: "' + str(EndMo) + '",', utility)
-utility = re.sub(r'TotalEkWh: .*', 'TotalEkWh: ' + str(TotalEkWh) + ',', utility)
-utility = re.sub(r'TotalEBtu: .*', 'TotalEBtu: ' + str(TotalEBtu) + ',', utility)
-utility = re.sub(r'TotalDkW: .*', 'TotalDkW: ' + str(TotalDkW) + ',', utility)
-utility = re.sub(r'TotalFBtu: .*', 'TotalFBtu: ' + str(TotalFBtu) + ',', utility)
-utility = re.sub(r'TotalECost: .*', 'TotalECost: ' + str(TotalECost) + ',', utility)
-utility = re.sub(r'TotalFCost: .*', 'TotalFCost: ' + str(TotalFCost) + ',', utility)
-utility = re.sub(r'TotalBtu: .*', 'TotalBtu: ' + str(TotalBtu) + ',', utility)
-utility = re.sub(r'TotalCost: .*', 'TotalCost: ' + str(TotalCost) + ',', utility)
-
-# Save utility.json5
-try:
-    with open('utility.json5', 'w') as f:
-        f.write(utility)
-        f.close()
-except FileNotFoundError:
-    print('utility.json5 not found.')
-    os._exit(1)
\ No newline at end of file
+"""
+Extract Data from Energy Charts.xlsx
+Save statistics to Utility.json5
+"""
+
+import os, json5
+import numpy as np
+from easydict import EasyDict
+from Shared import Bills
+from Shared.IAC import caveat
+
+path = os.path.join(*Bills.WORKBOOK)
+config = EasyDict(json5.load(open('Utility.json5')))
+if config.get('BILLS'):
+    # Ingest bill files of all accounts into the bill store, Compiler.py reads the tables from it
+    store = Bills.ingest(config.BILLS, Bills.factors(path))
+    Bills.save(store, os.path.join(*Bills.STORE))
+    print("{0} bills of {1} accounts from {2} to {3}".format(store.MONTH.size, store.ACCOUNTS.size, *Bills.label([store.MONTH.min(), store.MONTH.max()])))
+    # Trailing 12 months of all accounts
+    bills = Bills.trailing(store)
+    stats = Bills.aggregate(bills)
+    # Months without electricity bills and fuels that are not in the fuel table
+    missing = Bills.label(bills.MONTH[np.isnan(bills.kWh)])
+    if missing.size:
+        caveat("No electricity bills of " + ", ".join(missing) + ".")
+    total = Bills.fuels(store)
+    for fuel, mmbtu, cost in zip(total.FUELS, total.MMBTU, total.COST):
+        if fuel not in ['Electricity', bills.FuelType] and mmbtu > 0:
+            caveat("{0} ({1:,.0f} MMBtu, ${2:,.0f}) is not included in the fuel statistics.".format(fuel, mmbtu, cost))
+    caveat("Energy charts are still made from Energy Charts.xlsx, please copy the trailing 12 months into it.")
+else:
+    # Compute statistics from the raw monthly rows of Energy Charts.xlsx
+    bills = Bills.read(path)
+    stats = Bills.aggregate(bills)
+    # Cross-check with the values cached by Excel, they are missing or stale if the workbook was saved by another tool
+    stale = Bills.check(stats, Bills.extract(path, Bills.layout(bills.MONTH.size)))
+    if stale:
+        caveat("Cached values of " + ", ".join(stale) + " in Energy Charts.xlsx don't match the raw data.")
+        print("Statistics are computed from the raw data, open and save the workbook in Excel to update the charts.")
+
+## Save statistics to Utility.json5
+utility = {}
+# Electricity cost, 3 digits
+utility['EC'] = round(stats['EC'], 3)
+# Demand cost, 2 digits
+utility['DC'] = round(stats['DC'], 2)
+# Fuel cost, 2 digits
+utility['FC'] = round(stats['FC'], 2)
+# Fuel type and unit, string
+utility['FuelType'] = stats['FuelType']
+utility['FuelUnit'] = stats['FuelUnit']
+# Write Natural Gas Cost for compatibility.
+utility['NGC'] = utility['FC'] if stats['FuelType'] == 'Natural Gas' else 0
+# Start and end month, string
+utility['StartMo'] = str(stats['StartMo'])
+utility['EndMo'] = str(stats['EndMo'])
+# Totals of electricity, demand and fuel
+utility['TotalEkWh'] = round(stats['TotalEkWh'])
+utility['TotalEBtu'] = round(stats['TotalEBtu'])
+utility['TotalDkW'] = round(stats['TotalDkW'])
+utility['TotalFBtu'] = round(stats['TotalFBtu'])
+# Total electricity cost is usage, demand and fees
+utility['TotalECost'] = round(stats['ECost'] + stats['DCost'] + round(stats['Fees'], 2))
+utility['TotalFCost'] = round(stats['TotalFCost'])
+utility['TotalBtu'] = round(stats['TotalBtu'])
+utility['TotalCost'] = round(stats['TotalCost'])
+
+# Update values in Utility.json5, comments are kept
+try:
+    Bills.update_json5('Utility.json5', utility)
+except FileNotFoundError:
+    print('Utility.json5 not found.')
+    os._exit(1)
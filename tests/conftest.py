@@ -0,0 +1,7 @@
+"""
+(Purpose) Test configuration, run "python -m pytest tests" from the repository root
+Shared modules are imported the same way as in the templates.
+"""
+
+import os, sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
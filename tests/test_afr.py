@@ -0,0 +1,35 @@
+"""
+(Purpose) Checks of the air-fuel ratio model and the multi-boiler savings graph
+"""
+
+import os
+import numpy as np
+from Shared import AFR, Savings
+
+INPUTS = dict(HR=24, DY=7, WK=52, NGC=8, PARTS=17000, LABOR=12000, NRR=2, FGT=317, CAT=88, LF=55)
+
+def test_invalid_masked():
+    AH = AFR.AFR(88, 317, [5, 30, -1])
+    assert list(np.ma.getmaskarray(AH)) == [False, True, True]
+
+def test_single_boiler_baseline():
+    # Savings of the template database, same as the scalar formula
+    res = Savings.afr_controllers.evaluate(dict(INPUTS, SIZE=[18], O2=[5]), ['SAVi', 'NGS'])
+    assert res.SAVi[0] == 0.88
+    assert res.NGS == round(18 * 8736 * 0.55 * 0.0088)
+
+def test_savings_clamped():
+    res = Savings.afr_controllers.evaluate(dict(INPUTS, SIZE=[18, 10], O2=[5, 1.5], O2T=[2, 6]),
+                                           ['SAVi', 'NGSi', 'NGS', 'SAVc'])
+    # Boiler below 2% O2 doesn't save, nor increase consumption
+    assert res.SAVi[1] == 0 and res.NGSi[1] == 0
+    assert res.NGS == res.NGSi[0]
+    assert np.all(res.SAVc >= 0)
+
+def test_averages(tmp_path):
+    path = os.path.join(tmp_path, 'log.csv')
+    open(path, 'w').write('EQUIP,O2,FGT,CAT\nA,4,300,80\nA,6,320,90\nB,3,310,\nB,50,310,85\nB,5,330,85\n')
+    res = AFR.averages(AFR.read_log(path), ['A', 'B'])
+    # Empty and out of range readings are excluded
+    assert list(res.N) == [2, 1]
+    assert list(res.O2) == [5, 5]
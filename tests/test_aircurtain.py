@@ -0,0 +1,37 @@
+"""
+(Purpose) Checks of the bin-hour infiltration model and the heat transfer chart of Install Air Curtain for Doorways
+"""
+
+import numpy as np
+from easydict import EasyDict
+from Shared import Savings, DegreeHours, Psychrometrics
+
+INPUTS = dict(AMT=[3, 1], DW=[8, 10], DH=[9, 12], RT=30, RH=50, EER=6, ETAH=80, HRHV=24, HRAC=[2, 4], DY=7, WK=26,
+              EF=80, EFES=40, HPF=5, COST=6000, LABOR=5000, EC=0.1, DC=10, NGC=8, ERR=0.075, NRR=2,
+              TB=np.arange(-17.5, 112.5, 5), HB=np.full((26, 2), 28.0))
+
+def test_chart_baseline():
+    # Same as the original template: 3 doors of 100 MMBtu/yr, 75 degF outside
+    res = Savings.air_curtain_chart.evaluate(dict(INPUTS, AMT=3, DW=8, DH=9, HRAC=2, HTF=100, OT=75, TDC=13),
+                                             ['HT', 'SHT', 'SES', 'NGS'])
+    assert res.HT == 300
+    assert res.SHT == round(300 * (7 / 5) * 293 * (75 - 30)) / 13
+    assert res.SES == round(res.SHT * 0.4) and res.NGS == 0
+
+def test_heat_per_group():
+    res = Savings.air_curtain.evaluate(dict(INPUTS, HEAT=[True, False]), ['HL', 'HLT', 'WHT', 'NGS'])
+    # Only the heated door group loses heat to the heating system
+    assert res.HLT == np.rint(res.HL[0])
+    assert res.WHT == np.round(res.HL[0] / 1e6, 1) and res.NGS > 0
+    none = Savings.air_curtain.evaluate(dict(INPUTS, HEAT=False), ['HLT', 'NGS'])
+    assert none.HLT == 0 and none.NGS == 0
+
+def test_door_hours_weeks(monkeypatch, tmp_path):
+    time = np.arange(np.datetime64('2021-01-01T00'), np.datetime64('2022-01-01T00'), np.timedelta64(1, 'h'))
+    temp = 55 - 25 * np.cos(2 * np.pi * np.arange(time.size) / 8760)
+    monkeypatch.setattr(Psychrometrics, 'hourly', lambda station, start, end: EasyDict(time=time, temp=temp, W=np.full(time.size, np.nan)))
+    path = str(tmp_path / 'cache.json')
+    year = DegreeHours.door_hours((40.6, -75.4), [2, 4], 7, 8, WK=52, path=path)
+    half = DegreeHours.door_hours((40.6, -75.4), [2, 4], 7, 8, WK=[26, 52], path=path)
+    assert np.allclose(year.HB.sum(axis=0), [2 * 365, 4 * 365], rtol=0.01)
+    assert np.allclose(half.HB[:, 0], year.HB[:, 0] / 2) and np.allclose(half.HB[:, 1], year.HB[:, 1])
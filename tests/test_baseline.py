@@ -0,0 +1,45 @@
+"""
+(Purpose) Regression checks of Savings.py against the original templates
+baseline.json holds, for every template, the inputs (Utility.json5, database.json5 and the values the template looked up)
+and the results of the original scalar calculations in automate.py, before they were moved to Savings.py.
+"""
+
+import os, json
+import numpy as np
+import pytest
+from Shared import Savings
+
+BASELINE = json.load(open(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')))
+# The original air curtain template used the heat transfer chart
+GRAPHS = dict(Savings.MEASURES, **{'HVAC/Install Air Curtain for Doorways': Savings.air_curtain_chart})
+# Results that differ from the original templates on purpose
+CHANGED = {
+    # The original template multiplied DS by itself instead of the demand charge
+    'Motor/Replace Cogged V-Belts': ['DCS', 'ACS'],
+    # The heat transfer coefficient is solved for each surface instead of a constant h
+    'HVAC/Insulate Bare Equipment': ['ES', 'DS', 'ECS', 'DCS', 'ACS'],
+}
+
+@pytest.mark.parametrize('measure', sorted(BASELINE))
+def test_baseline(measure):
+    inputs, outputs = BASELINE[measure]['inputs'], BASELINE[measure]['outputs']
+    res = Savings.scalarize(GRAPHS[measure].evaluate(inputs, list(outputs)))
+    for key, value in outputs.items():
+        if key in CHANGED.get(measure, []):
+            continue
+        assert np.isclose(res[key], value, rtol=1e-9), key
+
+def test_all_measures():
+    assert sorted(BASELINE) == sorted(Savings.MEASURES)
+
+def test_cogged_demand_cost():
+    inputs = BASELINE['Motor/Replace Cogged V-Belts']['inputs']
+    res = Savings.scalarize(Savings.cogged_v_belts.evaluate(inputs, ['DS', 'DCS']))
+    assert res['DCS'] == round(res['DS'] * inputs['DC'])
+
+def test_motion_sensor_single_area():
+    inputs = {key: value[0] if isinstance(value, list) else value
+              for key, value in BASELINE['Lighting/Install Motion Sensor']['inputs'].items()}
+    res = Savings.scalarize(Savings.motion_sensor.evaluate(inputs, ['ESi', 'ES', 'TCOST', 'TLABOR']))
+    assert res['ES'] == res['ESi'] == round(56 * 60 * 12 * 5 * 52 * 0.5 / 1000)
+    assert (res['TCOST'], res['TLABOR']) == (inputs['COST'], inputs['LABOR'])
@@ -0,0 +1,206 @@
+"""
+(Purpose) Checks of utility bill extraction and Utility.json5 update in Bills.py
+"""
+
+import os, shutil
+import json5
+import numpy as np
+import openpyxl
+import pytest
+from Shared import Bills
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+WORKBOOK = os.path.join(ROOT, *Bills.WORKBOOK)
+
+def test_extract():
+    # Same cached values as the full workbook
+    wb = openpyxl.load_workbook(WORKBOOK, data_only=True)
+    cells = Bills.extract(WORKBOOK, Bills.CELLS)
+    for sheet, names in Bills.CELLS.items():
+        for name, ref in names.items():
+            assert cells[name] == wb[sheet][ref].value
+    assert cells['FuelType'] == 'Natural Gas' and cells['StartMo'] == 'Jul 22'
+
+def test_extract_range():
+    tables = Bills.extract(WORKBOOK, {'Raw Data': {'Electricity': 'B7:I19', 'Fuel': 'K7:N19'}})
+    # 12 months and the total row
+    assert len(tables['Electricity']) == 13 and len(tables['Electricity'][0]) == 8
+    assert len(tables['Fuel']) == 13 and len(tables['Fuel'][0]) == 4
+    assert tables['Electricity'][0][:2] == ('Jul 22', 1384234)
+    assert tables['Electricity'][-1][0] == 'Total'
+    assert sum(row[1] for row in tables['Electricity'][:12]) == pytest.approx(tables['Electricity'][-1][1])
+
+def test_extract_mixed(tmp_path):
+    # Cells and ranges of the same worksheet
+    path = str(tmp_path / 'book.xlsx')
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = 'Data'
+    for row in range(1, 6):
+        for col in range(1, 4):
+            ws.cell(row, col, row * 10 + col)
+    wb.save(path)
+    res = Bills.extract(path, {'Data': {'A': 'C2', 'B': 'A4:B5', 'C': 'B1'}})
+    assert res == {'A': 23, 'B': [(41, 42), (51, 52)], 'C': 12}
+
+def test_update_json5(tmp_path):
+    path = str(tmp_path / 'Utility.json5')
+    with open(os.path.join(ROOT, 'Utility.json5')) as f:
+        text = f.read()
+    with open(path, 'w') as f:
+        f.write(text)
+    Bills.update_json5(path, {'EC': 0.1, 'FuelType': 'Propane', 'StartMo': 'Jan 23', 'TotalCost': 123})
+    with open(path) as f:
+        new = f.read()
+    # Only the values change, comments and other keys are kept
+    assert new.count('//') == text.count('//')
+    assert len(new.splitlines()) == len(text.splitlines())
+    data = json5.loads(new)
+    assert data['EC'] == 0.1 and data['FuelType'] == 'Propane' and data['StartMo'] == 'Jan 23'
+    assert data['TotalCost'] == 123 and data['DC'] == json5.loads(text)['DC']
+    # A key that is not in the file
+    with pytest.raises(Exception):
+        Bills.update_json5(path, {'XX': 1})
+
+def test_update_json5_comment(tmp_path):
+    # Trailing comments and strings with commas
+    path = str(tmp_path / 'a.json5')
+    with open(path, 'w') as f:
+        f.write('{\n  A: 1, // one\n  B: "x, y",\n  C: 3\n}')
+    Bills.update_json5(path, {'A': 2, 'B': 'z', 'C': 4})
+    with open(path) as f:
+        assert f.read() == '{\n  A: 2, // one\n  B: "z",\n  C: 4\n}'
+
+def test_label():
+    assert Bills.label(np.datetime64('2022-07') + np.arange(7)).tolist()[::6] == ['Jul 22', 'Jan 23']
+    assert Bills.label(np.array(['1999-12'], dtype='datetime64[M]')).tolist() == ['Dec 99']
+
+def test_aggregate():
+    # Computed from the raw rows, same as the cached values of Excel
+    stats = Bills.aggregate(Bills.read(WORKBOOK))
+    assert Bills.check(stats, Bills.extract(WORKBOOK, Bills.CELLS)) == []
+    assert stats['StartMo'] == 'Jul 22' and stats['EndMo'] == 'Jun 23'
+    assert stats['TotalCost'] == pytest.approx(stats['ECost'] + stats['DCost'] + stats['TotalFCost'])
+
+def test_check():
+    computed = {'EC': 0.08, 'StartMo': 'Jul 22', 'TotalCost': 100.0}
+    assert Bills.check(computed, {'EC': 0.08, 'StartMo': 'Jul 22', 'TotalCost': 100.0}) == []
+    # Stale, missing and formula text instead of value
+    assert Bills.check(computed, {'EC': 0.09, 'StartMo': None, 'TotalCost': '=SUM(E5:E7)'}) == ['EC', 'StartMo', 'TotalCost']
+
+def test_tables():
+    # Same rows as the cached tables of Excel
+    tables = Bills.tables(Bills.read(WORKBOOK))
+    cached = Bills.extract(WORKBOOK, {'Raw Data': {'Electricity': 'B7:I19', 'Fuel': 'K7:N19'}})
+    for name in ['Electricity', 'Fuel']:
+        assert [row[0] for row in tables[name]] == [row[0].strip() for row in cached[name]]
+        assert np.allclose([row[1:] for row in tables[name]], [row[1:] for row in cached[name]])
+
+def test_stale(tmp_path):
+    # Saved by openpyxl, formulas have no cached values
+    path = str(tmp_path / 'Energy Charts.xlsx')
+    shutil.copy(WORKBOOK, path)
+    wb = openpyxl.load_workbook(path)
+    wb['Raw Data']['C7'] = 1384234 + 1000
+    wb.save(path)
+    stats = Bills.aggregate(Bills.read(path))
+    assert 'TotalEkWh' in Bills.check(stats, Bills.extract(path, Bills.CELLS))
+    assert stats['TotalEkWh'] == pytest.approx(Bills.aggregate(Bills.read(WORKBOOK))['TotalEkWh'] + 1000)
+
+def test_fuel_unit(tmp_path):
+    # Conversion factor of the fuel and unit, and units that don't apply
+    path = str(tmp_path / 'Energy Charts.xlsx')
+    shutil.copy(WORKBOOK, path)
+    wb = openpyxl.load_workbook(path)
+    wb['Raw Data']['Q2'] = 'Propane'
+    wb['Raw Data']['Q3'] = 'gal'
+    wb.save(path)
+    assert Bills.read(path).FACTOR == 0.0915
+    wb['Raw Data']['Q3'] = 'DTH'
+    wb.save(path)
+    with pytest.raises(Exception):
+        Bills.read(path)
+
+def test_layout():
+    # Month count of the workbook and cells of the 12-month layout
+    assert Bills.months(WORKBOOK) == 12
+    assert Bills.CELLS['Raw Data']['EndMo'] == 'B18' and Bills.CELLS['Raw Data']['TotalEkWh'] == 'C19'
+    assert Bills.CELLS['Raw Data']['EC'] == 'D21' and Bills.CELLS['Raw Data']['FC'] == 'D24'
+    assert Bills.raw(24)['Raw Data']['Electricity'] == 'C7:H30'
+
+def bills(tmp_path):
+    # Two electricity meters over 30 months in XLSX, gas in two units and propane in CSV
+    months = np.arange('2021-01', '2023-07', dtype='datetime64[M]')
+    rows = [{'Account': account, 'Fuel': 'Electricity', 'Month': str(month), 'Usage': 1000.0 * (i + 1), 'Demand': 10.0,
+             'Usage Charge': 80.0 * (i + 1), 'Demand Charge': 40.0, 'Cost': 80.0 * (i + 1) + 40 + 5}
+            for i, account in enumerate(['Main', 'Warehouse']) for month in months]
+    electricity = str(tmp_path / 'electricity.xlsx')
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(list(rows[0]))
+    for row in rows:
+        ws.append(list(row.values()))
+    wb.save(electricity)
+    fuel = str(tmp_path / 'fuel.csv')
+    with open(fuel, 'w') as f:
+        f.write('ACCOUNT,FUEL,UNIT,MONTH,USAGE,COST\n')
+        for month in months:
+            f.write('Gas 1,Natural Gas,Mcf,' + str(month) + '-01,100,300\n')
+        f.write('Gas 2,Natural Gas,Therm,2023-06,1000,280\n')
+        f.write('Tank,Propane,gal,2023-01,100,250\n')
+        # A corrected bill replaces the earlier one
+        f.write('Gas 1,Natural Gas,Mcf,2023-05,200,600\n')
+    return Bills.ingest([electricity, fuel], Bills.factors(WORKBOOK))
+
+def test_ingest(tmp_path):
+    store = bills(tmp_path)
+    assert store.ACCOUNTS.tolist() == ['Gas 1', 'Gas 2', 'Main', 'Tank', 'Warehouse']
+    assert store.FUELS.tolist() == ['Electricity', 'Natural Gas', 'Propane']
+    # 2 x 30 electricity, 30 + 1 gas and 1 propane bills
+    assert store.MONTH.size == 92 and store.ACCOUNT.dtype == np.int32
+    gas = (store.FUEL == 1) & (store.MONTH == np.datetime64('2023-05'))
+    assert store.USAGE[gas].tolist() == [200] and store.MMBTU[gas] == pytest.approx(200 * 1.036)
+    # Save and load
+    path = str(tmp_path / 'Bills.npz')
+    Bills.save(store, path)
+    loaded = Bills.load(path)
+    assert set(loaded) == set(store)
+    for key in store:
+        assert np.array_equal(loaded[key], store[key], equal_nan=loaded[key].dtype.kind == 'f')
+
+def test_ingest_errors(tmp_path):
+    path = str(tmp_path / 'bills.csv')
+    with open(path, 'w') as f:
+        f.write('Account,Fuel,Unit,Month,Usage,Cost\nG,Natural Gas,gal,2023-01,1,1\n')
+    with pytest.raises(Exception):
+        Bills.ingest([path], Bills.factors(WORKBOOK))
+    with open(path, 'w') as f:
+        f.write('Account,Fuel,Month,Usage\nE,Electricity,2023-01,1\n')
+    with pytest.raises(Exception):
+        Bills.ingest([path], Bills.factors(WORKBOOK))
+
+def test_trailing(tmp_path):
+    store = bills(tmp_path)
+    res = Bills.trailing(store)
+    # Trailing 12 months to the latest bill, both meters added up
+    assert Bills.label(res.MONTH[[0, -1]]).tolist() == ['Jul 22', 'Jun 23']
+    assert res.kWh == pytest.approx(np.full(12, 3000)) and res.kW == pytest.approx(np.full(12, 20))
+    assert res.TCH - res.UC - res.DCH == pytest.approx(np.full(12, 10))
+    # Natural gas has the most MMBtu, Mcf is its most common unit, therms are converted
+    assert res.FuelType == 'Natural Gas' and res.FuelUnit == 'Mcf' and res.FACTOR == 1.036
+    assert res.FU[-1] == pytest.approx(100 + 1000 * 0.1 / 1.036) and res.FU[-2] == 200
+    stats = Bills.aggregate(res)
+    assert stats['TotalEkWh'] == 36000 and stats['Fees'] == pytest.approx(120)
+    assert stats['EC'] == pytest.approx(0.08) and stats['DC'] == pytest.approx(4)
+    # A window with months without bills
+    res = Bills.trailing(store, fuel='Propane', months=3, end='2023-02')
+    assert res.FuelUnit == 'gal' and np.isnan(res.FU).tolist() == [True, False, True]
+    res = Bills.trailing(store, months=12, end='2021-06')
+    assert np.isnan(res.kWh).sum() == 6
+    tables = Bills.tables(res)
+    assert len(tables['Electricity']) == 13 and tables['Electricity'][0][1] == 0
+
+def test_fuels(tmp_path):
+    total = Bills.fuels(bills(tmp_path))
+    assert total.MMBTU[2] == pytest.approx(100 * 0.0915) and total.COST[2] == 250
+    assert total.BILLS.shape == (3, 12) and total.BILLS[0].tolist() == [2] * 12
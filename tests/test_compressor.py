@@ -0,0 +1,51 @@
+"""
+(Purpose) Checks of the compressed air system model and stacked Compressor measures
+"""
+
+import os
+import numpy as np
+import pytest
+from easydict import EasyDict
+from Shared import Compressor, Savings
+
+def system(STACK):
+    res = Compressor.load()
+    res.STACK = STACK
+    return res
+
+def database(measure, **changes):
+    return EasyDict(Compressor._database(measure), **changes)
+
+def test_dispatch():
+    # Base load compressor first, the trim compressor takes the rest
+    load = Compressor.dispatch([50, 150, 400], [100, 200])
+    assert load.tolist() == [[50, 0], [100, 50], [100, 200]]
+
+def test_stack_adds_up():
+    res = Compressor.stack(system(['Repair Leaks', 'Reduce Set Pressure', 'Existing Compressor VFD']))
+    # Savings in the stack add up to the savings of all measures
+    assert np.isclose(np.sum(res.ES), res.E[0] - res.E[3])
+    assert np.all((res.XF >= 0) & (res.XF <= 100))
+    assert res.XF[0] == 100
+
+def test_alternative_vfds():
+    with pytest.raises(Exception, match='alternatives'):
+        Compressor.stack(system(['Existing Compressor VFD', 'New Compressor VFD']))
+
+def test_intake_air_temperature():
+    # TO of the database is used in the template and in the stack, no weather lookup
+    db = database('Intake Air', TO=40)
+    assert Compressor.outside_temperature(db) == 40
+    res = Compressor.stack(system(['Intake Air']), {'Intake Air': db})
+    colder = Compressor.stack(system(['Intake Air']), {'Intake Air': database('Intake Air', TO=30)})
+    assert 0 < res.ES[0] < colder.ES[0]
+
+def test_leak_survey(tmp_path):
+    path = os.path.join(tmp_path, 'survey.csv')
+    open(path, 'w').write('TAG,AREA,DIA,FLOW,P1\n1,Press,,20,\n2,Press,,30,\n')
+    db = database('Repair Leaks', SURVEY=path)
+    before = Compressor._stage(EasyDict(DEM=np.array([100.0, 200.0])), None, 'Repair Leaks', db)
+    # Demand drops by the surveyed flows, not by the standard sizes of the database
+    assert before.DEM.tolist() == [50, 150]
+    standard = Savings.repair_leaks.evaluate(database('Repair Leaks'), ['NL', 'FR'])
+    assert np.sum(standard.NL * standard.FR) != 50
@@ -0,0 +1,58 @@
+"""
+(Purpose) Checks of schedules, degree hours and temperature bins from hourly weather
+"""
+
+import numpy as np
+from easydict import EasyDict
+from Shared import DegreeHours, Weather
+
+# One year of hourly temperature, warm summer and cold winter, warmer in the afternoon
+TIME = np.arange(np.datetime64('2021-01-01T05'), np.datetime64('2022-01-01T05'), np.timedelta64(1, 'h'))
+DAY = np.arange(TIME.size) / 24
+TEMP = 55 - 25 * np.cos(2 * np.pi * (DAY - 15) / 365) + 8 * np.sin(2 * np.pi * (DAY % 1 - 0.375))
+
+def hourly(monkeypatch, T=TEMP):
+    monkeypatch.setattr(Weather, 'hourly', lambda station, start, end: EasyDict(time=TIME, temp=T))
+
+def test_week():
+    schedule = DegreeHours.week(72, 80, HR=8, DY=5.5, START=8)
+    assert schedule.shape == (7, 24)
+    assert np.sum(schedule == 72) == 8 * 5 + 4
+    assert schedule[0, 8] == 72 and schedule[0, 16] == 80 and schedule[6, 12] == 80
+
+def test_local_time():
+    # 2021-01-04 is Monday, 13:00 UTC is 8:00 at longitude -75
+    dow, hour = DegreeHours.local_time(np.array(['2021-01-04T13'], dtype='datetime64[h]'), -75)
+    assert dow[0] == 0 and hour[0] == 8
+
+def test_full_year(monkeypatch, tmp_path):
+    hourly(monkeypatch)
+    res = DegreeHours.thermostat((40.6, -75.4), 72, 80, 68, 60, 8, 5, path=str(tmp_path / 'cache.json'))
+    dow, hour = DegreeHours.local_time(TIME, -75.4)
+    assert res.CDH == round(np.sum(np.fmax(TEMP - 72, 0)))
+    assert res.HDH == round(np.sum(np.fmax(68 - TEMP, 0)))
+    assert 0 < res.MCDH < res.CDH and 0 < res.MHDH < res.HDH
+
+def test_operating_hours(monkeypatch, tmp_path):
+    hourly(monkeypatch)
+    path = str(tmp_path / 'cache.json')
+    full = DegreeHours.thermostat((40.6, -75.4), 72, 80, 68, 60, 8, 5, path=path)
+    # Cooling counts the warmest weeks only, heating the coldest
+    season = DegreeHours.thermostat((40.6, -75.4), 72, 80, 68, 60, 8, 5, CWK=26, path=path)
+    assert season.CDH <= full.CDH and season.HDH < full.HDH
+    assert season.CDH > 0.95 * full.CDH
+    dow, hour = DegreeHours.local_time(TIME, -75.4)
+    number = DegreeHours.local_week(TIME, -75.4)
+    winter = DegreeHours.season(np.fmax(68 - TEMP, 0), number, 26) > 0
+    assert season.HDH == round(np.sum(np.fmax(68 - TEMP, 0)[winter]))
+    # The HVAC runs in the occupied hours only, so there is nothing to set back
+    occupied = DegreeHours.thermostat((40.6, -75.4), 72, 80, 68, 60, 8, 5, CHR=8, CDY=5, path=path)
+    assert occupied.MCDH == occupied.CDH and occupied.MHDH == occupied.HDH
+    assert occupied.CDH < full.CDH
+
+def test_bins():
+    dow, hour = DegreeHours.local_time(TIME, -75.4)
+    on = np.stack([DegreeHours.week(1, 0), DegreeHours.week(1, 0, 8, 5)])
+    HB = DegreeHours.bins(TEMP, dow, hour, on)
+    assert HB.shape == (len(DegreeHours.EDGES) - 1, 2)
+    assert np.isclose(HB[:, 0].sum(), 8760) and np.isclose(HB[:, 1].sum(), 8 * 5 * 8760 / 168, rtol=0.01)
@@ -0,0 +1,59 @@
+"""
+(Purpose) Checks of the lifecycle metrics in Finance.py
+"""
+
+import numpy as np
+from easydict import EasyDict
+from Shared import Finance
+from Shared.IAC import lifecycle
+
+def test_present_worth():
+    # Without escalation, the annuity factor 10 years at 5%
+    assert np.isclose(Finance.present_worth(5, 0, 10), (1 - 1.05 ** -10) / 0.05)
+    # Escalation equal to the discount rate
+    assert np.isclose(Finance.present_worth(3, 3, 10), 10 / 1.03)
+    # Undiscounted sum of the escalated savings, first amount at the end of year 1
+    assert np.isclose(Finance.present_worth(0, 0, 7), 7)
+
+def test_npv_sir():
+    NPV = Finance.npv(1000, 5000, 5, 0, 10)
+    assert np.isclose(NPV, 1000 * (1 - 1.05 ** -10) / 0.05 - 5000)
+    assert np.isclose(Finance.sir(1000, 5000, 5, 0, 10), (NPV + 5000) / 5000)
+    assert Finance.sir(1000, 0, 5, 0, 10) == np.inf
+
+def test_irr():
+    # NPV at the IRR is zero
+    IRR = Finance.irr(1000, 5000, 2, 10)
+    assert np.isclose(Finance.npv(1000, 5000, IRR, 2, 10), 0, atol=1e-3)
+    # Pays back in exactly the life without discounting
+    assert np.isclose(Finance.irr(500, 5000, 0, 10), 0, atol=1e-5)
+    assert Finance.irr(1000, 0, 0, 10) == np.inf
+    assert np.isnan(Finance.irr(0, 5000, 0, 10))
+
+def test_broadcast():
+    # Recommendations as a column against discount rate scenarios as a row
+    ACS = np.array([[1000], [2000]])
+    res = Finance.metrics(ACS, [[5000], [8000]], [3, 5, 7], 2, [[10], [15]])
+    assert res.NPV.shape == res.SIR.shape == (2, 3)
+    # IRR doesn't depend on the discount rate
+    assert res.IRR.shape == (2, 1)
+    assert np.all(np.diff(res.NPV, axis=1) < 0)
+    assert np.allclose(res.IRR[:, 0], [Finance.irr(1000, 5000, 2, 10), Finance.irr(2000, 8000, 2, 15)])
+
+def test_portfolio():
+    ACS, IC, LIFE = [1000, 2000], [5000, 8000], [10, 15]
+    res = Finance.portfolio(ACS, IC, 5, 2, LIFE)
+    assert np.isclose(res.NPV, np.sum(Finance.npv(ACS, IC, 5, 2, LIFE)))
+    assert np.isclose(np.sum(Finance.npv(ACS, IC, res.IRR, 2, LIFE)), 0, atol=1e-3)
+    # The IRR of the group is between the IRRs of the recommendations
+    each = Finance.irr(ACS, IC, 2, LIFE)
+    assert each.min() <= res.IRR <= each.max()
+    assert Finance.portfolio([1000], [0], 5, 2, [10]).IRR == np.inf
+
+def test_lifecycle():
+    # Modified implementation cost after rebate is used if available
+    dic = lifecycle(EasyDict(ACS=1000, IC=5000, MIC=4000, DR=5, ESC=0, LIFE=10))
+    assert dic.NPV == round(Finance.npv(1000, 4000, 5, 0, 10).item())
+    assert dic.SIR == round(Finance.sir(1000, 4000, 5, 0, 10).item(), 2)
+    dic = lifecycle(EasyDict(ACS=1000, IC=0, DR=5, ESC=0, LIFE=10))
+    assert dic.IRR == dic.SIR == "N/A"
@@ -0,0 +1,75 @@
+"""
+(Purpose) Checks of the motor inventory (fleet) mode of Single Motor VFD and Replace Cogged V-Belts
+"""
+
+import os, re, json5, shutil, subprocess, sys, locale
+import numpy as np
+import pytest
+from docx import Document
+from easydict import EasyDict
+from Shared import Inventory, Savings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Second motor is the motor of the database, fourth one never pays back
+INVENTORY = 'MT,HP,LF,HR,VFD\nCompressor,100,70,16,\nOven blowers,,,,\nPump,15,95,24,3000\nFan,2,20,4,\n'
+
+def database(measure):
+    iac = EasyDict(json5.load(open(os.path.join(ROOT, 'Utility.json5'))))
+    iac.update(json5.load(open(os.path.join(ROOT, measure, 'database.json5'))))
+    return iac
+
+def motors(tmp_path, iac, columns):
+    path = tmp_path / 'motors.csv'
+    path.write_text(INVENTORY.replace('Oven blowers,', 'Oven blowers,' + str(iac.HP)))
+    defaults = {key: iac[key] for key in columns[1:]}
+    defaults['MT'] = ''
+    return Inventory.read(str(path), strings=['MT'], numbers=columns, defaults=defaults)
+
+def test_vfd_fleet(tmp_path):
+    iac = database('Motor/Single Motor VFD')
+    inv = motors(tmp_path, iac, ['HP', 'LF', 'HR', 'DY', 'WK', 'ETAE', 'ETAP', 'VFD', 'AIC'])
+    res = Savings.motor_vfd(**{**iac, **inv})
+    # Each motor of the inventory has the savings of a single motor with its values
+    single = Savings.motor_vfd(**iac)
+    for key in ['ES', 'DS', 'ACS', 'IC', 'RB', 'MIC']:
+        assert res[key].shape == (4,)
+        assert np.isclose(res[key][1], single[key]), key
+    # Rebates are capped per motor
+    assert np.all(res.MRB <= res.IC / 2)
+    index = Inventory.rank(res.MPB, iac.PBMAX)
+    assert 3 not in index and np.all(np.diff(res.MPB[index]) >= 0)
+
+def test_cogged_fleet(tmp_path):
+    iac = database('Motor/Replace Cogged V-Belts')
+    inv = motors(tmp_path, iac, ['HP', 'ETA', 'LF', 'HR', 'DY', 'WK', 'CBELT', 'AMT'])
+    res = Savings.cogged_v_belts(**{**iac, **inv})
+    single = Savings.cogged_v_belts(**iac)
+    for key in ['ES', 'DS', 'ACS', 'IC']:
+        assert np.isclose(res[key][1], single[key]), key
+    index = Inventory.rank(res.PB, iac.PBMAX)
+    total = Inventory.total({**inv, **res}, index, ['HP', 'ES', 'ACS'])
+    assert total.ES == np.sum(res.ES[index]) and total.HP == np.sum(inv.HP[index])
+
+def test_fleet_template(tmp_path):
+    # Run the template in fleet mode, the table has one row per ranked motor and the total
+    try:
+        current = locale.setlocale(locale.LC_ALL)
+        locale.setlocale(locale.LC_ALL, 'en_US')
+        locale.setlocale(locale.LC_ALL, current)
+    except locale.Error:
+        pytest.skip('en_US locale is not available')
+    measure = tmp_path / 'Motor' / 'Single Motor VFD'
+    shutil.copytree(os.path.join(ROOT, 'Motor', 'Single Motor VFD'), measure)
+    shutil.copytree(os.path.join(ROOT, 'Shared'), tmp_path / 'Shared')
+    shutil.copy(os.path.join(ROOT, 'Utility.json5'), tmp_path)
+    os.makedirs(tmp_path / 'Recommendations')
+    (measure / 'motors.csv').write_text(INVENTORY.replace('Oven blowers,', 'Oven blowers,60'))
+    text = (measure / 'database.json5').read_text()
+    (measure / 'database.json5').write_text(re.sub(r'INVENTORY: ""', 'INVENTORY: "motors.csv"', text))
+    out = subprocess.run([sys.executable, 'automate.py'], cwd=measure, stdin=subprocess.DEVNULL, check=True,
+                         capture_output=True, text=True).stdout
+    match = re.search(r'(\d+) of 4 motors pay back', out)
+    assert match
+    table = Document(tmp_path / 'Recommendations' / 'Rec1.docx').tables[2]
+    assert len(table.rows) == int(match.group(1)) + 2
+    assert table.rows[-1].cells[0].text == 'Total'
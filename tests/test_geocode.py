@@ -0,0 +1,46 @@
+"""
+(Purpose) Checks of the ZIP code index in Geocode.py
+"""
+
+import sys
+import pytest
+from Shared import Geocode
+
+# GeoNames format, tab separated
+LINES = [
+    ['US', '18015', 'Bethlehem', 'Pennsylvania', 'PA', 'Northampton', '095', '', '', '40.5932', '-75.3802', '4'],
+    ['US', '08540', 'Princeton', 'New Jersey', 'NJ', 'Mercer', '021', '', '', '40.3573', '-74.6672', '4'],
+    # Second place of the same ZIP code is ignored
+    ['US', '18015', 'Other', 'Pennsylvania', 'PA', 'Lehigh', '077', '', '', '40.0', '-75.0', '4'],
+    # No coordinates
+    ['US', '99999', 'Nowhere', '', '', '', '', '', '', '', '', ''],
+]
+
+@pytest.fixture
+def index(tmp_path, monkeypatch):
+    source = tmp_path / 'US.txt'
+    source.write_text('\n'.join('\t'.join(line) for line in LINES))
+    path = str(tmp_path / 'ZIP.npy')
+    monkeypatch.setattr(Geocode, 'INDEX', path)
+    monkeypatch.setattr(Geocode, '_index', None)
+    assert Geocode.build(str(source), path) == 2
+    return path
+
+def test_lookup(index):
+    assert Geocode.lookup('18015') == (40.5932, -75.3802)
+    # Leading zero, integer and ZIP+4
+    assert Geocode.lookup(8540) == Geocode.lookup('08540') == Geocode.lookup('08540-1234') == (40.3573, -74.6672)
+    assert Geocode.state(18015) == 'PA'
+
+def test_not_found(index):
+    for ZIP in ['99999', '00001', '19999']:
+        with pytest.raises(Exception, match='is not found'):
+            Geocode.lookup(ZIP)
+
+def test_fallback(tmp_path, monkeypatch):
+    # Without the index, pgeocode is used
+    monkeypatch.setattr(Geocode, 'INDEX', str(tmp_path / 'missing.npy'))
+    monkeypatch.setattr(Geocode, '_index', None)
+    monkeypatch.setitem(sys.modules, 'pgeocode', None)
+    with pytest.raises(Exception, match='Geocode.build'):
+        Geocode.lookup('18015')
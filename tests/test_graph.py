@@ -0,0 +1,71 @@
+"""
+(Purpose) Checks of the lazy calculation graph in Graph.py
+"""
+
+import pytest
+from Shared.Graph import Graph
+
+def counted():
+    # Graph that counts how many times each node is evaluated
+    calls = {}
+    g = Graph("Test")
+    def count(name):
+        calls[name] = calls.get(name, 0) + 1
+    @g.node
+    def OH(HR, DY, WK=52):
+        count('OH')
+        return HR * DY * WK
+    @g.node
+    def ES(OH, KW):
+        count('ES')
+        return OH * KW
+    @g.node
+    def IC(IC, LABOR=0):
+        count('IC')
+        return float(IC) + LABOR
+    @g.node
+    def PB(ES, IC):
+        count('PB')
+        return IC / ES
+    return g, calls
+
+def test_inputs():
+    g, calls = counted()
+    # IC depends on its own name, the input with that name
+    assert g.inputs == ['HR', 'DY', 'WK', 'KW', 'IC', 'LABOR']
+
+def test_lazy():
+    g, calls = counted()
+    res = g.evaluate({'HR': 8, 'DY': 5, 'KW': 2, 'UNUSED': 1}, ['ES'])
+    assert res == {'ES': 8 * 5 * 52 * 2}
+    # IC and PB are not needed
+    assert calls == {'OH': 1, 'ES': 1}
+
+def test_self_dependent_and_defaults():
+    g, calls = counted()
+    res = g(HR=8, DY=5, WK=50, KW=2, IC='4000')
+    assert res.IC == 4000.0
+    assert res.PB == 4000 / (8 * 5 * 50 * 2)
+
+def test_update():
+    g, calls = counted()
+    m = g.model(HR=8, DY=5, KW=2, IC=4000)
+    m.PB
+    assert calls == {'OH': 1, 'ES': 1, 'IC': 1, 'PB': 1}
+    # Only the nodes that depend on KW are evaluated again
+    m.update(KW=4)
+    assert m.ES == 8 * 5 * 52 * 4
+    m.PB
+    assert calls == {'OH': 1, 'ES': 2, 'IC': 1, 'PB': 2}
+    # A self-dependent node can be changed as an input
+    m.update(IC=2000)
+    assert m.IC == 2000
+    with pytest.raises(Exception, match="can't be changed"):
+        m.update(OH=100)
+
+def test_missing():
+    g, calls = counted()
+    with pytest.raises(Exception, match='Input KW of Test is missing'):
+        g.evaluate({'HR': 8, 'DY': 5}, ['ES'])
+    with pytest.raises(Exception, match='not found'):
+        g.model(HR=8).XYZ
@@ -0,0 +1,28 @@
+"""
+(Purpose) Checks of the insulation heat loss model and the Insulate Bare Equipment graph
+"""
+
+import numpy as np
+from Shared import Insulation, Savings
+
+INPUTS = dict(SIZE=[1.5, 4, 1.5], DIA=[4, 4, 4], TEMP=[150, 240, 130], HR=[24, 24, 24], DY=[7, 7, 7], WK=[52, 52, 52],
+              SFA=[22.5, 22.5, 22.5], AMB=[75, 75, 75], KINS=0.3, EB=0.8, EJ=0.9, COST=[4, 9, 4], LABOR=0.5,
+              EC=0.1, DC=10)
+
+def test_energy_balance():
+    # Conduction through the insulation equals the loss of its surface
+    TS = Insulation.surface(240, 75, 2, 4, 0.3, 0.9)
+    R, ratio = Insulation.resistance(2, 4, 0.3)
+    assert 75 < TS < 240
+    assert np.isclose(Insulation.conduction(240, TS, 2, 4, 0.3) / ratio, Insulation.bare(TS, 75, 4 * (1 + 2 * 2 / 4), 0.9), rtol=1e-4)
+
+def test_savings():
+    res = Savings.insulate_bare_equipment.evaluate(INPUTS, ['H', 'AHL', 'ES'])
+    assert np.all(res.H > 0) and np.all(res.AHL > 0)
+    assert res.ES == np.sum(res.AHL)
+
+def test_surface_at_ambient():
+    # No heat loss and no nan if a surface is at ambient temperature
+    res = Savings.insulate_bare_equipment.evaluate(dict(INPUTS, TEMP=[150, 75, 130]), ['H', 'AHL', 'ES', 'DS'])
+    assert res.H[1] == 0 and res.AHL[1] == 0
+    assert np.isfinite(res.ES) and np.isfinite(res.DS)
@@ -0,0 +1,72 @@
+"""
+(Purpose) Checks of inventory files and long tables in Inventory.py
+"""
+
+import numpy as np
+import pytest
+from docx import Document
+from Shared import Inventory
+
+def write(path, text):
+    path.write_text(text)
+    return str(path)
+
+def test_read(tmp_path):
+    path = write(tmp_path / 'motors.csv', 'MT,HP,LF,Notes\nAir handler,"1,000",,x\n\n,,,\nPump,15,60,\n')
+    motors = Inventory.read(path, strings=['MT'], numbers=['HP', 'LF', 'HR'], defaults={'LF': 75, 'HR': 8})
+    assert motors.MT.tolist() == ['Air handler', 'Pump']
+    assert motors.HP.tolist() == [1000, 15]
+    # Empty cells and missing columns take the default
+    assert motors.LF.tolist() == [75, 60]
+    assert motors.HR.tolist() == [8, 8]
+
+def test_read_required(tmp_path):
+    path = write(tmp_path / 'motors.csv', 'MT,HP\nPump,\n')
+    with pytest.raises(Exception, match='Row 2 .* has no HP'):
+        Inventory.read(path, strings=['MT'], numbers=['HP'])
+    with pytest.raises(Exception, match='Column LF is not in'):
+        Inventory.read(path, numbers=['LF'])
+
+def test_rank_total():
+    PB = [3.0, np.inf, 0.5, 3.0, 2.0]
+    index = Inventory.rank(PB, 3)
+    # Shortest payback first, ties in inventory order
+    assert index.tolist() == [2, 4, 0, 3]
+    assert Inventory.rank(PB, 0.1).size == 0
+    res = Inventory.total({'ES': [1, 2, 3, 4, 5], 'IC': np.array([10, 20, 30, 40, 50])}, index, ['ES', 'IC'])
+    assert res == {'ES': 13, 'IC': 130}
+
+def table(doc, n):
+    # Header, n data rows and a total row
+    t = doc.add_table(rows=n + 2, cols=2)
+    t.rows[0].cells[0].text, t.rows[0].cells[1].text = 'Motor', 'ES'
+    for i in range(1, n + 1):
+        t.rows[i].cells[0].text = 'old ' + str(i)
+    t.rows[-1].cells[0].text = 'Total'
+    return t
+
+def texts(t):
+    return [[c.text for c in row.cells] for row in t.rows]
+
+def test_fill():
+    doc = Document()
+    t = table(doc, 3)
+    Inventory.fill(t, [['A', '1'], ['B', '2']], footer=1)
+    assert texts(t) == [['Motor', 'ES'], ['A', '1'], ['B', '2'], ['Total', '']]
+    # Header is repeated on every page
+    assert t.rows[0]._tr.trPr.find('{http://schemas.openxmlformats.org/wordprocessingml/2006/main}tblHeader') is not None
+
+def test_fill_long():
+    doc = Document()
+    t = table(doc, 1)
+    rows = [['M' + str(i), str(i)] for i in range(500)]
+    Inventory.fill(t, rows, footer=1)
+    assert len(t.rows) == 502
+    assert texts(t)[1] == ['M0', '0'] and texts(t)[500] == ['M499', '499'] and texts(t)[-1][0] == 'Total'
+
+def test_fill_without_header():
+    # Rows are added after the table grid
+    doc = Document()
+    t = table(doc, 2)
+    Inventory.fill(t, [['A', '1'], ['B', '2'], ['C', '3']], first=0)
+    assert texts(t) == [['A', '1'], ['B', '2'], ['C', '3']]
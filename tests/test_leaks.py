@@ -0,0 +1,34 @@
+"""
+(Purpose) Checks of leak survey reading, size bins and grouping for Repair Leaks
+"""
+
+import os
+import numpy as np
+import pytest
+from Shared import Leaks
+from Shared.Savings import LeakDiameter
+
+def test_size_bin():
+    # Standard sizes fall in their own bin
+    assert list(Leaks.size_bin(LeakDiameter)) == [0, 1, 2, 3, 4, 5]
+    assert list(Leaks.size_bin([0.001, 0.07, 1])) == [0, 2, 5]
+
+def test_read_survey(tmp_path):
+    path = os.path.join(tmp_path, 'survey.csv')
+    open(path, 'w').write('TAG,AREA,DIA,FLOW,P1\n1,Press,1/16,,\n2,,0.125,,90\n3,Press,,2.5,\n')
+    survey = Leaks.read_survey(path)
+    assert list(survey.AREA) == ['Press', '', 'Press']
+    assert survey.DIA[0] == 0.0625 and np.isnan(survey.DIA[2])
+    assert survey.FLOW[2] == 2.5 and survey.P1[1] == 90
+
+def test_read_survey_incomplete(tmp_path):
+    path = os.path.join(tmp_path, 'survey.csv')
+    open(path, 'w').write('TAG,AREA,DIA,FLOW,P1\nA7,Press,,,\n')
+    with pytest.raises(Exception, match='A7 has neither'):
+        Leaks.read_survey(path)
+
+def test_group():
+    res = Leaks.group([np.array(['B', 'A', 'B', 'A']), np.array([2, 3, 2, 2])], weights=[1, 2, 3, 4], ES=[10, 20, 30, 40])
+    assert [list(key) for key in res.keys] == [['A', 'A', 'B'], [2, 3, 2]]
+    assert list(res.N) == [4, 2, 4]
+    assert list(res.ES) == [40, 20, 40]
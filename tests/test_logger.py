@@ -0,0 +1,43 @@
+"""
+(Purpose) Checks of the load duration histograms in Logger.py
+"""
+
+import numpy as np
+import pytest
+from Shared import Logger
+
+def write(path, amps):
+    # Logger header line, then a time column and an amp column
+    with open(path, 'w') as f:
+        f.write('Logger 1234\nTime,Amps\n')
+        for i, x in enumerate(amps):
+            f.write(str(i) + ',' + str(x) + '\n')
+    return str(path)
+
+def test_histogram(tmp_path):
+    # 1/4 of the time off, 1/4 at 52% and 1/2 at 87% of 40 A, one bad reading and one overload
+    amps = [0] * 25 + [20.8] * 25 + [34.8] * 49 + [48] + ['error']
+    path = write(tmp_path / 'log.csv', amps)
+    res = Logger.histogram(path, 'Amps', 40, skiprows=1)
+    assert res.N == 100
+    assert res.ON == 75
+    assert res.DUR.sum() == pytest.approx(100)
+    assert res.DUR[res.LFB == 52.5] == pytest.approx(100 / 3)
+    assert res.DUR[res.LFB == 87.5] == pytest.approx(49 / 75 * 100)
+    # Overload is counted at full load
+    assert res.DUR[-1] == pytest.approx(100 / 75)
+    assert res.LF == pytest.approx((25 * 52 + 49 * 87 + 100) / 75)
+
+def test_chunks(tmp_path):
+    # The same histogram for any chunk size
+    amps = np.random.default_rng(0).uniform(0, 50, 1000).round(2)
+    path = write(tmp_path / 'log.csv', amps)
+    one = Logger.histogram(path, 'Amps', 40, skiprows=1)
+    many = Logger.histogram(path, 'Amps', 40, chunksize=37, skiprows=1)
+    assert np.allclose(one.DUR, many.DUR) and one.N == many.N == 1000
+    assert one.LF == pytest.approx(many.LF)
+
+def test_off(tmp_path):
+    path = write(tmp_path / 'log.csv', [0, 0.5, 1])
+    with pytest.raises(Exception, match='No readings above'):
+        Logger.histogram(path, 'Amps', 40, skiprows=1)
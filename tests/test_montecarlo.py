@@ -0,0 +1,65 @@
+"""
+(Purpose) Checks of the Monte Carlo propagation in MonteCarlo.py
+"""
+
+import os, json
+import numpy as np
+import pytest
+from Shared import MonteCarlo
+
+BASELINE = json.load(open(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')))
+MEASURE = 'Compressor/Reduce Set Pressure'
+INPUTS = BASELINE[MEASURE]['inputs']
+DIST = {'LF': ['normal', 60, 10, 0, 100], 'HR': ['uniform', 6, 10]}
+
+def test_point_values():
+    # Without distributions every sample is the result of the template
+    res = MonteCarlo.simulate(MEASURE, INPUTS, {}, n=10, batch=4)
+    assert res['ES'].shape == (10,)
+    assert np.all(res['ES'] == BASELINE[MEASURE]['outputs']['ES'])
+
+def test_sample_shapes():
+    rng = np.random.default_rng(0)
+    samples = MonteCarlo.sample({'LF': ['normal', 60, 10, 0, 100], 'FR': ['triangular', [0, 10], [20, 30], [40, 50]]}, 1000, rng)
+    assert samples['LF'].shape == (1000,)
+    assert samples['FR'].shape == (1000, 2)
+    assert samples['LF'].min() >= 0 and samples['LF'].max() <= 100
+    with pytest.raises(Exception, match='not supported'):
+        MonteCarlo.sample({'LF': ['lognormal', 1, 1]}, 10, rng)
+
+def test_seed_reproducible():
+    # The same seed gives the same samples for any batch size and number of workers
+    one = MonteCarlo.simulate(MEASURE, INPUTS, DIST, n=1000, batch=250, seed=7)
+    two = MonteCarlo.simulate(MEASURE, INPUTS, DIST, n=1000, batch=250, workers=2, seed=7)
+    for key in one:
+        assert np.array_equal(one[key], two[key]), key
+    assert np.std(one['ES']) > 0
+
+def test_percentiles():
+    res = MonteCarlo.simulate(MEASURE, INPUTS, DIST, n=2000, seed=1)
+    summary = MonteCarlo.percentiles(res)
+    assert summary.ES.shape == (3,)
+    assert summary.ES[0] <= summary.ES[1] <= summary.ES[2]
+
+def test_derived_input_missing():
+    # Outside temperature is derived from weather data by the template
+    inputs = dict(BASELINE['Compressor/Intake Air']['inputs'])
+    inputs.pop('TO')
+    with pytest.raises(Exception, match='TO'):
+        MonteCarlo.simulate('Compressor/Intake Air', inputs, {}, n=10)
+    # A distribution takes its place
+    res = MonteCarlo.simulate('Compressor/Intake Air', inputs, {'TO': ['uniform', 30, 50]}, n=10)
+    assert res['ES'].shape == (10,)
+
+def test_per_area_distribution():
+    # One area per element of LED, a scalar distribution can't be combined with the areas
+    measure = 'Lighting/Install Motion Sensor'
+    inputs = BASELINE[measure]['inputs']
+    with pytest.raises(Exception, match='per-area'):
+        MonteCarlo.simulate(measure, inputs, {'FR': ['uniform', 20, 40]}, n=10)
+    res = MonteCarlo.simulate(measure, inputs, {'FR': ['uniform', [40, 20, 20], [60, 40, 40]]}, n=10)
+    assert res['ES'].shape == (10,)
+
+def test_unknown_measure():
+    with pytest.raises(Exception, match='not found'):
+        MonteCarlo.simulate('Lighting/Unknown', INPUTS, {}, n=10)
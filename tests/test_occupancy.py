@@ -0,0 +1,58 @@
+"""
+(Purpose) Checks of logger event integration in Occupancy.py
+"""
+
+import numpy as np
+import pytest
+from Shared import Occupancy
+
+def events():
+    # Office: lights on 7-18 and occupied 8-17 on weekdays, logged for one week from Monday, March 1, 2021
+    rows = [('Office', '2021-03-01 00:00', 'vacant', 'off')]
+    for day in range(1, 6):
+        date = '2021-03-%02d ' % day
+        rows += [('Office', date + '07:00', '', 'on'), ('Office', date + '08:00', 'occupied', ''),
+                 ('Office', date + '17:00', 'vacant', ''), ('Office', date + '18:00', '', 'off')]
+    rows.append(('Office', '2021-03-08 00:00', 'vacant', 'off'))
+    # Storage: logged from Wednesday, occupied 2.5 hours on Saturday, no light data
+    rows += [('Storage', '2021-03-03 00:00', '0', ''), ('Storage', '2021-03-06 10:00', '1', ''),
+             ('Storage', '2021-03-06 12:30', '0', ''), ('Storage', '2021-03-08 00:00', '0', '')]
+    # Events of the loggers are interleaved in the file
+    return sorted(rows, key=lambda row: row[1])
+
+def write(path, rows):
+    path.write_text('AREA,TIME,OCC,LIGHT\n' + ''.join(','.join(row) + '\n' for row in rows))
+    return str(path)
+
+def test_read(tmp_path):
+    log = Occupancy.read(write(tmp_path / 'log.csv', events()), chunksize=5)
+    assert log.AREA.tolist() == ['Office', 'Storage']
+    assert log.area.size == log.time.size == log.OCC.size == 26
+    # Empty states are unchanged
+    assert np.isnan(log.OCC).sum() == 10 and np.isnan(log.LIGHT).sum() == 14
+    assert set(log.OCC[np.isfinite(log.OCC)]) == {0, 1}
+
+def test_profile(tmp_path):
+    res = Occupancy.profile(write(tmp_path / 'log.csv', events()))
+    office, storage = 0, 1
+    assert res.DAYS.tolist() == [7, 5]
+    assert res.OCC[office].tolist() == [9] * 5 + [0] * 2
+    assert res.ON[office].tolist() == [11] * 5 + [0] * 2
+    assert res.OCCON[office].tolist() == [9] * 5 + [0] * 2
+    assert res.OCCW[office] == 45 and res.UNOCCW[office] == 168 - 45 and res.ONW[office] == 55
+    # Monday and Tuesday are not logged, they take the average of the logged hours
+    assert res.OCC[storage] == pytest.approx([0.5, 0.5, 0, 0, 0, 2.5, 0])
+    assert np.all(np.isnan(res.ON[storage])) and np.isnan(res.OCCONW[storage])
+
+def test_chunks(tmp_path):
+    path = write(tmp_path / 'log.csv', events())
+    one = Occupancy.profile(path)
+    many = Occupancy.profile(path, chunksize=3)
+    assert np.allclose(one.OCC, many.OCC)
+    assert np.allclose(one.ON, many.ON, equal_nan=True)
+
+def test_missing_column(tmp_path):
+    path = tmp_path / 'log.csv'
+    path.write_text('AREA,TIME\nOffice,2021-03-01 00:00\n')
+    with pytest.raises(Exception, match='Column OCC'):
+        Occupancy.read(str(path))
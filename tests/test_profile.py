@@ -0,0 +1,84 @@
+"""
+(Purpose) Checks of the hourly savings profiles and coincident demand in Profile.py
+"""
+
+import numpy as np
+import pytest
+from Shared import Profile, Tariff
+
+def test_schedule():
+    # Hours of the year of common schedules
+    assert Profile.schedule(8, 5, 52).sum() == 2080
+    assert Profile.schedule(8.5, 5.5, 50).sum() == pytest.approx(2337.5)
+    assert Profile.schedule(24, 7, 52).sum() == 24 * 7 * 52
+    on = Profile.schedule(8, 5, 52)
+    # Monday 8-16, not on weekends
+    assert on[8] == 1 and on[7] == 0 and on[16] == 0
+    assert on[5 * 24:7 * 24].sum() == 0
+
+def test_schedule_wrap():
+    # A night shift from 20 to 4, the Friday shift runs into Saturday
+    on = Profile.schedule(8, 5, 52, START=20)
+    assert on.sum() == 2080
+    assert on[20] == 1 and on[24 + 3] == 1 and on[24 + 4] == 0
+    assert on[5 * 24 + 3] == 1
+
+def test_schedule_season():
+    # 30 weeks from week 14, April 9 to November 4
+    on = Profile.schedule(24, 7, 30, FIRST=14)
+    assert on.sum() == 30 * 168
+    assert Profile.MONTH[np.flatnonzero(on)[[0, -1]]].tolist() == [3, 10]
+    # A season wrapping around the end of the year, the last week of the year is a single day
+    on = Profile.schedule(24, 7, 10, FIRST=48)
+    assert on[0] == 1 and on[-1] == 1 and on.sum() == 9 * 168 + 24
+
+def test_broadcast():
+    # One schedule per motor
+    on = Profile.schedule(np.array([8, 16]), 5, 52)
+    assert on.shape == (2, 8760) and on.dtype == np.float32
+    assert on.sum(axis=1).tolist() == [2080, 4160]
+
+def test_profile():
+    kW = Profile.profile(10000, 8, 5, 52)
+    assert kW.shape == (8760,) and kW.nbytes == 35040
+    assert kW.sum() == pytest.approx(10000, rel=1e-6)
+    assert kW.max() == pytest.approx(10000 / 2080, rel=1e-6)
+    # Savings of each motor are spread over its own hours
+    kW = Profile.profile(np.array([2080, 8736]), np.array([8, 24]), np.array([5, 7]), 52)
+    assert kW.sum() == pytest.approx(2080 + 8736, rel=1e-6)
+    assert kW[8] == pytest.approx(2) and kW[0] == pytest.approx(1)
+    # No operating hours, no savings
+    assert Profile.profile(1000, 0, 5, 52).sum() == 0
+
+def test_load(tmp_path):
+    path = str(tmp_path / 'Rec1.npy')
+    Profile.save(path, Profile.profile(10000, 8, 5, 52))
+    profiles = Profile.load([path, str(tmp_path / 'Rec2.npy'), None])
+    assert profiles.shape == (3, 8760) and profiles.dtype == np.float32
+    assert profiles[0].sum() == pytest.approx(10000, rel=1e-6)
+    assert profiles[1:].sum() == 0
+
+def test_demand():
+    # A day shift and a night shift never peak at the same time
+    day = Profile.profile(2080 * 10, 8, 5, 52)
+    night = Profile.profile(2080 * 10, 8, 5, 52, START=20)
+    res = Profile.demand(np.stack([day, night]))
+    assert res['DS'] == pytest.approx(np.full(12, 10))
+    assert res['TDS'] == pytest.approx(120)
+    # Both in the same shift add up
+    res = Profile.demand(np.stack([day, day]))
+    assert res['TDS'] == pytest.approx(240)
+
+def test_demand_load():
+    # Facility peak on weekdays 8-17, the savings of the night shift do not lower it
+    time = np.arange('2022-01-01T00:00', '2023-01-01T00:00', 15, dtype='datetime64[m]')
+    hour = (time.astype(np.int64) // 60) % 24
+    weekday = (time.astype('datetime64[D]').astype(np.int64) + 3) % 7 < 5
+    load = Tariff.interval(time, np.where(weekday & (hour >= 8) & (hour < 17), 500.0, 100.0))
+    # 10 kW saved on all weekdays of the reference year, 8-17 and 20-4
+    day = Profile.profile(10 * Profile.schedule(9, 5, 53).sum(), 9, 5, 53)
+    night = Profile.profile(10 * Profile.schedule(8, 5, 53, START=20).sum(), 8, 5, 53, START=20)
+    assert Profile.demand(night[None], load)['TDS'] == pytest.approx(0)
+    res = Profile.demand(np.stack([day, night]), load)
+    assert res['DS'] == pytest.approx(np.full(12, 10), rel=1e-5)
+    assert res['TDS'] == pytest.approx(120, rel=1e-5)
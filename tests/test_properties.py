@@ -0,0 +1,43 @@
+"""
+(Purpose) Checks of the air and flue gas properties in Properties.py against handbook values
+"""
+
+import numpy as np
+from Shared import Properties
+
+def test_air():
+    # Air at 300 K (80.33 degF), 1 atm (Incropera, Table A.4)
+    res = Properties.properties(80.33)
+    assert np.isclose(res.density, 0.0735, rtol=0.01)
+    assert np.isclose(res.cp, 1.007 * 0.238846, rtol=0.01)
+    assert np.isclose(res.viscosity, 184.6e-7 * Properties.PAS, rtol=0.02)
+    assert np.isclose(res.conductivity, 26.3e-3 * Properties.WMK, rtol=0.02)
+    assert np.isclose(res.prandtl, 0.707, rtol=0.02)
+    assert np.isclose(res.beta, 1 / 540)
+
+def test_arrays():
+    T = np.array([[32, 100], [500, 1000]])
+    res = Properties.properties(T)
+    for key in ['density', 'cp', 'cv', 'viscosity', 'conductivity', 'prandtl', 'nu', 'beta']:
+        assert res[key].shape == (2, 2), key
+    assert np.allclose(res.nu, res.viscosity / res.density)
+    # Same as one temperature at a time
+    assert np.isclose(res.cp[1, 0], Properties.properties(500).cp)
+    # Viscosity increases and density decreases with temperature
+    assert res.viscosity[1, 1] > res.viscosity[0, 0] and res.density[1, 1] < res.density[0, 0]
+
+def test_clamped():
+    # Outside the tabulated range the end values are used
+    assert Properties.AIR.density(5000) == Properties.rhoList[-1]
+    assert Properties.AIR.density(-500) == Properties.rhoList[0]
+
+def test_flue_gas():
+    gas = Properties.flue_gas(10)
+    # Cached
+    assert Properties.flue_gas(10) is gas
+    # Water vapor and CO2 make flue gas lighter per mole and raise its specific heat
+    assert gas.MW < Properties.M['Air']
+    assert gas.cp(400) > Properties.AIR.cp(400)
+    # More excess air is closer to air
+    assert abs(Properties.flue_gas(100).cp(400) - Properties.AIR.cp(400)) < abs(gas.cp(400) - Properties.AIR.cp(400))
+    assert np.isclose(gas.density(400), Properties.P * gas.MW / (Properties.R * 859.67))
@@ -0,0 +1,55 @@
+"""
+(Purpose) Checks of moist air properties in Psychrometrics.py against the ASHRAE Handbook
+"""
+
+import numpy as np
+from datetime import datetime
+from Shared import Psychrometrics, Weather
+
+def test_saturation_pressure():
+    # Hyland-Wexler equations in SI units, ASHRAE Handbook Fundamentals (2017), Chapter 1, Equations 5 and 6
+    assert np.allclose(Psychrometrics.saturation_pressure([0, 32, 70, 212]), [0.018502, 0.088649, 0.363277, 14.7096], rtol=1e-4)
+
+def test_state():
+    # 80 degF dry bulb, 50% relative humidity at sea level
+    W = Psychrometrics.humidity_ratio(80, 50)
+    assert np.isclose(W, 0.01092, rtol=0.01)
+    assert np.isclose(Psychrometrics.enthalpy(80, W), 31.2, rtol=0.01)
+    assert np.isclose(Psychrometrics.dew_point(W), 59.7, atol=0.3)
+    assert np.isclose(Psychrometrics.wet_bulb(80, W), 66.7, atol=0.3)
+    assert np.isclose(Psychrometrics.relative_humidity(80, W), 50)
+
+def test_saturated():
+    # At saturation, dew point and wet bulb equal the dry bulb temperature, over water and ice
+    T = np.array([20.0, 50.0, 90.0])
+    W = Psychrometrics.humidity_ratio(T, 100)
+    assert np.allclose(Psychrometrics.dew_point(W), T, atol=1e-3)
+    assert np.allclose(Psychrometrics.wet_bulb(T, W), T, atol=1e-3)
+
+def test_pressure():
+    # Lower pressure at elevation holds more water at the same relative humidity
+    assert np.isclose(Psychrometrics.pressure(0), Psychrometrics.P)
+    assert np.isclose(Psychrometrics.pressure(5000), 12.228, rtol=1e-3)
+    assert Psychrometrics.humidity_ratio(80, 50, Psychrometrics.pressure(5000)) > Psychrometrics.humidity_ratio(80, 50)
+
+def test_weather():
+    data = {'temp': np.array([80.0, 40.0, 60.0]), 'dwpt': np.array([59.7, 30.0, np.nan]), 'pres': np.array([1013.25, np.nan, 1000])}
+    res = Psychrometrics.weather(data)
+    assert res.W.shape == res.WB.shape == (3,)
+    assert np.isclose(res.DP[0], 59.7, atol=1e-3) and np.isclose(res.RH[0], 50, atol=0.5)
+    assert np.all(res.WB[:2] <= data['temp'][:2]) and np.all(res.WB[:2] >= res.DP[:2])
+    # Missing humidity
+    assert np.isnan(res.W[2]) and np.isnan(res.WB[2])
+
+def test_hourly_cache(tmp_path):
+    time = np.arange('2021-07-01T00', '2021-07-02T00', dtype='datetime64[h]')
+    temp = np.linspace(70, 90, 24)
+    station = (40.6, -75.4)
+    source = Weather.LocalSource({Weather.station_key(station): {'hourly': {'time': time, 'temp': temp, 'rhum': np.full(24, 50.0)}}})
+    cache = Weather.Cache(str(tmp_path), source, offline=False)
+    res = Psychrometrics.hourly(station, datetime(2021, 7, 1), datetime(2021, 7, 1), cache)
+    assert np.allclose(res.RH, 50)
+    assert np.array_equal(res.temp, temp)
+    # Read back from the cache
+    again = Psychrometrics.hourly(station, datetime(2021, 7, 1), datetime(2021, 7, 1), Weather.Cache(str(tmp_path), source, offline=True))
+    assert np.array_equal(again.WB, res.WB)
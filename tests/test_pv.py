@@ -0,0 +1,60 @@
+"""
+(Purpose) Checks of the offline PV output estimate in PV.py against a synthetic clear sky TMY year
+"""
+
+import numpy as np
+from easydict import EasyDict
+from Shared import PV
+
+def tmy(scale=1.0):
+    # Hours of a 365 day year, sorted by month
+    day = np.arange('2021-01-01', '2022-01-01', dtype='datetime64[D]')
+    date = np.repeat(day, 24)
+    res = EasyDict(lat=40.6, lon=-75.4, tz=-5.0)
+    res.month = date.astype('datetime64[M]').astype(int) % 12 + 1
+    res.day = (date - date.astype('datetime64[M]')).astype(int) + 1
+    res.hour = np.tile(np.arange(24), len(day))
+    zenith, azimuth, doy = PV.solar_position(res.lat, res.lon, res.tz, res.month, res.day, res.hour)
+    cosz = np.fmax(np.cos(np.radians(zenith)), 0)
+    res.DNI = scale * 850 * (cosz > 0.05)
+    res.DHI = scale * 100 * (cosz > 0)
+    res.GHI = res.DNI * cosz + res.DHI
+    res.TA = np.full(len(date), 20.0)
+    res.WS = np.full(len(date), 1.0)
+    return res
+
+def test_solar_position():
+    data = tmy()
+    zenith, azimuth, doy = PV.solar_position(data.lat, data.lon, data.tz, data.month, data.day, data.hour)
+    assert len(zenith) == 8760 and doy[-1] == 365
+    # Sun is down at midnight and highest around noon at the summer solstice
+    noon = (data.month == 6) & (data.day == 21) & (data.hour == 11)
+    assert np.all(zenith[data.hour == 0] > 90)
+    assert abs(zenith[noon][0] - (40.6 - 23.44)) < 2
+    # East of south before solar noon, west of south after
+    after = (data.month == 6) & (data.day == 21) & (data.hour == 12)
+    assert azimuth[noon][0] < 180 < azimuth[after][0]
+
+def test_monthly_adds_up():
+    res = PV.estimate(tmy(), 10)
+    assert res.ac.shape == (8760,) and res.ac_monthly.shape == (12,)
+    assert np.isclose(np.sum(res.ac_monthly), res.ac_annual)
+    assert np.all(res.ac >= 0) and np.all(res.ac <= 10 / 1.2)
+    # More output in summer than in winter
+    assert res.ac_monthly[6] > res.ac_monthly[11]
+
+def test_no_irradiance():
+    res = PV.estimate(tmy(0.0), 10)
+    assert res.ac_annual == 0
+    assert np.all(res.solrad_monthly == 0)
+
+def test_sweep():
+    data = tmy()
+    tilts = np.array([0, 20, 40])
+    grid = PV.estimate(data, 10, tilts[:, None], np.array([90, 180, 270])[None, :]).ac_annual
+    assert grid.shape == (3, 3)
+    # Same as one system at a time
+    assert np.isclose(grid[1, 1], PV.estimate(data, 10, 20, 180).ac_annual)
+    best = PV.best(data, 10)
+    assert best.azimuth == 180 and 20 <= best.tilt <= 45
+    assert best.ac_annual == best.grid.max()
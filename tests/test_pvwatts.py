@@ -0,0 +1,102 @@
+"""
+(Purpose) Checks of the PVWatts client against the local stand-in server and the shipped 1 kW fixture
+"""
+
+import os, socket, threading, time, json
+import pytest
+from Shared import PVWatts
+
+FIXTURE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Others', 'Solar Panel', 'PVWatts 1kW.json')
+
+@pytest.fixture(scope='module')
+def url():
+    # Free port for the stand-in server
+    with socket.socket() as s:
+        s.bind(('localhost', 0))
+        port = s.getsockname()[1]
+    threading.Thread(target=PVWatts.serve, args=(FIXTURE, port), daemon=True).start()
+    time.sleep(0.2)
+    return 'http://localhost:' + str(port) + '/'
+
+def test_query_scales_fixture(url, tmp_path, monkeypatch):
+    monkeypatch.setattr(PVWatts, 'URL', url)
+    result = PVWatts.query('key', 10, lat=40.6, lon=-75.4, directory=str(tmp_path), offline=False)
+    fixture = json.load(open(FIXTURE))
+    assert result.ac_annual == pytest.approx(10 * fixture['ac_annual'])
+    assert result.solrad_monthly == fixture['solrad_monthly']
+    # Cached, answered without the server
+    monkeypatch.setattr(PVWatts, 'URL', 'http://localhost:1/')
+    assert PVWatts.query('key', 10, lat=40.6, lon=-75.4, directory=str(tmp_path), offline=True) == result
+
+def test_not_cached_offline(tmp_path):
+    with pytest.raises(PVWatts.PVWattsError, match='not cached'):
+        PVWatts.query('key', 10, lat=40.6, lon=-75.4, directory=str(tmp_path), offline=True)
+
+def test_network_error(tmp_path, monkeypatch):
+    monkeypatch.setattr(PVWatts, 'URL', 'http://localhost:1/')
+    with pytest.raises(PVWatts.PVWattsError, match='request failed'):
+        PVWatts.query('key', 10, lat=40.6, lon=-75.4, directory=str(tmp_path), offline=False, retries=1)
+
+class Response:
+    def __init__(self, code, result):
+        self.status_code = code
+        self.result = result
+    def json(self):
+        return self.result
+
+def responses(monkeypatch, *answers):
+    # Replace requests.get by a list of answers, return the list of calls
+    import requests
+    calls = []
+    def get(url, params=None, timeout=None):
+        calls.append(params)
+        return answers[len(calls) - 1]
+    monkeypatch.setattr(requests, 'get', get)
+    monkeypatch.setattr(PVWatts.time, 'sleep', lambda seconds: None)
+    return calls
+
+def test_error_response_not_retried(tmp_path, monkeypatch):
+    calls = responses(monkeypatch, Response(422, {'errors': ['lat must be a number.'], 'outputs': {}}))
+    with pytest.raises(PVWatts.PVWattsError, match=r'HTTP 422.*lat must be a number'):
+        PVWatts.query('key', 10, lat=40.6, lon=-75.4, directory=str(tmp_path), offline=False)
+    assert len(calls) == 1
+
+def test_rate_limit_retried(tmp_path, monkeypatch):
+    limit = Response(429, {'error': {'code': 'OVER_RATE_LIMIT', 'message': 'You have exceeded your rate limit.'}})
+    calls = responses(monkeypatch, limit, limit, limit)
+    with pytest.raises(PVWatts.PVWattsError, match=r'3 attempts: HTTP 429.*OVER_RATE_LIMIT'):
+        PVWatts.query('key', 10, lat=40.6, lon=-75.4, directory=str(tmp_path), offline=False)
+    assert len(calls) == 3
+    fixture = json.load(open(FIXTURE))
+    calls = responses(monkeypatch, limit, Response(200, {'errors': [], 'outputs': fixture}))
+    result = PVWatts.query('key', 1, lat=40.6, lon=-75.4, directory=str(tmp_path), offline=False)
+    assert result.ac_annual == fixture['ac_annual'] and len(calls) == 2
+
+def test_monthly_table(url, tmp_path, request):
+    # Regenerate the monthly table of the Solar Panel template from the stand-in server
+    import locale, shutil, subprocess, sys
+    from docx import Document
+    from Shared import Geocode
+    request.addfinalizer(lambda current=locale.setlocale(locale.LC_ALL): locale.setlocale(locale.LC_ALL, current))
+    try:
+        locale.setlocale(locale.LC_ALL, 'en_US')
+        Geocode.lookup('18015')
+    except Exception as e:
+        pytest.skip('en_US locale or ZIP code lookup is not available: ' + str(e))
+    root = os.path.dirname(os.path.dirname(os.path.dirname(FIXTURE)))
+    shutil.copytree(os.path.join(root, 'Others', 'Solar Panel'), tmp_path / 'Others' / 'Solar Panel')
+    shutil.copytree(os.path.join(root, 'Shared'), tmp_path / 'Shared')
+    shutil.copy(os.path.join(root, 'Utility.json5'), tmp_path)
+    os.makedirs(tmp_path / 'Recommendations')
+    env = dict(os.environ, PVWATTS_URL=url, IAC_OFFLINE='0')
+    subprocess.run([sys.executable, 'automate.py'], cwd=tmp_path / 'Others' / 'Solar Panel', env=env,
+                   stdin=subprocess.DEVNULL, check=True, capture_output=True)
+    # Response cached by the template
+    cached = os.listdir(tmp_path / 'Shared' / 'PVWatts')
+    assert len(cached) == 1
+    outputs = json.load(open(tmp_path / 'Shared' / 'PVWatts' / cached[0]))
+    table = Document(tmp_path / 'Recommendations' / 'Add1.docx').tables[1]
+    for i in range(12):
+        assert locale.atoi(table.cell(i + 1, 2).text) == round(outputs['ac_monthly'][i])
+        assert float(table.cell(i + 1, 1).text) == round(outputs['solrad_monthly'][i], 2)
+    assert locale.atoi(table.cell(13, 2).text) == round(sum(outputs['ac_monthly']))
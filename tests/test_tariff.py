@@ -0,0 +1,75 @@
+"""
+(Purpose) Checks of the interval data tariff engine in Tariff.py
+"""
+
+import numpy as np
+import pytest
+from Shared import Tariff
+
+def load(base=100.0, peak=500.0):
+    # One year of 15-minute data from Saturday, January 1, 2022, peak load on 8-17
+    time = np.arange('2022-01-01T00:00', '2023-01-01T00:00', 15, dtype='datetime64[m]')
+    hour = (time.astype(np.int64) // 60) % 24
+    return time, np.where((hour >= 8) & (hour < 17), peak, base)
+
+def test_read(tmp_path):
+    time, kW = load()
+    path = tmp_path / 'interval.csv'
+    path.write_text('Meter 1\nTime,kW,kVAR\n' + ''.join(str(t).replace('T', ' ') + ',' + str(x) + ',0\n' for t, x in zip(time, kW)))
+    data = Tariff.read(str(path), chunksize=1000, skiprows=1)
+    assert data.DT == 0.25 and data.kW.dtype == np.float32
+    assert np.array_equal(data.time, time) and np.array_equal(data.kW, kW)
+
+def test_flat():
+    time, kW = load()
+    res = Tariff.evaluate(Tariff.interval(time, kW), [{'EC': 0.08, 'CUST': 50}])
+    kWh = np.sum(kW) * 0.25
+    # A whole year of data
+    assert res.KWH == pytest.approx(kWh) and res.AKWH == pytest.approx(kWh)
+    assert res.BILL.shape == (1, 12)
+    assert res.COST[0] == pytest.approx(0.08 * kWh + 50 * 12)
+
+def test_tou():
+    time, kW = load()
+    # Weekday peak hours overlap the load 8-17 from 9, the weekend is off peak
+    tariff = {'EC': 0.05, 'TOU': [{'DAYS': [0, 1, 2, 3, 4], 'HOURS': [9, 20], 'RATE': 0.10}]}
+    res = Tariff.evaluate(Tariff.interval(time, kW), [tariff])
+    weekday = (time.astype('datetime64[D]').astype(np.int64) + 3) % 7 < 5
+    hour = (time.astype(np.int64) // 60) % 24
+    on = weekday & (hour >= 9) & (hour < 20)
+    assert res.COST[0] == pytest.approx(np.sum(np.where(on, 0.10, 0.05) * kW) * 0.25)
+
+def test_tou_over_midnight():
+    mask = Tariff._hours({'HOURS': [22, 6], 'MONTHS': [12]})
+    assert mask[11, 0].tolist() == [True] * 6 + [False] * 16 + [True] * 2
+    assert not mask[0].any()
+
+def test_tiers():
+    time, kW = load()
+    # 1 kW all the time, 744 kWh in January
+    res = Tariff.evaluate(Tariff.interval(time, np.ones(time.size)), [{'TIERS': [[500, 0.10], [None, 0.05]]}, {'EC': 0.1}])
+    assert res.ENERGY[0, 0] == pytest.approx(500 * 0.10 + 244 * 0.05)
+    assert res.ENERGY[1, 0] == pytest.approx(744 * 0.1)
+
+def test_demand_ratchet():
+    time, kW = load()
+    # Summer peak of 1000 kW in July
+    kW = np.where(time.astype('datetime64[M]') == np.datetime64('2022-07'), 2 * kW, kW)
+    res = Tariff.evaluate(Tariff.interval(time, kW), [{'DC': 10}, {'DC': 10, 'RATCHET': 80}, {'DC': 10, 'PEAK': {'HOURS': [18, 24]}}])
+    assert res.BD[0].tolist() == [500] * 6 + [1000] + [500] * 5
+    # 80% of the July peak until the end of the data
+    assert res.BD[1].tolist() == [500] * 6 + [1000] + [800] * 5
+    # Demand is only measured in the evening
+    assert res.BD[2].tolist() == [100] * 6 + [200] + [100] * 5
+    assert res.DEMAND[1].sum() == pytest.approx(10 * (500 * 6 + 1000 + 800 * 5))
+
+def test_rank():
+    time, kW = load()
+    tariffs = [{'NAME': 'Flat', 'EC': 0.08}, {'NAME': 'Night', 'EC': 0.05, 'TOU': [{'HOURS': [8, 17], 'RATE': 0.12}]}, {'NAME': 'Cheap', 'EC': 0.07}] * 20
+    res = Tariff.evaluate(Tariff.bins(Tariff.interval(time, kW)), tariffs)
+    assert res.COST.shape == (60,)
+    assert res.NAME[Tariff.rank(res)[0]] == 'Cheap'
+
+def test_short():
+    with pytest.raises(Exception, match='at least 2'):
+        Tariff.interval(['2022-01-01'], [1.0])
@@ -0,0 +1,65 @@
+"""
+(Purpose) Checks of the weather data cache in Weather.py
+"""
+
+import numpy as np
+import pytest
+from datetime import datetime
+from Shared import Weather
+
+STATION = (40.6, -75.4)
+
+class Counted(Weather.LocalSource):
+    # Stand-in source that counts fetches
+    def __init__(self, tables):
+        super().__init__(tables)
+        self.fetches = 0
+    def fetch(self, station, freq, start, end):
+        self.fetches += 1
+        return super().fetch(station, freq, start, end)
+
+def source():
+    time = np.arange('2018-01', '2023-01', dtype='datetime64[M]')
+    tavg = 50 + 25 * np.sin((Weather.months(time) - 4) / 12 * 2 * np.pi)
+    return Counted({Weather.station_key(STATION): {'monthly': {'time': time, 'tavg': tavg}}})
+
+def test_station_key():
+    assert Weather.snap(STATION) == (40.5, -75.5)
+    assert Weather.station_key(STATION) == "40.50_-75.50"
+    assert Weather.station_key('72513') == '72513'
+
+def test_cache(tmp_path):
+    src = source()
+    cache = Weather.Cache(str(tmp_path), src, offline=False)
+    data = cache.monthly(STATION, datetime(2018, 1, 1), datetime(2021, 12, 31))
+    assert len(data.time) == 48 and src.fetches == 1
+    assert list(tmp_path.iterdir())
+    # A shorter range is served from the cached file
+    data = cache.monthly(STATION, datetime(2019, 1, 1), datetime(2019, 12, 31))
+    assert len(data.time) == 12 and src.fetches == 1
+    assert Weather.months(data.time).tolist() == list(range(1, 13))
+    # A new cache offline reads the same files
+    offline = Weather.Cache(str(tmp_path), source(), offline=True)
+    assert np.array_equal(offline.monthly(STATION, datetime(2019, 1, 1), datetime(2019, 12, 31)).tavg, data.tavg)
+
+def test_offline(tmp_path):
+    cache = Weather.Cache(str(tmp_path), source(), offline=True)
+    with pytest.raises(Exception, match='not cached'):
+        cache.monthly(STATION, datetime(2018, 1, 1), datetime(2018, 12, 31))
+    assert cache.source.fetches == 0
+    with pytest.raises(Exception, match='not supported'):
+        cache.get(STATION, 'daily', datetime(2018, 1, 1), datetime(2018, 12, 31))
+
+def test_no_data(tmp_path):
+    cache = Weather.Cache(str(tmp_path), source(), offline=False)
+    with pytest.raises(Exception, match='No monthly weather data'):
+        cache.monthly(STATION, datetime(2010, 1, 1), datetime(2010, 12, 31))
+
+def test_seed_region(tmp_path):
+    cache = Weather.Cache(str(tmp_path), source(), offline=False)
+    # The region only has the grid point of the station
+    paths = cache.seed((40.6, -75.6, 40.4, -75.4), datetime(2018, 1, 1), datetime(2022, 12, 31), ['monthly'])
+    assert len(paths) == 1 and cache.source.fetches == 1
+    # Already cached
+    assert cache.seed([STATION], datetime(2020, 1, 1), datetime(2020, 12, 31), ['monthly']) == paths
+    assert cache.source.fetches == 1